@@ -0,0 +1,153 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+from dotenv import load_dotenv
+from app_data import data_path
+
+class AnswerCache:
+    """Disk-backed cache of Claude answers keyed by normalized question text"""
+
+    DEFAULT_MAX_ENTRIES = 1000
+    DEFAULT_TTL_HOURS = 24 * 7
+    CACHE_FILE = "answer_cache.sqlite3"
+
+    def __init__(self, db_path=None, max_entries=None, ttl_hours=None):
+        """
+        Initialize the AnswerCache
+
+        Args:
+            db_path (str, optional): Path to the SQLite database. If not provided,
+                                     will look for ANSWER_CACHE_PATH environment variable
+                                     and fall back to a file in the per-user data directory
+            max_entries (int, optional): Maximum number of cached answers. Least recently
+                                         used answers are evicted beyond this size.
+                                         Defaults to ANSWER_CACHE_MAX_ENTRIES or DEFAULT_MAX_ENTRIES
+            ttl_hours (float, optional): Hours before a cached answer expires.
+                                         Defaults to ANSWER_CACHE_TTL_HOURS or DEFAULT_TTL_HOURS
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.db_path = db_path or os.getenv("ANSWER_CACHE_PATH") or data_path(self.CACHE_FILE)
+        self.max_entries = int(max_entries or os.getenv("ANSWER_CACHE_MAX_ENTRIES") or self.DEFAULT_MAX_ENTRIES)
+        self.ttl_seconds = float(ttl_hours or os.getenv("ANSWER_CACHE_TTL_HOURS") or self.DEFAULT_TTL_HOURS) * 3600
+
+        # Hit/miss counters for this session
+        self.hits = 0
+        self.misses = 0
+
+        # The connection is shared by the worker threads, so access is serialized
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "key TEXT PRIMARY KEY, "
+                "answer TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "last_used_at REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used_at)")
+
+    @staticmethod
+    def normalize_question(question_text):
+        """
+        Normalize question text so trivial OCR differences map to the same key
+
+        Args:
+            question_text (str): The question text
+
+        Returns:
+            str: Lowercased text with whitespace collapsed
+        """
+        return re.sub(r"\s+", " ", question_text).strip().lower()
+
+    def make_key(self, question_text, question_type, model, system_prompt):
+        """
+        Build the cache key for a request
+
+        Args:
+            question_text (str): The question text
+            question_type (str): Either "multiple_choice" or "short_answer"
+            model (str): The Claude model
+            system_prompt (str): The system prompt (and any few-shot examples) sent with the question
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        parts = [self.normalize_question(question_text), question_type, model, system_prompt]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached answer
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            str or None: The cached answer, or None on a miss
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT answer, created_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self.conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE answers SET last_used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, answer):
+        """
+        Store an answer and evict expired or least recently used entries
+
+        Args:
+            key (str): Key from make_key
+            answer (str): The answer to cache
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO answers (key, answer, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                (key, answer, now, now)
+            )
+            self.conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl_seconds,))
+            self.conn.execute(
+                "DELETE FROM answers WHERE key NOT IN "
+                "(SELECT key FROM answers ORDER BY last_used_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        """Remove every cached answer"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM answers")
+
+    def size(self):
+        """Get the number of cached answers"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def stats(self):
+        """
+        Get the cache counters
+
+        Returns:
+            dict: hits, misses and number of entries
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": self.size()}
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
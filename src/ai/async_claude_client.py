@@ -0,0 +1,354 @@
+import os
+import json
+import time
+import asyncio
+import threading
+import importlib.util
+import concurrent.futures
+import anthropic
+from ai.claude_client import (ClaudeClient, ClaudeAnswer, RequestCancelled, RequestTimedOut, StreamMetrics,
+                              StructuredAnswer, tool_input)
+from ai.prompt_registry import ANSWER_TOOL, ANSWER_TOOL_CHOICE, ANSWER_TOOL_FINGERPRINT
+
+class AsyncClaudeClient(ClaudeClient):
+    """
+    Claude client that keeps many questions in flight on one event loop
+
+    Requests share a single AsyncAnthropic client, so they reuse one pool of
+    keep-alive connections (multiplexed over HTTP/2 when the h2 package is
+    installed). ask_many() bounds the number of in-flight requests with a
+    semaphore. Code outside an event loop (Qt workers, batch tools) can use
+    submit(), which runs requests on a background loop and returns futures.
+    No blocking client is created: get_answer(), get_structured_answer() and
+    stream_question() run the async requests on that loop and wait for them.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 16
+    DEFAULT_KEEPALIVE_SECONDS = 30
+
+    def __init__(self, api_key=None, model=None, answer_cache=None, max_concurrency=None,
+                 http2=None, keepalive_seconds=None, timeout=None, scheduler=None, prompts=None):
+        """
+        Initialize the async Claude client
+
+        Args:
+            api_key (str, optional): Claude API key. If not provided,
+                                     will look for ANTHROPIC_API_KEY environment variable
+            model (str, optional): Model to use. Defaults to DEFAULT_MODEL
+            answer_cache (AnswerCache, optional): Cache consulted before calling the API
+            max_concurrency (int, optional): Requests in flight at once. Defaults to
+                                             CLAUDE_MAX_CONCURRENCY or DEFAULT_MAX_CONCURRENCY
+            http2 (bool, optional): Use HTTP/2 when available. Defaults to CLAUDE_HTTP2 (on)
+            keepalive_seconds (float, optional): How long idle connections are kept open.
+                                                 Defaults to CLAUDE_KEEPALIVE_SECONDS
+            timeout (float, optional): Default per-request deadline in seconds
+            scheduler (RequestScheduler, optional): Rate limit budgets and retry policy.
+                                                    Defaults to the scheduler shared by all clients
+            prompts (PromptRegistry, optional): Prompt templates per question type.
+                                                Defaults to the registry shared by all clients
+        """
+        super().__init__(api_key=api_key, model=model, answer_cache=answer_cache, timeout=timeout,
+                         scheduler=scheduler, prompts=prompts)
+
+        self.max_concurrency = int(max_concurrency or os.getenv("CLAUDE_MAX_CONCURRENCY")
+                                   or self.DEFAULT_MAX_CONCURRENCY)
+        self.keepalive_seconds = float(keepalive_seconds or os.getenv("CLAUDE_KEEPALIVE_SECONDS")
+                                       or self.DEFAULT_KEEPALIVE_SECONDS)
+
+        if http2 is None:
+            http2 = os.getenv("CLAUDE_HTTP2", "true").lower() not in ("0", "false", "no")
+        if http2 and importlib.util.find_spec("h2") is None:
+            print("h2 is not installed. Using HTTP/1.1 keep-alive connections.")
+            http2 = False
+        self.http2 = http2
+
+        # The async client, semaphore and background loop are created on first use,
+        # since they belong to the event loop they are used on
+        self.async_client = None
+        self.semaphore = None
+        self.client_loop = None
+        self.loop = None
+        self.loop_thread = None
+        self.loop_lock = threading.Lock()
+
+    def _create_client(self):
+        """Requests go through the AsyncAnthropic client instead, so no blocking client is created"""
+        return None
+
+    async def _get_async_client(self):
+        """Create the shared AsyncAnthropic client on first use (or when used from a new event loop)"""
+        loop = asyncio.get_running_loop()
+        if self.async_client is None or self.client_loop is not loop:
+            if self.async_client is not None:
+                await self._close_async_client()
+            # Same Limits class the SDK uses, whichever HTTP library it is built on
+            limits = type(anthropic.DEFAULT_CONNECTION_LIMITS)(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=self.keepalive_seconds,
+            )
+            self.async_client = anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                timeout=self.timeout,
+                max_retries=0,
+                http_client=anthropic.DefaultAsyncHttpxClient(http2=self.http2, limits=limits),
+            )
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.client_loop = loop
+        return self.async_client
+
+    async def ask(self, question_text, question_type="multiple_choice", max_tokens=1000, timeout=None):
+        """
+        Send a question to Claude and get the answer
+
+        Like get_answer, the request waits for rate limit budget (shared with
+        every other client) and transient failures are retried with backoff.
+        API errors are raised once retries run out, and RequestTimedOut once the
+        deadline passes. Cancelling the task closes the request.
+
+        Args:
+            question_text (str): The question text to send
+            question_type (str): Either "multiple_choice" or "short_answer"
+            max_tokens (int): Maximum tokens in the response
+            timeout (float, optional): Deadline in seconds, not counting the wait for
+                                       rate limit budget or a free slot. Defaults to self.timeout
+
+        Returns:
+            ClaudeAnswer: The answer, usage and latency
+        """
+        template = self.prompts.get(question_type)
+        start_time = time.perf_counter()
+
+        # Return a cached answer without calling the API
+        cache_key, cached_answer = self._lookup_cache(question_text, question_type, template.fingerprint)
+        if cached_answer is not None:
+            return ClaudeAnswer(cached_answer, self.model, latency=time.perf_counter() - start_time,
+                                cached=True, attempts=0)
+
+        response, attempts, start_time = await self._create_message_async(template, question_text,
+                                                                          max_tokens, timeout)
+        cache_read_tokens, cache_write_tokens = self._record_usage(response.usage)
+
+        answer = response.content[0].text
+        self._store_cache(cache_key, answer)
+        return ClaudeAnswer(
+            answer, response.model,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+            latency=time.perf_counter() - start_time,
+            attempts=attempts,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+        )
+
+    async def ask_structured(self, question_text, question_type="multiple_choice", max_tokens=None, timeout=None):
+        """
+        Async version of get_structured_answer
+
+        Returns:
+            StructuredAnswer: The letter, confidence and rationale with usage and latency
+        """
+        template = self.prompts.get(question_type)
+        start_time = time.perf_counter()
+
+        cache_key, cached_answer = self._lookup_cache(question_text, question_type,
+                                                      template.fingerprint + ANSWER_TOOL_FINGERPRINT)
+        if cached_answer is not None:
+            return StructuredAnswer(json.loads(cached_answer), self.model,
+                                    latency=time.perf_counter() - start_time, cached=True, attempts=0)
+
+        response, attempts, start_time = await self._create_message_async(
+            template, question_text, max_tokens or self.STRUCTURED_MAX_TOKENS, timeout,
+            tools=[ANSWER_TOOL], tool_choice=ANSWER_TOOL_CHOICE
+        )
+        cache_read_tokens, cache_write_tokens = self._record_usage(response.usage)
+
+        fields = tool_input(response, ANSWER_TOOL["name"])
+        self._store_cache(cache_key, json.dumps(fields))
+        return StructuredAnswer(
+            fields, response.model,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+            latency=time.perf_counter() - start_time,
+            attempts=attempts,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+        )
+
+    async def _create_message_async(self, template, question_text, max_tokens, timeout=None, **options):
+        """
+        Async version of _create_message
+
+        Returns:
+            tuple: (Message, attempts, time the first attempt got a slot)
+        """
+        timeout = self.timeout if timeout is None else timeout
+        estimated_tokens = self._estimate_tokens(template, question_text, max_tokens)
+        client = await self._get_async_client()
+
+        deadline = None
+        attempt = 0
+        while True:
+            attempt += 1
+            await self._wait_for_admission_async(estimated_tokens, deadline)
+
+            async with self.semaphore:
+                # Latency and the deadline cover the requests themselves, not the wait for a free slot
+                if deadline is None:
+                    start_time = time.perf_counter()
+                    deadline = start_time + timeout
+                remaining = max(deadline - time.perf_counter(), 0.001)
+                try:
+                    raw_response = await asyncio.wait_for(
+                        client.messages.with_raw_response.create(
+                            model=self.model,
+                            max_tokens=max_tokens,
+                            system=template.system_blocks,
+                            messages=template.messages(question_text),
+                            timeout=remaining,
+                            **options
+                        ),
+                        remaining
+                    )
+                    break
+                except (asyncio.TimeoutError, anthropic.APITimeoutError):
+                    raise RequestTimedOut(f"Claude did not answer within {timeout:g} seconds")
+                except anthropic.APIError as e:
+                    delay = self._retry_delay(e, attempt, estimated_tokens, deadline)
+                    if delay is None:
+                        raise
+            # Back off without holding a slot
+            await asyncio.sleep(delay)
+
+        response = await raw_response.parse()
+        self.scheduler.record_response(raw_response.headers, estimated_tokens,
+                                       response.usage.input_tokens + response.usage.output_tokens)
+        return response, attempt, start_time
+
+    async def _wait_for_admission_async(self, estimated_tokens, deadline):
+        """Async version of _wait_for_admission"""
+        while True:
+            wait = self.scheduler.admit(estimated_tokens)
+            if wait <= 0:
+                return
+            if deadline is not None and time.perf_counter() + wait >= deadline:
+                raise RequestTimedOut("The deadline passed before the request could be retried")
+            await asyncio.sleep(min(wait, self.scheduler.ADMISSION_POLL_SECONDS))
+
+    async def ask_many(self, questions, max_tokens=1000):
+        """
+        Answer many questions concurrently, at most max_concurrency at a time
+
+        Args:
+            questions (list): (question_text, question_type) pairs
+            max_tokens (int): Maximum tokens per response
+
+        Returns:
+            list: A ClaudeAnswer or the raised exception for every question, in order
+        """
+        return await asyncio.gather(
+            *(self.ask(question_text, question_type, max_tokens) for question_text, question_type in questions),
+            return_exceptions=True,
+        )
+
+    def _get_loop(self):
+        """Start the background event loop thread on first use"""
+        with self.loop_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.loop_thread = threading.Thread(target=self.loop.run_forever, name="claude-async-loop",
+                                                    daemon=True)
+                self.loop_thread.start()
+            return self.loop
+
+    def submit(self, question_text, question_type="multiple_choice", max_tokens=1000):
+        """
+        Queue a question from synchronous code
+
+        Args:
+            question_text (str): The question text to send
+            question_type (str): Either "multiple_choice" or "short_answer"
+            max_tokens (int): Maximum tokens in the response
+
+        Returns:
+            concurrent.futures.Future: Resolves to a ClaudeAnswer or raises the API error.
+                                       Cancelling it closes the request
+        """
+        return asyncio.run_coroutine_threadsafe(self.ask(question_text, question_type, max_tokens), self._get_loop())
+
+    def _wait(self, coroutine, cancel_event=None):
+        """
+        Run a coroutine on the background loop and wait for its result
+
+        Raises:
+            RequestCancelled: cancel_event was set; the request is cancelled too
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._get_loop())
+        if cancel_event is None:
+            return future.result()
+        while True:
+            try:
+                return future.result(timeout=self.WATCHDOG_POLL_SECONDS)
+            except concurrent.futures.TimeoutError:
+                if cancel_event.is_set():
+                    future.cancel()
+                    raise RequestCancelled("Request cancelled")
+
+    def get_answer(self, question_text, question_type="multiple_choice", max_tokens=1000, timeout=None,
+                   cancel_event=None):
+        """Blocking version of ask, run on the background loop"""
+        return self._wait(self.ask(question_text, question_type, max_tokens, timeout), cancel_event)
+
+    def get_structured_answer(self, question_text, question_type="multiple_choice", max_tokens=None,
+                              timeout=None, cancel_event=None):
+        """Blocking version of ask_structured, run on the background loop"""
+        return self._wait(self.ask_structured(question_text, question_type, max_tokens, timeout), cancel_event)
+
+    def stream_question(self, question_text, question_type="multiple_choice", max_tokens=1000,
+                        timeout=None, cancel_event=None):
+        """
+        Yield the answer as one delta once it is complete
+
+        The async client does not stream, so the whole answer arrives at once.
+        """
+        start_time = time.perf_counter()
+        answer = self.get_answer(question_text, question_type, max_tokens, timeout, cancel_event)
+        latency = time.perf_counter() - start_time
+        self.last_stream_metrics = StreamMetrics(latency, latency, len(answer.text))
+        yield answer.text
+
+    def ask_many_sync(self, questions, max_tokens=1000):
+        """
+        Blocking version of ask_many for synchronous code
+
+        Returns:
+            list: A ClaudeAnswer or the raised exception for every question, in order
+        """
+        future = asyncio.run_coroutine_threadsafe(self.ask_many(questions, max_tokens), self._get_loop())
+        return future.result()
+
+    async def _close_async_client(self):
+        """Close the AsyncAnthropic client and its connection pool"""
+        old_client, self.async_client = self.async_client, None
+        try:
+            await old_client.close()
+        except RuntimeError:
+            # Its connections belong to an event loop that has already closed them
+            pass
+
+    async def aclose(self):
+        """Close the shared connection pool"""
+        if self.async_client is not None:
+            await self._close_async_client()
+
+    def close(self):
+        """Close the connection pool and stop the background loop"""
+        with self.loop_lock:
+            if self.loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self.aclose(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop_thread.join()
+            self.loop.close()
+            self.loop = None
+            self.loop_thread = None
@@ -1,18 +1,135 @@
 import os
+import json
 import time
+import socket
+import threading
 import anthropic
 from dotenv import load_dotenv
+from ai.prompt_registry import (ANSWER_TOOL, ANSWER_TOOL_CHOICE, ANSWER_TOOL_FINGERPRINT,
+                                PromptCacheStats, PromptRegistry)
+from ai.request_scheduler import RequestScheduler
+
+class ClaudeClientError(Exception):
+    """A Claude request that failed for good (after any retries)"""
+
+class RequestCancelled(ClaudeClientError):
+    """Raised when a request is cancelled before Claude finished answering"""
+
+class RequestTimedOut(ClaudeClientError):
+    """Raised when Claude does not finish answering within the request's deadline"""
+
+class StreamMetrics:
+    """Latency measurements for a streamed Claude response"""
+    
+    def __init__(self, first_token_latency, total_latency, output_chars):
+        self.first_token_latency = first_token_latency  # Seconds until the first text delta (None if no text)
+        self.total_latency = total_latency              # Seconds until the stream finished
+        self.output_chars = output_chars                # Number of characters received
+    
+    def __str__(self):
+        first_token = "n/a" if self.first_token_latency is None else f"{self.first_token_latency:.2f}s"
+        return f"first token {first_token}, total {self.total_latency:.2f}s, {self.output_chars} chars"
+
+class ClaudeAnswer:
+    """A complete Claude answer with its usage and latency"""
+    
+    def __init__(self, text, model, input_tokens=0, output_tokens=0, latency=0.0, cached=False, attempts=1,
+                 cache_read_tokens=0, cache_write_tokens=0):
+        self.text = text                    # Answer text
+        self.model = model                  # Model that produced the answer
+        self.input_tokens = input_tokens    # Prompt tokens billed (0 for cached answers)
+        self.output_tokens = output_tokens  # Completion tokens billed (0 for cached answers)
+        self.latency = latency              # Seconds spent getting the answer
+        self.cached = cached                # True if the answer came from the answer cache
+        self.attempts = attempts            # Requests sent, including retries (0 for cached answers)
+        self.cache_read_tokens = cache_read_tokens    # Prompt tokens served from the prompt cache
+        self.cache_write_tokens = cache_write_tokens  # Prompt tokens written to the prompt cache
+    
+    def __str__(self):
+        source = "cache" if self.cached else self.model
+        summary = f"{source}, {self.latency:.2f}s, {self.input_tokens} in / {self.output_tokens} out tokens"
+        if self.cache_read_tokens or self.cache_write_tokens:
+            summary += f" (prompt cache: {self.cache_read_tokens} read / {self.cache_write_tokens} written)"
+        return summary
+
+class StructuredAnswer(ClaudeAnswer):
+    """An answer returned through the answer tool, as typed fields"""
+    
+    def __init__(self, fields, model, **kwargs):
+        """
+        Initialize the StructuredAnswer
+        
+        Args:
+            fields (dict): The tool input (letter, confidence, rationale and optional answer)
+            model (str): Model that produced the answer
+            **kwargs: Usage and latency, as for ClaudeAnswer
+        """
+        letter = str(fields.get("letter") or "").strip().rstrip(").").upper()
+        self.letter = letter if len(letter) == 1 and letter.isalpha() else None  # Chosen option, if any
+        self.confidence = _clamp_confidence(fields.get("confidence"))           # 0 to 1, None if missing
+        self.rationale = str(fields.get("rationale") or "").strip()             # One-sentence explanation
+        self.short_answer = str(fields.get("answer") or "").strip()             # For questions without options
+        
+        if self.letter:
+            text = f"{self.letter}) {self.short_answer}".rstrip() if self.short_answer else self.letter
+        else:
+            text = self.short_answer
+        if self.rationale:
+            text = f"{text}\n\n{self.rationale}" if text else self.rationale
+        super().__init__(text, model, **kwargs)
+
+def _clamp_confidence(value):
+    """Read a confidence as 0 to 1, accepting percentages"""
+    try:
+        confidence = float(value)
+    except (TypeError, ValueError):
+        return None
+    if confidence > 1:
+        confidence /= 100
+    return max(0.0, min(confidence, 1.0))
+
+def tool_input(message, tool_name):
+    """
+    Get the input of a tool call from a response
+    
+    Args:
+        message: The Message returned by the API
+        tool_name (str): Name of the tool Claude was made to call
+        
+    Returns:
+        dict: The tool input
+        
+    Raises:
+        ClaudeClientError: The response has no call to the tool
+    """
+    for block in message.content:
+        if block.type == "tool_use" and block.name == tool_name:
+            return dict(block.input)
+    raise ClaudeClientError(f"Claude did not call {tool_name} (stop reason: {message.stop_reason})")
 
 class ClaudeClient:
     """Client for interacting with Claude API"""
     
-    def __init__(self, api_key=None):
+    DEFAULT_MODEL = "claude-3-opus-20240229"
+    DEFAULT_TIMEOUT = 30  # Seconds a request may take, including connecting
+    STRUCTURED_MAX_TOKENS = 256  # Enough for the answer tool call with a one-sentence rationale
+    WATCHDOG_POLL_SECONDS = 0.05  # How often a stream's watchdog checks for cancellation
+    
+    def __init__(self, api_key=None, model=None, answer_cache=None, timeout=None, scheduler=None, prompts=None):
         """
         Initialize the Claude client
         
         Args:
             api_key (str, optional): Claude API key. If not provided,
                                      will look for ANTHROPIC_API_KEY environment variable
+            model (str, optional): Model to use. Defaults to DEFAULT_MODEL
+            answer_cache (AnswerCache, optional): Cache consulted before calling the API
+            timeout (float, optional): Default per-request deadline in seconds. Defaults to
+                                       CLAUDE_TIMEOUT_SECONDS or DEFAULT_TIMEOUT
+            scheduler (RequestScheduler, optional): Rate limit budgets and retry policy.
+                                                    Defaults to the scheduler shared by all clients
+            prompts (PromptRegistry, optional): Prompt templates per question type.
+                                                Defaults to the registry shared by all clients
         """
         # Load environment variables
         load_dotenv()
@@ -23,10 +140,121 @@ class ClaudeClient:
         if not self.api_key:
             raise ValueError("Claude API key is required. Please provide it or set ANTHROPIC_API_KEY environment variable.")
         
-        # Initialize the client
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.timeout = float(timeout or os.getenv("CLAUDE_TIMEOUT_SECONDS") or self.DEFAULT_TIMEOUT)
+        
+        self.client = self._create_client()
+        self.model = model or self.DEFAULT_MODEL
+        self.answer_cache = answer_cache
+        self.scheduler = scheduler or RequestScheduler.shared()
+        self.prompts = prompts or PromptRegistry.shared()
+        
+        # Metrics of the most recent streamed response, and prompt cache totals
+        self.last_stream_metrics = None
+        self.prompt_cache_stats = PromptCacheStats()
+    
+    def _create_client(self):
+        """
+        Create the API client
+
+        SDK retries are off: the scheduler retries within the request's
+        deadline and knows about rate limits.
+        """
+        return anthropic.Anthropic(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+    
+    def _estimate_tokens(self, template, question_text, max_tokens):
+        """Token estimate of a request, for the rate limit budget"""
+        return self.scheduler.estimate_tokens(question_text, max_tokens) + template.prefix_chars // 4
+    
+    def _record_usage(self, usage):
+        """
+        Add a response's usage to the prompt cache totals
+        
+        Returns:
+            tuple: (cache_read_tokens, cache_write_tokens) of the response
+        """
+        return self.prompt_cache_stats.record(usage)
+    
+    def _lookup_cache(self, question_text, question_type, prompt_fingerprint):
+        """
+        Look up a question in the answer cache
+        
+        Returns:
+            tuple: (cache_key, cached_answer). Both are None without a cache;
+                   cached_answer is None on a miss
+        """
+        if self.answer_cache is None:
+            return None, None
+        
+        cache_key = self.answer_cache.make_key(question_text, question_type, self.model, prompt_fingerprint)
+        cached_answer = self.answer_cache.get(cache_key)
+        if cached_answer is not None:
+            print(f"Answer cache hit ({self.answer_cache.hits} hits, {self.answer_cache.misses} misses)")
+        return cache_key, cached_answer
+    
+    def _store_cache(self, cache_key, answer):
+        """Store a successful answer in the answer cache"""
+        if self.answer_cache is not None and cache_key is not None and answer:
+            self.answer_cache.put(cache_key, answer)
+    
+    def _wait_for_admission(self, estimated_tokens, deadline, cancel_event=None):
+        """
+        Wait until the rate limit budget admits a request
+        
+        Requests are queued rather than failed while the budget is exhausted, so
+        only the wait before a retry counts towards the deadline.
+        
+        Raises:
+            RequestTimedOut: The deadline passed while waiting to retry
+            RequestCancelled: cancel_event was set while waiting
+        """
+        waited = False
+        while True:
+            wait = self.scheduler.admit(estimated_tokens)
+            if wait <= 0:
+                return
+            if deadline is not None and time.perf_counter() + wait >= deadline:
+                raise RequestTimedOut("The deadline passed before the request could be retried")
+            
+            if not waited:
+                print(f"Waiting about {wait:.1f} seconds for rate limit budget")
+                waited = True
+            if not self._sleep(min(wait, self.scheduler.ADMISSION_POLL_SECONDS), cancel_event):
+                raise RequestCancelled("Request cancelled")
+    
+    def _retry_delay(self, error, attempt, estimated_tokens, deadline):
+        """
+        Get the backoff before retrying a failed attempt
+        
+        Returns:
+            float or None: Seconds to wait, or None if the error should be raised
+        """
+        response = getattr(error, "response", None)
+        self.scheduler.record_response(response.headers if response is not None else None,
+                                       estimated_tokens, used_tokens=0)
+        if not self.scheduler.should_retry(error, attempt):
+            return None
+        
+        delay = self.scheduler.retry_delay(error, attempt)
+        if time.perf_counter() + delay >= deadline:
+            return None
+        print(f"Claude request failed ({type(error).__name__}), retrying in {delay:.1f} seconds "
+              f"(attempt {attempt} of {self.scheduler.max_retries + 1})")
+        return delay
     
-    def ask_question(self, question_text, question_type="multiple_choice", max_tokens=1000, timeout=30):
+    @staticmethod
+    def _sleep(seconds, cancel_event=None):
+        """
+        Sleep, waking early if cancel_event is set
+        
+        Returns:
+            bool: False if the request was cancelled
+        """
+        if cancel_event is None:
+            time.sleep(seconds)
+            return True
+        return not cancel_event.wait(seconds)
+    
+    def ask_question(self, question_text, question_type="multiple_choice", max_tokens=1000, timeout=None):
         """
         Send a question to Claude and get the answer
         
@@ -34,59 +262,329 @@ class ClaudeClient:
             question_text (str): The question text to send
             question_type (str): Either "multiple_choice" or "short_answer"
             max_tokens (int): Maximum tokens in the response
-            timeout (int): Timeout in seconds
+            timeout (float, optional): Deadline in seconds. Defaults to self.timeout
             
         Returns:
             str: Claude's answer
+            
+        Raises:
+            ClaudeClientError: The request failed after any retries, so there is no
+                               answer to show or send
         """
-        # Create appropriate system prompt based on question type
-        if question_type == "multiple_choice":
-            system_prompt = (
-                "You are helping answer a multiple-choice quiz question. "
-                "Analyze the question carefully, determine the correct answer choice, "
-                "and explain your reasoning. If the answer is clearly one of the provided options, "
-                "indicate which option (A, B, C, D, etc.) is correct at the start of your response."
-            )
-        else:
-            system_prompt = (
-                "You are helping answer a short-answer quiz question. "
-                "Analyze the question carefully and provide a concise but thorough answer. "
-                "Make sure to directly address what the question is asking."
-            )
-        
-        # Set up timeout with a timestamp
         start_time = time.time()
         
         try:
-            # Create the message
-            response = self.client.messages.create(
-                model="claude-3-opus-20240229",  # Or other appropriate model
-                max_tokens=max_tokens,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": question_text}
-                ]
-            )
-            
-            # Extract the answer text
-            answer = response.content[0].text
-            return answer
+            return self.get_answer(question_text, question_type, max_tokens, timeout=timeout).text
             
-        except anthropic.APIError as e:
-            return f"API Error: {str(e)}"
-        except anthropic.APIConnectionError as e:
-            return f"Connection Error: {str(e)}"
+        except ClaudeClientError:
+            raise
         except anthropic.RateLimitError as e:
-            return f"Rate Limit Error: {str(e)}"
-        except anthropic.APITimeoutError as e:
-            return f"Timeout Error: {str(e)}"
-        except Exception as e:
-            return f"Unexpected error: {str(e)}"
+            raise ClaudeClientError(f"Rate Limit Error: {str(e)}") from e
+        except anthropic.APIConnectionError as e:
+            raise ClaudeClientError(f"Connection Error: {str(e)}") from e
+        except anthropic.APIError as e:
+            raise ClaudeClientError(f"API Error: {str(e)}") from e
         finally:
             # Log the time it took to get a response
             elapsed_time = time.time() - start_time
             print(f"Claude API call took {elapsed_time:.2f} seconds")
+    
+    def get_answer(self, question_text, question_type="multiple_choice", max_tokens=1000, timeout=None,
+                   cancel_event=None):
+        """
+        Send a question to Claude and get the answer with its token usage
+        
+        The request waits for rate limit budget, and throttled or transient
+        failures are retried with backoff while the deadline allows. The last
+        API error is raised once retries run out; RequestTimedOut is raised
+        when the deadline passes.
+        
+        Args:
+            question_text (str): The question text to send
+            question_type (str): Either "multiple_choice" or "short_answer"
+            max_tokens (int): Maximum tokens in the response
+            timeout (float, optional): Deadline in seconds, from the moment the rate limit
+                                       budget admits the request. Defaults to self.timeout
+            cancel_event (threading.Event, optional): Set to stop waiting for budget or a retry
+            
+        Returns:
+            ClaudeAnswer: The answer, usage and latency
+        """
+        template = self.prompts.get(question_type)
+        start_time = time.perf_counter()
+        
+        # Return a cached answer without calling the API
+        cache_key, cached_answer = self._lookup_cache(question_text, question_type, template.fingerprint)
+        if cached_answer is not None:
+            return ClaudeAnswer(cached_answer, self.model, latency=time.perf_counter() - start_time,
+                                cached=True, attempts=0)
+        
+        response, attempts = self._create_message(template, question_text, max_tokens, timeout, cancel_event)
+        cache_read_tokens, cache_write_tokens = self._record_usage(response.usage)
+        
+        # Extract the answer text
+        answer = response.content[0].text
+        self._store_cache(cache_key, answer)
+        return ClaudeAnswer(
+            answer, response.model,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+            latency=time.perf_counter() - start_time,
+            attempts=attempts,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+        )
+    
+    def get_structured_answer(self, question_text, question_type="multiple_choice",
+                              max_tokens=None, timeout=None, cancel_event=None):
+        """
+        Send a question to Claude and get the answer as structured fields
+        
+        Claude is made to call the answer tool (see ANSWER_TOOL), so the reply
+        is a small JSON object instead of prose. Waiting, retries and errors
+        work like get_answer.
+        
+        Args:
+            question_text (str): The question text to send
+            question_type (str): Either "multiple_choice" or "short_answer"
+            max_tokens (int, optional): Maximum tokens in the response. Defaults to
+                                        STRUCTURED_MAX_TOKENS; the tool call needs far
+                                        fewer than a prose answer
+            timeout (float, optional): Deadline in seconds. Defaults to self.timeout
+            cancel_event (threading.Event, optional): Set to stop waiting for budget or a retry
+            
+        Returns:
+            StructuredAnswer: The letter, confidence and rationale with usage and latency
             
-            # If we've exceeded the timeout, return an error
-            if elapsed_time > timeout:
-                return "Request timed out. Claude did not respond within the expected time."
\ No newline at end of file
+        Raises:
+            ClaudeClientError: Claude answered without calling the tool
+        """
+        template = self.prompts.get(question_type)
+        start_time = time.perf_counter()
+        
+        cache_key, cached_answer = self._lookup_cache(question_text, question_type,
+                                                      template.fingerprint + ANSWER_TOOL_FINGERPRINT)
+        if cached_answer is not None:
+            return StructuredAnswer(json.loads(cached_answer), self.model,
+                                    latency=time.perf_counter() - start_time, cached=True, attempts=0)
+        
+        response, attempts = self._create_message(template, question_text,
+                                                  max_tokens or self.STRUCTURED_MAX_TOKENS, timeout, cancel_event,
+                                                  tools=[ANSWER_TOOL], tool_choice=ANSWER_TOOL_CHOICE)
+        cache_read_tokens, cache_write_tokens = self._record_usage(response.usage)
+        
+        fields = tool_input(response, ANSWER_TOOL["name"])
+        self._store_cache(cache_key, json.dumps(fields))
+        return StructuredAnswer(
+            fields, response.model,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+            latency=time.perf_counter() - start_time,
+            attempts=attempts,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+        )
+    
+    def _create_message(self, template, question_text, max_tokens, timeout=None, cancel_event=None, **options):
+        """
+        Send one Messages request, waiting for rate limit budget and retrying transient failures
+        
+        Args:
+            template (PromptTemplate): System prompt and examples
+            question_text (str): The question text to send
+            max_tokens (int): Maximum tokens in the response
+            timeout (float, optional): Deadline in seconds, from the moment the rate limit
+                                       budget admits the request. Defaults to self.timeout
+            cancel_event (threading.Event, optional): Set to stop waiting for budget or a retry
+            **options: Extra request parameters, such as tools
+            
+        Returns:
+            tuple: (Message, attempts)
+            
+        Raises:
+            RequestTimedOut: The deadline passed
+            RequestCancelled: cancel_event was set between attempts
+            anthropic.APIError: The last error once retries run out
+        """
+        timeout = self.timeout if timeout is None else timeout
+        estimated_tokens = self._estimate_tokens(template, question_text, max_tokens)
+        
+        # The deadline starts once the first attempt is admitted
+        deadline = None
+        attempt = 0
+        while True:
+            attempt += 1
+            self._wait_for_admission(estimated_tokens, deadline, cancel_event)
+            if deadline is None:
+                deadline = time.perf_counter() + timeout
+            try:
+                raw_response = self.client.messages.with_raw_response.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    system=template.system_blocks,
+                    messages=template.messages(question_text),
+                    timeout=max(deadline - time.perf_counter(), 0.001),
+                    **options
+                )
+                break
+            except anthropic.APITimeoutError:
+                raise RequestTimedOut(f"Claude did not answer within {timeout:g} seconds")
+            except anthropic.APIError as e:
+                delay = self._retry_delay(e, attempt, estimated_tokens, deadline)
+                if delay is None:
+                    raise
+                if not self._sleep(delay, cancel_event):
+                    raise RequestCancelled("Request cancelled")
+        
+        response = raw_response.parse()
+        self.scheduler.record_response(raw_response.headers, estimated_tokens,
+                                       response.usage.input_tokens + response.usage.output_tokens)
+        return response, attempt
+    
+    def _watch_stream(self, stream, deadline, cancel_event, finished, stopped):
+        """
+        Close a stream once its deadline passes or it is cancelled (runs on a watchdog thread)
+        
+        Closing the response does not wake a read blocked on a stalled
+        connection, so the socket is shut down instead.
+        """
+        while not finished.wait(min(max(deadline - time.perf_counter(), 0), self.WATCHDOG_POLL_SECONDS)):
+            if time.perf_counter() < deadline and (cancel_event is None or not cancel_event.is_set()):
+                continue
+            stopped.set()
+            network_stream = stream.response.extensions.get("network_stream")
+            sock = network_stream.get_extra_info("socket") if network_stream is not None else None
+            try:
+                if sock is not None:
+                    sock.shutdown(socket.SHUT_RDWR)
+                else:
+                    stream.close()
+            except OSError:
+                pass
+            return
+    
+    @staticmethod
+    def _check_stream(deadline, timeout, cancel_event, force=False):
+        """
+        Stop a stream that was cancelled or ran past its deadline
+        
+        Args:
+            force (bool): The watchdog stopped the stream, so raise even if the
+                          deadline only just passed
+        
+        Raises:
+            RequestCancelled: cancel_event is set
+            RequestTimedOut: The deadline passed
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            raise RequestCancelled("Request cancelled")
+        if force or time.perf_counter() > deadline:
+            raise RequestTimedOut(f"Claude did not finish answering within {timeout:g} seconds")
+    
+    def stream_question(self, question_text, question_type="multiple_choice", max_tokens=1000,
+                        timeout=None, cancel_event=None):
+        """
+        Send a question to Claude and yield the answer as it is generated
+        
+        Errors are raised rather than returned as text. Latency metrics are
+        stored in last_stream_metrics once the stream finishes. The stream is
+        closed and RequestTimedOut raised once the deadline passes, or
+        RequestCancelled once cancel_event is set, even while no text arrives
+        (a watchdog thread closes the connection); partial answers are not cached.
+        Like get_answer, the request waits for rate limit budget and is retried
+        on transient failures, as long as no text has been yielded yet.
+        
+        Args:
+            question_text (str): The question text to send
+            question_type (str): Either "multiple_choice" or "short_answer"
+            max_tokens (int): Maximum tokens in the response
+            timeout (float, optional): Deadline in seconds. Defaults to self.timeout
+            cancel_event (threading.Event, optional): Set to stop the request
+            
+        Yields:
+            str: Text deltas of Claude's answer
+        """
+        template = self.prompts.get(question_type)
+        
+        start_time = time.perf_counter()
+        first_token_latency = None
+        output_chars = 0
+        
+        # Replay a cached answer as a single delta
+        cache_key, cached_answer = self._lookup_cache(question_text, question_type, template.fingerprint)
+        if cached_answer is not None:
+            self.last_stream_metrics = StreamMetrics(
+                time.perf_counter() - start_time, time.perf_counter() - start_time, len(cached_answer)
+            )
+            yield cached_answer
+            return
+        
+        timeout = self.timeout if timeout is None else timeout
+        estimated_tokens = self._estimate_tokens(template, question_text, max_tokens)
+        chunks = []
+        
+        # The deadline starts once the first attempt is admitted
+        deadline = None
+        attempt = 0
+        while True:
+            attempt += 1
+            self._wait_for_admission(estimated_tokens, deadline, cancel_event)
+            if deadline is None:
+                deadline = time.perf_counter() + timeout
+            try:
+                with self.client.messages.stream(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    system=template.system_blocks,
+                    messages=template.messages(question_text),
+                    timeout=max(deadline - time.perf_counter(), 0.001)
+                ) as stream:
+                    finished = threading.Event()
+                    stopped = threading.Event()
+                    threading.Thread(target=self._watch_stream, args=(stream, deadline, cancel_event, finished, stopped),
+                                     name="claude-stream-watchdog", daemon=True).start()
+                    try:
+                        for text in stream.text_stream:
+                            # Leaving the block closes the connection, so the rest of the answer is dropped
+                            self._check_stream(deadline, timeout, cancel_event)
+                            if not text:
+                                continue
+                            if first_token_latency is None:
+                                first_token_latency = time.perf_counter() - start_time
+                                print(f"Claude first token after {first_token_latency:.2f} seconds")
+                            output_chars += len(text)
+                            chunks.append(text)
+                            yield text
+                        # A stream the watchdog shut down ends early without an error
+                        if stopped.is_set():
+                            self._check_stream(deadline, timeout, cancel_event, force=True)
+                        usage = stream.get_final_message().usage
+                    except ClaudeClientError:
+                        raise
+                    except Exception:
+                        if stopped.is_set():
+                            self._check_stream(deadline, timeout, cancel_event, force=True)
+                        raise
+                    finally:
+                        finished.set()
+                    self.scheduler.record_response(stream.response.headers, estimated_tokens,
+                                                   usage.input_tokens + usage.output_tokens)
+                    cache_read_tokens, _ = self._record_usage(usage)
+                    if cache_read_tokens:
+                        print(f"Prompt cache hit: {cache_read_tokens} input tokens")
+                break
+            except anthropic.APITimeoutError:
+                raise RequestTimedOut(f"Claude did not answer within {timeout:g} seconds")
+            except anthropic.APIError as e:
+                # Text already shown cannot be taken back, so only retry before the first delta
+                delay = None if output_chars else self._retry_delay(e, attempt, estimated_tokens, deadline)
+                if delay is None:
+                    raise
+                if not self._sleep(delay, cancel_event):
+                    raise RequestCancelled("Request cancelled")
+        
+        self._store_cache(cache_key, "".join(chunks))
+        self.last_stream_metrics = StreamMetrics(
+            first_token_latency, time.perf_counter() - start_time, output_chars
+        )
+        print(f"Claude stream finished: {self.last_stream_metrics}")
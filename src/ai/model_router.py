@@ -0,0 +1,347 @@
+import os
+import re
+import time
+from dotenv import load_dotenv
+from ai.claude_client import ClaudeAnswer, ClaudeClient, RequestCancelled, RequestTimedOut, StreamMetrics
+from ai.prompt_registry import PromptRegistry
+
+# Appended to the system prompts of every tier that may be escalated from
+CONFIDENCE_INSTRUCTION = (
+    "\n\nAfter your answer, add one final line of the form \"Confidence: N\", where N is a "
+    "number from 0 to 100 saying how sure you are that the answer is correct."
+)
+
+# The confidence line, as the last non-empty line of an answer
+CONFIDENCE_PATTERN = re.compile(r"\n?[ \t*_]*confidence[ \t*_]*:[ \t*_]*(\d+(?:\.\d+)?)[ \t]*%?[ \t*_.]*\s*$",
+                                re.IGNORECASE)
+
+def parse_confidence(text):
+    """
+    Split the confidence line off an answer
+
+    Args:
+        text (str): Answer text ending with "Confidence: N"
+
+    Returns:
+        tuple: (answer text without the line, confidence from 0 to 1). The
+               confidence is None and the text unchanged when there is no line
+    """
+    match = CONFIDENCE_PATTERN.search(text)
+    if match is None:
+        return text, None
+    confidence = float(match.group(1))
+    if confidence > 1:
+        confidence /= 100
+    return text[:match.start()].rstrip(), min(confidence, 1.0)
+
+class RoutedAnswer(ClaudeAnswer):
+    """A ClaudeAnswer with the routing decision that produced it"""
+
+    def __init__(self, answer, tier, confidence, escalations, latency):
+        super().__init__(answer.text, answer.model, answer.input_tokens, answer.output_tokens, latency,
+                         answer.cached, answer.attempts, answer.cache_read_tokens, answer.cache_write_tokens)
+        self.tier = tier                # Index of the model that answered (0 is the fast model)
+        self.confidence = confidence    # Reported confidence from 0 to 1 (None if not parsed or last tier)
+        self.escalations = escalations  # Models tried before the one that answered
+
+    def __str__(self):
+        return f"tier {self.tier}, {super().__str__()}"
+
+class ModelRouter:
+    """
+    Sends questions to a fast model first and escalates only when needed
+
+    Every tier but the last is asked to end its answer with a confidence
+    line. An answer at or above the threshold is returned as is; a low
+    confidence, a missing confidence line or a failed request moves the
+    question to the next (larger) model. The last tier gets the plain
+    prompts, so its answers can be streamed and cached like before.
+    Structured answers carry their confidence in the answer tool, so every
+    tier asks for them with the plain prompts.
+
+    The router has the same get_answer / ask_question / stream_question
+    methods as ClaudeClient and can be used in its place.
+    """
+
+    DEFAULT_MODELS = ("claude-3-haiku-20240307", ClaudeClient.DEFAULT_MODEL)
+    DEFAULT_THRESHOLD = 0.8  # Lowest confidence (0 to 1) accepted without escalating
+
+    def __init__(self, models=None, threshold=None, api_key=None, answer_cache=None, timeout=None,
+                 scheduler=None, prompts=None):
+        """
+        Initialize the ModelRouter
+
+        Args:
+            models (list, optional): Models from fastest to most capable. Defaults to
+                                     CLAUDE_ROUTER_MODELS (comma-separated) or DEFAULT_MODELS
+            threshold (float, optional): Confidence needed to accept an answer without
+                                         escalating, from 0 to 1 (or a percentage). Defaults to
+                                         CLAUDE_ROUTER_THRESHOLD or DEFAULT_THRESHOLD
+            api_key (str, optional): Claude API key
+            answer_cache (AnswerCache, optional): Cache shared by the tiers
+            timeout (float, optional): Default deadline for a question, shared by the tiers
+                                       it goes through
+            scheduler (RequestScheduler, optional): Rate limit budgets shared by the tiers
+            prompts (PromptRegistry, optional): Prompts for the last tier and for structured
+                                                answers; the other tiers get copies with the
+                                                confidence instruction
+        """
+        # Load environment variables
+        load_dotenv()
+
+        if models is None:
+            models = [model.strip() for model in os.getenv("CLAUDE_ROUTER_MODELS", "").split(",") if model.strip()]
+        self.models = list(models or self.DEFAULT_MODELS)
+
+        threshold = threshold if threshold is not None else os.getenv("CLAUDE_ROUTER_THRESHOLD")
+        self.threshold = float(threshold if threshold is not None else self.DEFAULT_THRESHOLD)
+        if self.threshold > 1:
+            self.threshold /= 100
+
+        prompts = prompts or PromptRegistry.shared()
+        confidence_prompts = self._confidence_prompts(prompts)
+
+        # One client per tier; only the last one answers without a confidence line
+        self.clients = []
+        for index, model in enumerate(self.models):
+            last = index == len(self.models) - 1
+            self.clients.append(ClaudeClient(api_key=api_key, model=model, answer_cache=answer_cache,
+                                             timeout=timeout, scheduler=scheduler,
+                                             prompts=prompts if last else confidence_prompts))
+
+        # Structured answers use the plain prompts on every tier
+        self.structured_clients = [
+            ClaudeClient(api_key=api_key, model=model, answer_cache=answer_cache, timeout=timeout,
+                         scheduler=scheduler, prompts=prompts)
+            for model in self.models[:-1]
+        ] + self.clients[-1:]
+
+        self.model = self.models[0]
+        self.timeout = self.clients[0].timeout
+        self.last_stream_metrics = None
+
+        # Questions answered per tier this session
+        self.answered_by = [0] * len(self.models)
+
+    @staticmethod
+    def _confidence_prompts(prompts):
+        """Copy a registry's templates with the confidence instruction added"""
+        confidence_prompts = PromptRegistry(cache_prompts=prompts.cache_prompts)
+        for question_type, template in prompts.templates.items():
+            confidence_prompts.register(question_type, template.system_text + CONFIDENCE_INSTRUCTION,
+                                        template.examples)
+        return confidence_prompts
+
+    def _log_tier(self, tier, confidence, escalations):
+        """Count and log the tier that answered"""
+        self.answered_by[tier] += 1
+        details = [self.models[tier]]
+        if confidence is not None:
+            details.append(f"confidence {confidence:.0%}")
+        if escalations:
+            details.append(f"escalated from {', '.join(escalations)}")
+        print(f"Answered by tier {tier} ({'; '.join(details)})")
+
+    def _record(self, tier, answer, confidence, escalations, start_time):
+        """Log which tier answered and wrap its answer"""
+        self._log_tier(tier, confidence, escalations)
+        return RoutedAnswer(answer, tier, confidence, escalations, time.perf_counter() - start_time)
+
+    def _deadline(self, timeout):
+        """Deadline shared by every tier a question goes through"""
+        return time.perf_counter() + (self.timeout if timeout is None else timeout)
+
+    @staticmethod
+    def _remaining(deadline):
+        """
+        Seconds left for the next tier
+
+        Raises:
+            RequestTimedOut: The deadline passed during earlier tiers
+        """
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise RequestTimedOut("The deadline passed before a confident answer arrived")
+        return remaining
+
+    def _try_fast_tiers(self, question_text, question_type, max_tokens, deadline, cancel_event=None):
+        """
+        Ask every tier but the last until one is confident enough
+
+        Returns:
+            tuple: (tier, answer, confidence, escalations). answer is None if every
+                   fast tier escalated
+        """
+        escalations = []
+        for tier, client in enumerate(self.clients[:-1]):
+            if cancel_event is not None and cancel_event.is_set():
+                raise RequestCancelled("Request cancelled")
+            try:
+                answer = client.get_answer(question_text, question_type, max_tokens,
+                                           timeout=self._remaining(deadline), cancel_event=cancel_event)
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                print(f"Tier {tier} ({client.model}) failed ({type(e).__name__}: {str(e)}), escalating")
+                escalations.append(client.model)
+                continue
+
+            text, confidence = parse_confidence(answer.text)
+            if confidence is not None and confidence >= self.threshold:
+                answer.text = text
+                return tier, answer, confidence, escalations
+
+            reason = "no confidence line" if confidence is None else f"confidence {confidence:.0%}"
+            print(f"Tier {tier} ({client.model}) answered with {reason}, escalating")
+            escalations.append(client.model)
+        return None, None, None, escalations
+
+    def get_answer(self, question_text, question_type="multiple_choice", max_tokens=1000, timeout=None):
+        """
+        Get an answer from the cheapest tier that is confident enough
+
+        Args:
+            question_text (str): The question text to send
+            question_type (str): Either "multiple_choice" or "short_answer"
+            max_tokens (int): Maximum tokens in the response
+            timeout (float, optional): Deadline in seconds for all tiers together.
+                                       Defaults to self.timeout
+
+        Returns:
+            RoutedAnswer: The answer (without the confidence line), its tier and the
+                          usage and latency of the tier that answered
+        """
+        start_time = time.perf_counter()
+        deadline = self._deadline(timeout)
+        tier, answer, confidence, escalations = self._try_fast_tiers(question_text, question_type,
+                                                                     max_tokens, deadline)
+        if answer is None:
+            tier = len(self.clients) - 1
+            answer = self.clients[tier].get_answer(question_text, question_type, max_tokens,
+                                                   timeout=self._remaining(deadline))
+        return self._record(tier, answer, confidence, escalations, start_time)
+
+    def get_structured_answer(self, question_text, question_type="multiple_choice", max_tokens=None,
+                              timeout=None):
+        """
+        Get a structured answer, escalating on its confidence field
+
+        Every tier uses the plain prompts and the answer tool, whose confidence
+        field replaces the confidence line; the last tier's answer is returned
+        whatever its confidence.
+
+        Args:
+            question_text (str): The question text to send
+            question_type (str): Either "multiple_choice" or "short_answer"
+            max_tokens (int, optional): Maximum tokens in each response
+            timeout (float, optional): Deadline in seconds for all tiers together
+
+        Returns:
+            RoutedAnswer: The answer and its tier; letter, rationale and short_answer
+                          are copied from the StructuredAnswer
+        """
+        start_time = time.perf_counter()
+        deadline = self._deadline(timeout)
+        escalations = []
+        for tier, client in enumerate(self.structured_clients):
+            last = tier == len(self.structured_clients) - 1
+            try:
+                answer = client.get_structured_answer(question_text, question_type, max_tokens,
+                                                      timeout=self._remaining(deadline))
+            except Exception as e:
+                if last:
+                    raise
+                print(f"Tier {tier} ({client.model}) failed ({type(e).__name__}: {str(e)}), escalating")
+                escalations.append(client.model)
+                continue
+
+            if last or (answer.confidence is not None and answer.confidence >= self.threshold):
+                routed = self._record(tier, answer, answer.confidence, escalations, start_time)
+                routed.letter = answer.letter
+                routed.rationale = answer.rationale
+                routed.short_answer = answer.short_answer
+                return routed
+
+            reason = "no confidence" if answer.confidence is None else f"confidence {answer.confidence:.0%}"
+            print(f"Tier {tier} ({client.model}) answered with {reason}, escalating")
+            escalations.append(client.model)
+
+    def ask_question(self, question_text, question_type="multiple_choice", max_tokens=1000, timeout=None):
+        """
+        Send a question through the tiers and get the answer text
+
+        Args:
+            question_text (str): The question text to send
+            question_type (str): Either "multiple_choice" or "short_answer"
+            max_tokens (int): Maximum tokens in the response
+            timeout (float, optional): Deadline in seconds for all tiers together
+
+        Returns:
+            str: The answer
+
+        Raises:
+            ClaudeClientError: The last tier failed, so there is no answer
+        """
+        start_time = time.perf_counter()
+        deadline = self._deadline(timeout)
+        tier, answer, confidence, escalations = self._try_fast_tiers(question_text, question_type,
+                                                                     max_tokens, deadline)
+        if answer is not None:
+            self._record(tier, answer, confidence, escalations, start_time)
+            return answer.text
+
+        text = self.clients[-1].ask_question(question_text, question_type, max_tokens,
+                                             timeout=self._remaining(deadline))
+        self._log_tier(len(self.clients) - 1, None, escalations)
+        return text
+
+    def stream_question(self, question_text, question_type="multiple_choice", max_tokens=1000,
+                        timeout=None, cancel_event=None):
+        """
+        Yield the answer of the cheapest tier that is confident enough
+
+        A confident fast answer is complete before it can be judged, so it is
+        yielded as one delta. Escalated questions stream from the last tier.
+
+        Args:
+            question_text (str): The question text to send
+            question_type (str): Either "multiple_choice" or "short_answer"
+            max_tokens (int): Maximum tokens in the response
+            timeout (float, optional): Deadline in seconds for all tiers together
+            cancel_event (threading.Event, optional): Set to stop the request
+
+        Yields:
+            str: Text deltas of the answer
+        """
+        start_time = time.perf_counter()
+        deadline = self._deadline(timeout)
+        tier, answer, confidence, escalations = self._try_fast_tiers(question_text, question_type,
+                                                                     max_tokens, deadline, cancel_event)
+        if answer is not None:
+            self._record(tier, answer, confidence, escalations, start_time)
+            latency = time.perf_counter() - start_time
+            self.last_stream_metrics = StreamMetrics(latency, latency, len(answer.text))
+            yield answer.text
+            return
+
+        last = self.clients[-1]
+        yield from last.stream_question(question_text, question_type, max_tokens,
+                                        timeout=self._remaining(deadline), cancel_event=cancel_event)
+        # Include the time spent on the tiers that escalated
+        metrics = last.last_stream_metrics
+        escalation_time = time.perf_counter() - start_time - metrics.total_latency
+        first_token_latency = None
+        if metrics.first_token_latency is not None:
+            first_token_latency = metrics.first_token_latency + escalation_time
+        self.last_stream_metrics = StreamMetrics(first_token_latency, metrics.total_latency + escalation_time,
+                                                 metrics.output_chars)
+        self._log_tier(len(self.clients) - 1, None, escalations)
+
+    def stats(self):
+        """
+        Get how many questions each tier answered
+
+        Returns:
+            dict: Model name to questions answered
+        """
+        return dict(zip(self.models, self.answered_by))
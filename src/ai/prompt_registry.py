@@ -0,0 +1,233 @@
+import os
+import json
+import threading
+from dotenv import load_dotenv
+
+MULTIPLE_CHOICE_PROMPT = (
+    "You are helping answer a multiple-choice quiz question. "
+    "Analyze the question carefully, determine the correct answer choice, "
+    "and explain your reasoning. If the answer is clearly one of the provided options, "
+    "indicate which option (A, B, C, D, etc.) is correct at the start of your response."
+)
+
+SHORT_ANSWER_PROMPT = (
+    "You are helping answer a short-answer quiz question. "
+    "Analyze the question carefully and provide a concise but thorough answer. "
+    "Make sure to directly address what the question is asking."
+)
+
+# Tool Claude is made to call for structured answers, so the reply is a
+# small JSON object that needs no text scraping
+ANSWER_TOOL = {
+    "name": "record_answer",
+    "description": "Record the answer to the quiz question.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "letter": {
+                "type": "string",
+                "description": "Letter of the correct option (A, B, C, ...), or an empty string "
+                               "if the question has no options",
+            },
+            "answer": {
+                "type": "string",
+                "description": "The answer in a few words, for questions without options",
+            },
+            "confidence": {
+                "type": "number",
+                "description": "Probability from 0 to 1 that the answer is correct",
+            },
+            "rationale": {
+                "type": "string",
+                "description": "One short sentence explaining the answer",
+            },
+        },
+        "required": ["letter", "confidence", "rationale"],
+    },
+}
+ANSWER_TOOL_CHOICE = {"type": "tool", "name": ANSWER_TOOL["name"]}
+
+# Added to the prompt fingerprint of structured answers, so their cache
+# entries never mix with prose answers
+ANSWER_TOOL_FINGERPRINT = "\n" + json.dumps(ANSWER_TOOL, sort_keys=True)
+
+class PromptTemplate:
+    """
+    A system prompt and optional few-shot examples, built once into request blocks
+
+    With caching on, the system block and the last example carry an
+    ephemeral cache_control marker, so the API can reuse the processed
+    prefix across requests. Prefixes shorter than the model's minimum
+    cacheable length (1024-2048 tokens) are processed normally; the markers
+    start paying off once few-shot examples make the prefix long enough.
+    """
+
+    def __init__(self, name, system_text, examples=None, cache=True):
+        """
+        Initialize the PromptTemplate
+
+        Args:
+            name (str): Template name (the question type)
+            system_text (str): System prompt
+            examples (list, optional): (question, answer) pairs sent before the question
+            cache (bool): Mark the prefix for prompt caching
+        """
+        self.name = name
+        self.system_text = system_text
+        self.examples = list(examples or [])
+        self.cache = cache
+
+        # Identifies the prompt in answer cache keys; the plain system text when
+        # there are no examples, so existing cache entries stay valid
+        self.fingerprint = system_text
+        if self.examples:
+            self.fingerprint += "\n" + json.dumps(self.examples)
+
+        # Characters in the prefix, for token estimates
+        self.prefix_chars = len(system_text) + sum(len(question) + len(answer) for question, answer in self.examples)
+
+        # Built once and shared by every request; the API never modifies them
+        self.system_blocks = self._build_system_blocks()
+        self.example_messages = self._build_example_messages()
+
+    def _build_system_blocks(self):
+        block = {"type": "text", "text": self.system_text}
+        if self.cache:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+
+    def _build_example_messages(self):
+        messages = []
+        for index, (question, answer) in enumerate(self.examples):
+            answer_block = {"type": "text", "text": answer}
+            # One breakpoint after the last example caches the whole prefix
+            if self.cache and index == len(self.examples) - 1:
+                answer_block["cache_control"] = {"type": "ephemeral"}
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": [answer_block]})
+        return messages
+
+    def messages(self, question_text):
+        """
+        Build the messages for a question
+
+        Args:
+            question_text (str): The question
+
+        Returns:
+            list: The few-shot examples followed by the question
+        """
+        return self.example_messages + [{"role": "user", "content": question_text}]
+
+class PromptRegistry:
+    """Prompt templates per question type, shared by the Claude clients"""
+
+    DEFAULT_QUESTION_TYPE = "short_answer"
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, cache_prompts=None):
+        """
+        Initialize the PromptRegistry with the built-in templates
+
+        Args:
+            cache_prompts (bool, optional): Mark prompts for prompt caching. Defaults to
+                                            CLAUDE_PROMPT_CACHE (on)
+        """
+        # Load environment variables
+        load_dotenv()
+
+        if cache_prompts is None:
+            cache_prompts = os.getenv("CLAUDE_PROMPT_CACHE", "true").lower() not in ("0", "false", "no")
+        self.cache_prompts = cache_prompts
+
+        self.templates = {}
+        self.register("multiple_choice", MULTIPLE_CHOICE_PROMPT)
+        self.register("short_answer", SHORT_ANSWER_PROMPT)
+
+    @classmethod
+    def shared(cls):
+        """
+        Get the registry shared by every client in the process
+
+        Returns:
+            PromptRegistry: The shared registry
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def register(self, question_type, system_text, examples=None):
+        """
+        Add or replace the template for a question type
+
+        Args:
+            question_type (str): Question type the template answers
+            system_text (str): System prompt
+            examples (list, optional): (question, answer) few-shot pairs
+
+        Returns:
+            PromptTemplate: The new template
+        """
+        template = PromptTemplate(question_type, system_text, examples, cache=self.cache_prompts)
+        self.templates[question_type] = template
+        return template
+
+    def get(self, question_type):
+        """
+        Get the template for a question type
+
+        Args:
+            question_type (str): e.g. "multiple_choice" or "short_answer"
+
+        Returns:
+            PromptTemplate: The template (the short-answer one for unknown types)
+        """
+        return self.templates.get(question_type) or self.templates[self.DEFAULT_QUESTION_TYPE]
+
+class PromptCacheStats:
+    """Prompt cache usage totals reported by the API"""
+
+    def __init__(self):
+        self.requests = 0
+        self.input_tokens = 0        # Uncached input tokens
+        self.cache_read_tokens = 0   # Input tokens served from the prompt cache
+        self.cache_write_tokens = 0  # Input tokens written to the prompt cache
+        self.lock = threading.Lock()
+
+    def record(self, usage):
+        """
+        Add the usage of one response
+
+        Args:
+            usage: The response's usage object
+
+        Returns:
+            tuple: (cache_read_tokens, cache_write_tokens) of this response
+        """
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        with self.lock:
+            self.requests += 1
+            self.input_tokens += usage.input_tokens
+            self.cache_read_tokens += cache_read
+            self.cache_write_tokens += cache_write
+        return cache_read, cache_write
+
+    def hit_rate(self):
+        """
+        Get the share of prompt tokens served from the cache
+
+        Returns:
+            float: Cached input tokens over all input tokens (0 before any request)
+        """
+        with self.lock:
+            total = self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+            return self.cache_read_tokens / total if total else 0.0
+
+    def __str__(self):
+        return (f"{self.requests} requests, {self.cache_read_tokens} cached / "
+                f"{self.cache_write_tokens} written / {self.input_tokens} uncached input tokens "
+                f"({self.hit_rate():.0%} from cache)")
@@ -0,0 +1,303 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import anthropic
+from dotenv import load_dotenv
+
+class TokenBucket:
+    """Budget that refills continuously, for requests or tokens per minute"""
+
+    def __init__(self, per_minute):
+        """
+        Initialize the TokenBucket
+
+        Args:
+            per_minute (float): Budget per minute; also the burst size
+        """
+        self.capacity = float(per_minute)
+        self.refill_per_second = self.capacity / 60
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        """
+        Seconds until the budget covers an amount (0 if it already does)
+
+        A request larger than the whole bucket only needs a full bucket.
+        """
+        with self.lock:
+            self._refill()
+            needed = min(amount, self.capacity)
+            return max(0.0, (needed - self.level) / self.refill_per_second)
+
+    def take(self, amount):
+        """Remove an amount from the budget (the level may go below zero)"""
+        with self.lock:
+            self._refill()
+            self.level -= amount
+
+    def refund(self, amount):
+        """Give back a reservation that was not (fully) used"""
+        with self.lock:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+    def pause(self, seconds):
+        """Admit nothing for the given time (the server asked us to back off)"""
+        with self.lock:
+            self._refill()
+            self.level = min(self.level, -seconds * self.refill_per_second)
+
+    def configure(self, per_minute, remaining=None):
+        """
+        Adopt the limit reported by the server
+
+        Args:
+            per_minute (float): Budget per minute
+            remaining (float, optional): Budget the server says is left. Requests
+                                         still in flight are not counted there yet,
+                                         so the lower of the two levels is kept
+        """
+        with self.lock:
+            self._refill()
+            per_minute = float(per_minute)
+            if per_minute != self.capacity:
+                self.level += per_minute - self.capacity
+                self.capacity = per_minute
+                self.refill_per_second = per_minute / 60
+            if remaining is not None:
+                self.level = min(self.level, float(remaining))
+
+class RequestScheduler:
+    """
+    Admission control and retry policy shared by all Claude clients
+
+    Requests-per-minute and tokens-per-minute budgets start from
+    CLAUDE_REQUESTS_PER_MINUTE / CLAUDE_TOKENS_PER_MINUTE and follow the
+    anthropic-ratelimit-* headers of every response. Throttled, overloaded
+    and dropped requests are retried with jittered exponential backoff,
+    honoring retry-after. The scheduler only does the accounting; clients
+    wait for admission and back off themselves, so the same scheduler works
+    for threads and for event loops.
+    """
+
+    # Longest single sleep while waiting for budget, so waiters notice new limits from headers
+    ADMISSION_POLL_SECONDS = 1.0
+
+    DEFAULT_REQUESTS_PER_MINUTE = 50
+    DEFAULT_TOKENS_PER_MINUTE = 40000
+    DEFAULT_MAX_RETRIES = 5
+    BASE_DELAY = 1.0   # Backoff before the first retry, in seconds (doubles each attempt)
+    MAX_DELAY = 60.0   # Longest backoff between attempts
+
+    # Status codes worth retrying: timeout, lock conflict, rate limit, server errors and overload
+    RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504, 529)
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, max_retries=None):
+        """
+        Initialize the RequestScheduler
+
+        Args:
+            requests_per_minute (float, optional): Initial request budget. Defaults to
+                                                   CLAUDE_REQUESTS_PER_MINUTE or DEFAULT_REQUESTS_PER_MINUTE
+            tokens_per_minute (float, optional): Initial token budget. Defaults to
+                                                 CLAUDE_TOKENS_PER_MINUTE or DEFAULT_TOKENS_PER_MINUTE
+            max_retries (int, optional): Retries per request. Defaults to
+                                         CLAUDE_MAX_RETRIES or DEFAULT_MAX_RETRIES
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.requests = TokenBucket(requests_per_minute or os.getenv("CLAUDE_REQUESTS_PER_MINUTE")
+                                    or self.DEFAULT_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(tokens_per_minute or os.getenv("CLAUDE_TOKENS_PER_MINUTE")
+                                  or self.DEFAULT_TOKENS_PER_MINUTE)
+        max_retries = max_retries if max_retries is not None else os.getenv("CLAUDE_MAX_RETRIES")
+        self.max_retries = int(max_retries if max_retries is not None else self.DEFAULT_MAX_RETRIES)
+
+        # Admission checks both budgets at once
+        self.lock = threading.Lock()
+
+        # Counters for this session
+        self.retries = 0
+        self.throttled = 0
+
+    @classmethod
+    def shared(cls):
+        """
+        Get the scheduler shared by every client in the process
+
+        Rate limits apply to the API key, so clients should share one budget.
+
+        Returns:
+            RequestScheduler: The shared scheduler
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def estimate_tokens(text, max_tokens):
+        """
+        Rough token cost of a request, counted against the token budget until the real usage is known
+
+        Args:
+            text (str): Prompt text (system prompt and question)
+            max_tokens (int): Output token limit
+
+        Returns:
+            int: Estimated input tokens (about 4 characters each) plus max_tokens
+        """
+        return len(text) // 4 + max_tokens
+
+    def admit(self, estimated_tokens):
+        """
+        Take budget for one request if both budgets allow it
+
+        Callers that get a wait time sleep for (at most ADMISSION_POLL_SECONDS
+        of) it and ask again, so limits learned in the meantime take effect.
+
+        Args:
+            estimated_tokens (int): Tokens the request is expected to use
+
+        Returns:
+            float: 0 if the request may be sent now, otherwise seconds until it might be
+        """
+        with self.lock:
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+            if wait == 0:
+                self.requests.take(1)
+                self.tokens.take(estimated_tokens)
+            return wait
+
+    def record_response(self, headers, estimated_tokens=0, used_tokens=None):
+        """
+        Update the budgets from a response
+
+        Args:
+            headers (Mapping): Response headers
+            estimated_tokens (int): Tokens reserved for the request
+            used_tokens (int, optional): Tokens the request actually used
+        """
+        if used_tokens is not None and used_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - used_tokens)
+
+        if headers is None:
+            return
+        requests_limit = _header_number(headers, "anthropic-ratelimit-requests-limit")
+        if requests_limit:
+            self.requests.configure(requests_limit,
+                                    _header_number(headers, "anthropic-ratelimit-requests-remaining"))
+        # Older accounts report one token limit, newer ones separate input and output limits
+        for prefix in ("anthropic-ratelimit-tokens", "anthropic-ratelimit-input-tokens"):
+            tokens_limit = _header_number(headers, prefix + "-limit")
+            if tokens_limit:
+                self.tokens.configure(tokens_limit, _header_number(headers, prefix + "-remaining"))
+                break
+
+    def should_retry(self, error, attempt):
+        """
+        Check if a failed request should be tried again
+
+        Args:
+            error (Exception): The error the attempt raised
+            attempt (int): Number of attempts already made, starting at 1
+
+        Returns:
+            bool: True if the error is transient and retries are left
+        """
+        if attempt > self.max_retries:
+            return False
+        if isinstance(error, anthropic.APIConnectionError):
+            return True
+        if isinstance(error, anthropic.APIStatusError):
+            return error.status_code in self.RETRYABLE_STATUS_CODES
+        return False
+
+    def retry_delay(self, error, attempt):
+        """
+        Seconds to wait before retrying
+
+        The server's retry-after wins when present; otherwise the delay is
+        drawn uniformly from [0, BASE_DELAY * 2^(attempt - 1)], capped at
+        MAX_DELAY, so retries from many workers spread out. After a 429 the
+        whole scheduler pauses, so queued requests wait instead of failing too.
+
+        Args:
+            error (Exception): The error the attempt raised
+            attempt (int): Number of attempts already made, starting at 1
+
+        Returns:
+            float: Delay in seconds
+        """
+        self.retries += 1
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = _retry_after_seconds(response.headers)
+
+        if isinstance(error, anthropic.RateLimitError):
+            self.throttled += 1
+            pause = retry_after if retry_after is not None else self.BASE_DELAY * 2 ** (attempt - 1)
+            self.requests.pause(min(pause, self.MAX_DELAY))
+
+        if retry_after is not None:
+            return min(retry_after, self.MAX_DELAY)
+        return random.uniform(0, min(self.MAX_DELAY, self.BASE_DELAY * 2 ** (attempt - 1)))
+
+    def stats(self):
+        """
+        Get the current budgets and counters
+
+        Returns:
+            dict: Limits, available budget, retries and throttled responses
+        """
+        return {
+            "requests_per_minute": self.requests.capacity,
+            "tokens_per_minute": self.tokens.capacity,
+            "requests_available": self.requests.level,
+            "tokens_available": self.tokens.level,
+            "retries": self.retries,
+            "throttled": self.throttled,
+        }
+
+def _header_number(headers, name):
+    """Read a numeric header, or None if it is missing or malformed"""
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def _retry_after_seconds(headers):
+    """
+    Parse retry-after as seconds or an HTTP date
+
+    Returns:
+        float or None: Seconds to wait, or None without a usable header
+    """
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
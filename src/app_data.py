@@ -0,0 +1,45 @@
+import os
+import sys
+from dotenv import load_dotenv
+
+APP_NAME = "QuizAnalyzer"
+
+def data_dir():
+    """
+    Get the per-user directory for caches, spools and exported results
+
+    Uses QUIZ_ANALYZER_DATA_DIR if set, otherwise %APPDATA%\\QuizAnalyzer on
+    Windows, ~/Library/Application Support/QuizAnalyzer on macOS and
+    $XDG_DATA_HOME/QuizAnalyzer (~/.local/share/QuizAnalyzer) elsewhere.
+    The directory is created if it does not exist.
+
+    Returns:
+        str: The directory
+    """
+    # Load environment variables
+    load_dotenv()
+
+    path = os.getenv("QUIZ_ANALYZER_DATA_DIR")
+    if not path:
+        if sys.platform == "win32":
+            base = os.getenv("APPDATA") or os.path.expanduser("~")
+        elif sys.platform == "darwin":
+            base = os.path.expanduser("~/Library/Application Support")
+        else:
+            base = os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        path = os.path.join(base, APP_NAME)
+
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def data_path(filename):
+    """
+    Get the default location of a data file
+
+    Args:
+        filename (str): File or folder name
+
+    Returns:
+        str: The path inside data_dir()
+    """
+    return os.path.join(data_dir(), filename)
@@ -0,0 +1,95 @@
+"""
+Capture benchmark: latency and frames per second of each capture backend
+
+Run from the src directory, for example under a virtual X server:
+
+    xvfb-run -s "-screen 0 3840x2160x24" python -m benchmarks.capture_benchmark
+    python -m benchmarks.capture_benchmark --backends mss xshm --frames 50
+"""
+import argparse
+import time
+import numpy as np
+from capture.capture_backends import BACKENDS
+
+DEFAULT_RESOLUTIONS = ["640x480", "1280x720", "1920x1080", "2560x1440", "3840x2160", "full"]
+
+def parse_resolution(text):
+    """
+    Parse a WIDTHxHEIGHT string
+
+    Args:
+        text (str): Resolution such as "1920x1080", or "full" for the whole screen
+
+    Returns:
+        tuple or None: (width, height), or None for the whole screen
+    """
+    if text == "full":
+        return None
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def benchmark_backend(backend, resolution, frames, warmup=3):
+    """
+    Time repeated grabs with one backend at one resolution
+
+    Args:
+        backend (CaptureBackend): The backend to time
+        resolution (tuple or None): (width, height) region from the top-left corner,
+                                    or None for the whole screen
+        frames (int): Number of timed grabs
+        warmup (int): Untimed grabs done first
+
+    Returns:
+        dict: Frame size and latency statistics in milliseconds
+    """
+    bbox = None if resolution is None else (0, 0, resolution[0], resolution[1])
+
+    for _ in range(warmup):
+        frame = backend.grab(bbox)
+
+    timings = []
+    for _ in range(frames):
+        start_time = time.perf_counter()
+        frame = backend.grab(bbox)
+        timings.append(time.perf_counter() - start_time)
+
+    timings_ms = np.array(timings) * 1000
+    return {
+        "size": f"{frame.shape[1]}x{frame.shape[0]}",
+        "mean_ms": float(timings_ms.mean()),
+        "median_ms": float(np.median(timings_ms)),
+        "p95_ms": float(np.percentile(timings_ms, 95)),
+        "fps": float(1000 / timings_ms.mean()),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark screen capture backends")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS),
+                        help="Backends to benchmark (default: all)")
+    parser.add_argument("--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS,
+                        help="Regions as WIDTHxHEIGHT, or 'full' (default: %(default)s)")
+    parser.add_argument("--frames", type=int, default=30, help="Timed grabs per measurement")
+    args = parser.parse_args(argv)
+
+    print(f"{'backend':<8} {'size':>10} {'mean ms':>9} {'median ms':>10} {'p95 ms':>8} {'fps':>7}")
+    for name in args.backends:
+        try:
+            backend = BACKENDS[name]()
+        except Exception as e:
+            print(f"{name:<8} unavailable: {str(e)}")
+            continue
+
+        try:
+            for text in args.resolutions:
+                try:
+                    stats = benchmark_backend(backend, parse_resolution(text), args.frames)
+                except Exception as e:
+                    print(f"{name:<8} {text:>10} failed: {str(e)}")
+                    continue
+                print(f"{name:<8} {stats['size']:>10} {stats['mean_ms']:>9.2f} {stats['median_ms']:>10.2f} "
+                      f"{stats['p95_ms']:>8.2f} {stats['fps']:>7.1f}")
+        finally:
+            backend.close()
+
+if __name__ == "__main__":
+    main()
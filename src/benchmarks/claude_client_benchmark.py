@@ -0,0 +1,86 @@
+"""
+Claude client benchmark: blocking calls against AsyncClaudeClient.ask_many
+
+Starts a local mock of the Messages API (see mock_claude_server.py) and
+answers the same batch of questions three ways: one blocking call at a
+time, a thread pool sharing the synchronous client, and ask_many() on the
+async client. Run from the src directory:
+
+    python -m benchmarks.claude_client_benchmark
+    python -m benchmarks.claude_client_benchmark --questions 200 --concurrency 8 32 --latency 0.5
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ai.async_claude_client import AsyncClaudeClient
+from ai.claude_client import ClaudeClient
+from benchmarks.mock_claude_server import MockClaudeServer
+
+QUESTION_TEXT = ("Question {index}: Which of the following data structures gives O(1) average lookup by key?\n"
+                 "A) A sorted array\nB) A hash table\nC) A balanced binary search tree\nD) A linked list")
+
+def make_questions(count):
+    """Distinct multiple-choice questions, so no two requests are identical"""
+    return [(QUESTION_TEXT.format(index=index), "multiple_choice") for index in range(count)]
+
+def run_sequential(questions):
+    client = ClaudeClient()
+    for question_text, question_type in questions:
+        client.get_answer(question_text, question_type)
+
+def run_thread_pool(questions, concurrency):
+    client = ClaudeClient()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda question: client.get_answer(*question), questions))
+
+def run_async(questions, concurrency):
+    client = AsyncClaudeClient(max_concurrency=concurrency)
+    try:
+        answers = client.ask_many_sync(questions)
+    finally:
+        client.close()
+    errors = [answer for answer in answers if isinstance(answer, Exception)]
+    if errors:
+        raise errors[0]
+
+def measure(server, name, run, question_count):
+    """Time one run and report throughput and connections opened"""
+    server.reset_counts()
+    start_time = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start_time
+    print(f"{name:<28} {elapsed:7.2f} s  {question_count / elapsed:7.1f} questions/s  "
+          f"{server.connections:4d} connection(s)")
+    return elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Claude clients against a local mock server")
+    parser.add_argument("--questions", type=int, default=64, help="Questions per run (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16],
+                        help="In-flight requests for the concurrent runs (default: 16)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Mock server seconds per request")
+    parser.add_argument("--skip-sequential", action="store_true", help="Skip the one-at-a-time baseline")
+    args = parser.parse_args(argv)
+
+    server = MockClaudeServer(latency=args.latency).start()
+    # Point every client created below at the mock server
+    os.environ["ANTHROPIC_BASE_URL"] = server.base_url
+    os.environ.setdefault("ANTHROPIC_API_KEY", "mock")
+
+    questions = make_questions(args.questions)
+    print(f"{args.questions} questions, {args.latency:.2f} s mock latency\n")
+
+    try:
+        if not args.skip_sequential:
+            measure(server, "sequential", lambda: run_sequential(questions), len(questions))
+        for concurrency in args.concurrency:
+            measure(server, f"thread pool ({concurrency})",
+                    lambda: run_thread_pool(questions, concurrency), len(questions))
+            measure(server, f"async ask_many ({concurrency})",
+                    lambda: run_async(questions, concurrency), len(questions))
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Synthetic quiz-screen corpus for OCR, parsing and end-to-end benchmarks
+
+Renders multiple-choice and short-answer questions as full screenshots
+(browser chrome, taskbar, optional sidebar) with varied fonts, sizes,
+themes, noise and resolutions. Every image gets a JSON file with the
+ground truth, and manifest.jsonl lists all items.
+
+Run from the src directory:
+
+    python -m benchmarks.corpus_generator --output corpus --count 200
+    python -m benchmarks.corpus_generator --output corpus --count 50 --resolutions 1920x1080 --themes dark
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import random
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+MULTIPLE_CHOICE_QUESTIONS = [
+    ("What is the capital of Australia?", "Canberra", ["Sydney", "Melbourne", "Perth"]),
+    ("Which planet is known as the Red Planet?", "Mars", ["Venus", "Jupiter", "Mercury"]),
+    ("Which data structure gives O(1) average lookup by key?", "A hash table",
+     ["A sorted array", "A linked list", "A binary heap"]),
+    ("What is the chemical symbol for gold?", "Au", ["Ag", "Gd", "Go"]),
+    ("Who wrote the novel Pride and Prejudice?", "Jane Austen",
+     ["Charlotte Bronte", "Mary Shelley", "George Eliot"]),
+    ("Which HTTP status code means the resource was not found?", "404", ["200", "301", "500"]),
+    ("What is the largest organ of the human body?", "The skin", ["The liver", "The brain", "The lungs"]),
+    ("Which keyword defines a function in Python?", "def", ["func", "function", "lambda"]),
+    ("In which year did the Berlin Wall fall?", "1989", ["1979", "1991", "1985"]),
+    ("What is the time complexity of binary search on a sorted array?", "O(log n)",
+     ["O(n)", "O(n log n)", "O(1)"]),
+    ("Which gas do plants absorb from the atmosphere for photosynthesis?", "Carbon dioxide",
+     ["Oxygen", "Nitrogen", "Hydrogen"]),
+    ("Which SQL clause filters rows after grouping?", "HAVING", ["WHERE", "ORDER BY", "LIMIT"]),
+    ("What is the boiling point of water at sea level in degrees Celsius?", "100", ["90", "110", "120"]),
+    ("Which protocol is used to send email between mail servers?", "SMTP", ["FTP", "SSH", "SNMP"]),
+    ("Which of these numbers is prime?", "29", ["21", "27", "33"]),
+    ("Which ocean lies between Africa and Australia?", "The Indian Ocean",
+     ["The Atlantic Ocean", "The Arctic Ocean", "The Southern Ocean"]),
+]
+
+SHORT_ANSWER_QUESTIONS = [
+    ("Explain the difference between a process and a thread.",
+     "A process has its own address space; threads share the address space of their process."),
+    ("What does the acronym CPU stand for?", "Central Processing Unit"),
+    ("Name the process by which water vapour turns into liquid water.", "Condensation"),
+    ("Briefly describe what a cache is used for in computing.",
+     "A cache stores recently or frequently used data closer to where it is needed to make access faster."),
+    ("Who painted the Mona Lisa?", "Leonardo da Vinci"),
+    ("What is the square root of 144?", "12"),
+    ("Describe one advantage of using version control for source code.",
+     "It keeps the full history of changes so mistakes can be reverted and work can be merged safely."),
+    ("What is the name of the longest river in Africa?", "The Nile"),
+]
+
+# Theme name -> colours of the page, text, browser chrome, taskbar and sidebar
+THEMES = {
+    "light": {"background": (255, 255, 255), "text": (20, 20, 20), "chrome": (222, 225, 230),
+              "chrome_text": (60, 60, 60), "taskbar": (32, 32, 32), "sidebar": (243, 244, 246)},
+    "dark": {"background": (30, 30, 34), "text": (230, 230, 230), "chrome": (53, 54, 58),
+             "chrome_text": (200, 200, 200), "taskbar": (18, 18, 18), "sidebar": (40, 41, 46)},
+    "sepia": {"background": (244, 236, 216), "text": (60, 47, 34), "chrome": (222, 214, 196),
+              "chrome_text": (80, 70, 60), "taskbar": (45, 40, 35), "sidebar": (235, 226, 204)},
+    "blue": {"background": (236, 243, 252), "text": (16, 42, 67), "chrome": (28, 78, 140),
+             "chrome_text": (235, 240, 250), "taskbar": (12, 30, 55), "sidebar": (214, 228, 245)},
+}
+
+RESOLUTIONS = ["1280x720", "1920x1080", "2560x1440", "3840x2160"]
+
+# Choice label formats recognized by TextExtractor.is_multiple_choice
+LABEL_STYLES = ["{}) ", "{}. ", "({}) "]
+
+NOISE_LEVELS = ["none", "gaussian", "jpeg", "blur"]
+
+FONT_FILES = [
+    "arial.ttf", "calibri.ttf", "segoeui.ttf", "verdana.ttf", "times.ttf", "georgia.ttf",
+    "DejaVuSans.ttf", "DejaVuSerif.ttf", "DejaVuSansMono.ttf", "LiberationSans-Regular.ttf",
+    "LiberationSerif-Regular.ttf", "NotoSans-Regular.ttf", "Roboto-Regular.ttf", "Helvetica.ttc",
+]
+
+FONT_DIRS = [
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+    "/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+    "/Library/Fonts", "/System/Library/Fonts",
+]
+
+def find_fonts():
+    """
+    Find the TrueType fonts from FONT_FILES installed on this machine
+
+    Returns:
+        list: Font file paths (empty if none are installed)
+    """
+    wanted = {name.lower() for name in FONT_FILES}
+    fonts = []
+    for font_dir in FONT_DIRS:
+        for path in glob.glob(os.path.join(font_dir, "**", "*.tt[fc]"), recursive=True):
+            if os.path.basename(path).lower() in wanted:
+                fonts.append(path)
+    return sorted(set(fonts))
+
+def parse_resolution(text):
+    """Parse a WIDTHxHEIGHT string into (width, height)"""
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def wrap_text(draw, text, font, max_width):
+    """
+    Break text into lines that fit max_width
+
+    Returns:
+        list: The wrapped lines
+    """
+    lines = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if current and draw.textlength(candidate, font=font) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+class CorpusGenerator:
+    """Renders synthetic quiz screens with ground truth"""
+
+    def __init__(self, seed=0, fonts=None, resolutions=None, themes=None, noise_levels=None):
+        """
+        Initialize the CorpusGenerator
+
+        Args:
+            seed (int): Random seed; the same seed renders the same corpus
+            fonts (list, optional): Font file paths. Defaults to the installed FONT_FILES,
+                                    or Pillow's built-in font if none are installed
+            resolutions (list, optional): WIDTHxHEIGHT strings to choose from
+            themes (list, optional): Theme names from THEMES to choose from
+            noise_levels (list, optional): Noise types from NOISE_LEVELS to choose from
+        """
+        self.seed = seed
+        self.fonts = fonts if fonts is not None else find_fonts()
+        self.resolutions = [parse_resolution(text) for text in (resolutions or RESOLUTIONS)]
+        self.themes = themes or list(THEMES)
+        self.noise_levels = noise_levels or NOISE_LEVELS
+
+    def _load_font(self, path, size):
+        """Load a font, falling back to Pillow's built-in font"""
+        if path:
+            return ImageFont.truetype(path, size)
+        return ImageFont.load_default(size=size)
+
+    def _draw_desktop(self, draw, width, height, theme, rng, font_path):
+        """Draw browser chrome, a taskbar and sometimes a sidebar; returns the free content box"""
+        scale = height / 1080
+        chrome_height = int(88 * scale)
+        taskbar_height = int(48 * scale)
+        small_font = self._load_font(font_path, max(10, int(15 * scale)))
+
+        draw.rectangle((0, 0, width, chrome_height), fill=theme["chrome"])
+        draw.text((int(16 * scale), int(12 * scale)), "Online Quiz - Module 4 Review",
+                  font=small_font, fill=theme["chrome_text"])
+        draw.rounded_rectangle((int(120 * scale), int(48 * scale), int(width * 0.7), int(78 * scale)),
+                               radius=int(12 * scale), fill=theme["background"])
+        draw.text((int(136 * scale), int(54 * scale)), "https://learn.example.edu/quiz/attempt?page=3",
+                  font=small_font, fill=theme["chrome_text"])
+
+        draw.rectangle((0, height - taskbar_height, width, height), fill=theme["taskbar"])
+        draw.text((width - int(90 * scale), height - int(34 * scale)), "10:42 AM",
+                  font=small_font, fill=(220, 220, 220))
+
+        left = 0
+        if rng.random() < 0.5:
+            left = int(width * rng.uniform(0.12, 0.2))
+            draw.rectangle((0, chrome_height, left, height - taskbar_height), fill=theme["sidebar"])
+            for index, item in enumerate(["Dashboard", "Courses", "Grades", "Calendar", "Messages"]):
+                draw.text((int(20 * scale), chrome_height + int((30 + index * 40) * scale)), item,
+                          font=small_font, fill=theme["chrome_text"])
+
+        return left, chrome_height, width, height - taskbar_height
+
+    def _add_noise(self, image, noise, rng):
+        """Degrade the image like a real capture might be"""
+        if noise == "gaussian":
+            pixels = np.asarray(image).astype(np.int16)
+            pixels += np.random.default_rng(rng.randrange(2 ** 32)).normal(0, 8, pixels.shape).astype(np.int16)
+            return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+        if noise == "jpeg":
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=rng.randint(35, 70))
+            buffer.seek(0)
+            return Image.open(buffer).convert("RGB")
+        if noise == "blur":
+            return image.filter(ImageFilter.GaussianBlur(radius=rng.uniform(0.6, 1.2)))
+        return image
+
+    def generate_item(self, index):
+        """
+        Render one quiz screen
+
+        Args:
+            index (int): Item number; with the seed it fixes everything about the item
+
+        Returns:
+            tuple: (PIL.Image, ground truth dict)
+        """
+        rng = random.Random(f"{self.seed}-{index}")
+        width, height = rng.choice(self.resolutions)
+        theme_name = rng.choice(self.themes)
+        theme = THEMES[theme_name]
+        font_path = rng.choice(self.fonts) if self.fonts else None
+        noise = rng.choice(self.noise_levels)
+        font_size = int(rng.choice([18, 20, 22, 24, 28, 32]) * height / 1080)
+
+        image = Image.new("RGB", (width, height), theme["background"])
+        draw = ImageDraw.Draw(image)
+        left, top, right, bottom = self._draw_desktop(draw, width, height, theme, rng, font_path)
+        font = self._load_font(font_path, font_size)
+
+        if rng.random() < 0.7:
+            question, correct_answer, distractors = rng.choice(MULTIPLE_CHOICE_QUESTIONS)
+            options = [correct_answer] + list(distractors)
+            rng.shuffle(options)
+            label_style = rng.choice(LABEL_STYLES)
+            letters = "ABCD"
+            choices = [label_style.format(letter) + option for letter, option in zip(letters, options)]
+            correct = letters[options.index(correct_answer)]
+            question_type = "multiple_choice"
+        else:
+            question, correct_answer = rng.choice(SHORT_ANSWER_QUESTIONS)
+            choices = []
+            correct = None
+            question_type = "short_answer"
+
+        # Question block somewhere in the content area
+        content_width = right - left
+        block_width = int(content_width * rng.uniform(0.45, 0.75))
+        block_left = left + int(rng.uniform(0.05, 0.9) * (content_width - block_width))
+        line_height = int(font_size * 1.5)
+
+        question_lines = wrap_text(draw, f"Question {index % 40 + 1}. {question}", font, block_width)
+        choice_lines = []
+        for choice in choices:
+            choice_lines.extend(wrap_text(draw, choice, font, block_width))
+        block_height = line_height * (len(question_lines) + len(choice_lines)) + line_height
+
+        block_top = top + int(rng.uniform(0.05, 0.6) * max(1, bottom - top - block_height))
+        y = block_top
+        text_box = None
+        lines = question_lines + ([None] + choice_lines if choice_lines else [])
+        for line in lines:
+            # None leaves a blank line between the question and the choices
+            if line is not None:
+                draw.text((block_left, y), line, font=font, fill=theme["text"])
+                box = draw.textbbox((block_left, y), line, font=font)
+                text_box = box if text_box is None else (min(text_box[0], box[0]), min(text_box[1], box[1]),
+                                                         max(text_box[2], box[2]), max(text_box[3], box[3]))
+            y += line_height
+
+        image = self._add_noise(image, noise, rng)
+
+        truth = {
+            "id": f"quiz_{index:05d}",
+            "question": question,
+            "choices": choices,
+            "correct": correct,
+            "answer": correct_answer,
+            "question_type": question_type,
+            "text": "\n".join(question_lines + choice_lines),
+            "region": [text_box[0], text_box[1], text_box[2] - text_box[0], text_box[3] - text_box[1]],
+            "resolution": f"{width}x{height}",
+            "theme": theme_name,
+            "font": os.path.basename(font_path) if font_path else "default",
+            "font_size": font_size,
+            "noise": noise,
+        }
+        return image, truth
+
+    def write(self, output_dir, count, start=0):
+        """
+        Render items and write images, ground truth and a manifest
+
+        Args:
+            output_dir (str): Directory to write to (created if needed)
+            count (int): Number of items
+            start (int): Index of the first item
+
+        Returns:
+            str: Path of manifest.jsonl
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        manifest_path = os.path.join(output_dir, "manifest.jsonl")
+
+        with open(manifest_path, "w", encoding="utf-8") as manifest:
+            for index in range(start, start + count):
+                image, truth = self.generate_item(index)
+                truth["image"] = f"{truth['id']}.png"
+                image.save(os.path.join(output_dir, truth["image"]), format="PNG", compress_level=3)
+                with open(os.path.join(output_dir, f"{truth['id']}.json"), "w", encoding="utf-8") as f:
+                    json.dump(truth, f, indent=2)
+                manifest.write(json.dumps(truth) + "\n")
+
+        return manifest_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a synthetic quiz-screen corpus")
+    parser.add_argument("--output", required=True, help="Directory to write the corpus to")
+    parser.add_argument("--count", type=int, default=100, help="Number of images (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: %(default)s)")
+    parser.add_argument("--resolutions", nargs="+", default=RESOLUTIONS, help="WIDTHxHEIGHT sizes to use")
+    parser.add_argument("--themes", nargs="+", choices=list(THEMES), default=list(THEMES))
+    parser.add_argument("--noise", nargs="+", choices=NOISE_LEVELS, default=NOISE_LEVELS)
+    args = parser.parse_args(argv)
+
+    generator = CorpusGenerator(seed=args.seed, resolutions=args.resolutions,
+                                themes=args.themes, noise_levels=args.noise)
+    if not generator.fonts:
+        print("No TrueType fonts found, using Pillow's built-in font")
+
+    manifest_path = generator.write(args.output, args.count)
+    print(f"Wrote {args.count} images to {args.output} (manifest: {manifest_path})")
+
+if __name__ == "__main__":
+    main()
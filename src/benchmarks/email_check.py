@@ -0,0 +1,67 @@
+"""
+Email check: send one quiz answer to a local SMTP sink
+
+Points an EmailSender at a local SMTP sink (see smtp_sink.py) and checks
+that the message arrives, so it needs no mail account or network. The
+exit status is 1 if the message did not arrive. Run from the src directory:
+
+    python -m benchmarks.email_check
+    python -m benchmarks.email_check --recipient test@example.com --attachment-kb 100
+
+Requires aiosmtpd (pip install aiosmtpd).
+"""
+import argparse
+import sys
+from benchmarks.export_benchmark import make_attachment
+from benchmarks.smtp_sink import SmtpSink
+from export.email_sender import EmailSender
+
+def check_email_sender(recipient="quiz@example.com", image_data=None):
+    """
+    Send a sample quiz answer to a local SMTP sink
+
+    Args:
+        recipient (str, optional): Address to send the test message to
+        image_data (bytes, optional): Screenshot to attach
+
+    Returns:
+        bool: True if the sink received the message
+    """
+    sink = SmtpSink().start()
+    try:
+        # Create the sender, pointed at the sink
+        sender = EmailSender("tester@example.com", "unused", **sink.sender_options())
+
+        # Sample data
+        question = "What is the capital of France?"
+        answer = "The capital of France is Paris."
+
+        # Send a test email
+        with sender:
+            success, message = sender.send_quiz_answer(recipient, question, answer, image_data=image_data)
+        received = sink.last_message()
+        success = success and received is not None and received["To"] == recipient
+
+        # Print result
+        print(f"Result: {'Success' if success else 'Failed'}")
+        print(f"Message: {message}")
+
+        return success
+
+    except Exception as e:
+        print(f"Test failed: {str(e)}")
+        return False
+    finally:
+        sink.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send a test quiz answer email to a local SMTP sink")
+    parser.add_argument("--recipient", default="quiz@example.com", help="Recipient address (default: %(default)s)")
+    parser.add_argument("--attachment-kb", type=int, default=0,
+                        help="Attach a PNG of about this size (default: no attachment)")
+    args = parser.parse_args(argv)
+
+    return 0 if check_email_sender(args.recipient, make_attachment(args.attachment_kb)) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
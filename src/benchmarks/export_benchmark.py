@@ -0,0 +1,222 @@
+"""
+Export benchmark: single sends, a pooled session, the outbox and the other sinks
+
+Starts a local SMTP sink (see smtp_sink.py) and sends the same batch of
+quiz answer emails three ways: a new session for every message, one
+EmailSender session reused for the whole batch, and through the Outbox.
+Reports messages per second, latency percentiles and the sessions opened.
+Single and pooled latency is the time a send call takes; outbox latency is
+what the caller waits for (enqueue) and the time until the sink has the
+message (delivery). The sinks mode exports the same results through an
+ExportManager writing a JSONL log, posting to a local webhook endpoint
+(see webhook_sink.py) and dropping files in a directory, all at once.
+Needs no network or mail account, so it can run on CI; the exit status is
+1 if any message or record went missing. Run from the src directory:
+
+    python -m benchmarks.export_benchmark
+    python -m benchmarks.export_benchmark --messages 200 --recipients 3 --session-latency 0.2 --attachment-kb 300
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from benchmarks.smtp_sink import SmtpSink
+from benchmarks.webhook_sink import WebhookSink
+from export.email_sender import EmailSender
+from export.exporter import DirectoryExporter, ExportManager, ExportRecord, JsonlExporter, WebhookExporter
+from export.outbox import Outbox
+
+QUESTION_TEXT = ("Question {index}: Which of the following data structures gives O(1) average lookup by key?\n"
+                 "A) A sorted array\nB) A hash table\nC) A balanced binary search tree\nD) A linked list")
+ANSWER_TEXT = "B) A hash table\n\nHash tables give O(1) average lookup by key."
+
+MODES = ["single", "pooled", "outbox", "sinks"]
+
+def make_attachment(size_kb):
+    """A noise PNG of roughly size_kb kilobytes (noise does not compress)"""
+    if not size_kb:
+        return None
+    side = max(8, int((size_kb * 1024 / 3) ** 0.5))
+    pixels = np.random.default_rng(0).integers(0, 256, (side, side, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+def make_messages(count, recipients):
+    """Distinct messages, so the outbox does not deduplicate them"""
+    return [(recipients, QUESTION_TEXT.format(index=index), ANSWER_TEXT, f"Quiz Answer {index}")
+            for index in range(count)]
+
+def make_sender(sink):
+    return EmailSender("benchmark@example.com", "unused", **sink.sender_options())
+
+def run_single(sink, messages, image_data):
+    """A new session per message, as before sessions were pooled"""
+    sender = make_sender(sink)
+    latencies = []
+    for recipients, question_text, answer_text, subject in messages:
+        start_time = time.perf_counter()
+        sender.send_many(recipients, question_text, answer_text, subject, image_data)
+        sender.close()
+        latencies.append(time.perf_counter() - start_time)
+    return latencies, None
+
+def run_pooled(sink, messages, image_data):
+    """One session for the whole batch"""
+    latencies = []
+    with make_sender(sink) as sender:
+        for recipients, question_text, answer_text, subject in messages:
+            start_time = time.perf_counter()
+            sender.send_many(recipients, question_text, answer_text, subject, image_data)
+            latencies.append(time.perf_counter() - start_time)
+    return latencies, None
+
+def run_outbox(sink, messages, image_data):
+    """Enqueue everything, then wait for the background sender to deliver it"""
+    expected = sum(len(recipients) for recipients, *_ in messages)
+    with tempfile.TemporaryDirectory() as directory:
+        outbox = Outbox(make_sender(sink), db_path=os.path.join(directory, "outbox.sqlite3")).start()
+        try:
+            enqueued_at = {}
+            latencies = []
+            for recipients, question_text, answer_text, subject in messages:
+                start_time = time.perf_counter()
+                outbox.enqueue(recipients, question_text, answer_text, subject, image_data)
+                enqueued_at[subject] = start_time
+                latencies.append(time.perf_counter() - start_time)
+            sink.wait_for(expected)
+        finally:
+            outbox.close()
+            outbox.email_sender.close()
+
+    # Enqueue to arrival at the sink, matched by subject
+    with sink.lock:
+        received = list(sink.messages)
+    delivery = []
+    for received_at, _, _, content in received:
+        subject = SmtpSink.parse(content)["Subject"]
+        if subject in enqueued_at:
+            delivery.append(received_at - enqueued_at[subject])
+    return latencies, delivery
+
+def percentiles(latencies):
+    """Median and 95th percentile in milliseconds"""
+    if len(latencies) < 2:
+        value = latencies[0] * 1000 if latencies else 0.0
+        return value, value
+    cuts = statistics.quantiles(latencies, n=20)
+    return statistics.median(latencies) * 1000, cuts[-1] * 1000
+
+def measure(sink, name, run, messages, image_data):
+    """
+    Time one mode and report throughput, latency and sessions opened
+
+    Returns:
+        bool: True if the sink received every message
+    """
+    expected = sum(len(recipients) for recipients, *_ in messages)
+    sink.reset_counts()
+    start_time = time.perf_counter()
+    latencies, delivery = run(sink, messages, image_data)
+    elapsed = time.perf_counter() - start_time
+    received = sink.message_count()
+
+    p50, p95 = percentiles(latencies)
+    line = (f"{name:<8} {elapsed:7.2f} s  {received / elapsed:7.1f} msg/s  "
+            f"send p50 {p50:7.1f} ms  p95 {p95:7.1f} ms")
+    if delivery is not None:
+        p50, p95 = percentiles(delivery)
+        line += f"  delivery p50 {p50:7.1f} ms  p95 {p95:7.1f} ms"
+    print(f"{line}  {sink.connections:4d} session(s)")
+    if received != expected:
+        print(f"  {name}: the sink received {received} of {expected} messages")
+        return False
+    return True
+
+def measure_sinks(messages, image_data, webhook_latency):
+    """
+    Export every result to the JSONL, webhook and directory sinks at once
+
+    Returns:
+        bool: True if every sink has every record
+    """
+    webhook = WebhookSink(latency=webhook_latency).start()
+    with tempfile.TemporaryDirectory() as directory:
+        jsonl_path = os.path.join(directory, "results.jsonl")
+        drop_path = os.path.join(directory, "drop")
+        manager = ExportManager([JsonlExporter(jsonl_path), WebhookExporter(webhook.url), DirectoryExporter(drop_path)])
+        latencies = []
+        failures = []
+        start_time = time.perf_counter()
+        try:
+            for _, question_text, answer_text, subject in messages:
+                record = ExportRecord(question_text, answer_text, "multiple_choice", image_data)
+                export_start = time.perf_counter()
+                results = manager.export(record)
+                latencies.append(time.perf_counter() - export_start)
+                failures.extend(f"{name}: {message}" for name, success, message in results if not success)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            manager.close()
+            webhook.stop()
+
+        with open(jsonl_path, encoding="utf-8") as file:
+            counts = {"jsonl": sum(1 for _ in file)}
+        counts["webhook"] = webhook.post_count()
+        counts["directory"] = sum(1 for name in os.listdir(drop_path) if name.endswith(".json"))
+
+    p50, p95 = percentiles(latencies)
+    print(f"{'sinks':<8} {elapsed:7.2f} s  {len(messages) / elapsed:7.1f} rec/s  "
+          f"export p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  {webhook.connections:4d} webhook connection(s)")
+    complete = not failures
+    for failure in failures[:5]:
+        print(f"  {failure}")
+    for name, count in counts.items():
+        if count != len(messages):
+            print(f"  sinks: {name} has {count} of {len(messages)} records")
+            complete = False
+    return complete
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark email export against a local SMTP sink")
+    parser.add_argument("--messages", type=int, default=50, help="Messages per mode (default: %(default)s)")
+    parser.add_argument("--recipients", type=int, default=1, help="Recipients per message (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Sink seconds per message (default: %(default)s)")
+    parser.add_argument("--session-latency", type=float, default=0.05,
+                        help="Sink seconds per new session, standing in for TLS and login (default: %(default)s)")
+    parser.add_argument("--webhook-latency", type=float, default=0.0,
+                        help="Webhook endpoint seconds per post in the sinks mode (default: %(default)s)")
+    parser.add_argument("--attachment-kb", type=int, default=0,
+                        help="Attach a PNG of about this size (default: no attachment)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES, help="Modes to run (default: all)")
+    args = parser.parse_args(argv)
+
+    sink = SmtpSink(latency=args.latency, session_latency=args.session_latency).start()
+    recipients = [f"student{index}@example.com" for index in range(args.recipients)]
+    messages = make_messages(args.messages, recipients)
+    image_data = make_attachment(args.attachment_kb)
+
+    print(f"{args.messages} messages x {args.recipients} recipient(s), "
+          f"{len(image_data or b'') / 1024:.0f} KB attachment, "
+          f"{args.session_latency:.2f} s per session, {args.latency:.2f} s per message\n")
+
+    runs = {"single": run_single, "pooled": run_pooled, "outbox": run_outbox}
+    complete = True
+    try:
+        for mode in args.modes:
+            if mode == "sinks":
+                complete = measure_sinks(messages, image_data, args.webhook_latency) and complete
+            else:
+                complete = measure(sink, mode, runs[mode], messages, image_data) and complete
+    finally:
+        sink.stop()
+    return 0 if complete else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
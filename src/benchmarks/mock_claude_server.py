@@ -0,0 +1,345 @@
+"""
+Local mock of the Claude Messages API for client benchmarks
+
+Answers POST /v1/messages after a fixed delay with a canned multiple-choice
+answer (streamed as server-sent events when the request asks for it, and
+ending with a confidence line when the system prompt asks for one), or with
+a canned tool call when the request forces one. The
+server speaks HTTP/1.1 with keep-alive and counts the connections it
+accepts, so benchmarks can show how many connections a client opened.
+With a requests-per-minute limit (a bucket that refills continuously, like
+the real API) it answers 429 with retry-after once the bucket is empty and
+sends anthropic-ratelimit-* headers on every response. It can also answer
+the first requests with 529 (overloaded), pause between streamed deltas
+and stall a stream partway through, to exercise retries, deadlines and
+cancellation. Prompt caching is
+imitated too: a prefix marked with cache_control is reported as written to
+the cache the first time and read from it afterwards (whatever its length).
+
+    python -m benchmarks.mock_claude_server --port 8765 --latency 0.3
+    python -m benchmarks.mock_claude_server --rpm 120 --burst 10
+    python -m benchmarks.mock_claude_server --overloaded 2 --stream-delay 0.1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=mock python main.py
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Token limit reported alongside the request limit (tokens are not enforced)
+TOKENS_PER_MINUTE = 400000
+
+ANSWER_TEXT = "B) A hash table with a good hash function\n\nHash tables give O(1) average lookup by key."
+
+# Added to the answer when the system prompt asks for a confidence line
+CONFIDENCE_LINE = "\nConfidence: 90"
+
+# Tool input sent when the request forces a tool call
+TOOL_INPUT = {"letter": "B", "confidence": 0.9, "rationale": "Hash tables give O(1) average lookup by key."}
+
+class MockClaudeHandler(BaseHTTPRequestHandler):
+    """Handles one connection to the mock server"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"type": "error", "error": {"type": "invalid_request_error",
+                                                             "message": "Invalid JSON"}})
+            return
+
+        if not self.path.startswith("/v1/messages"):
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": "Not found"}})
+            return
+
+        retry_after = self.server.admit_request()
+        if retry_after is not None:
+            error = {"type": "rate_limit_error", "message": "Number of requests has exceeded your rate limit"}
+            self._send_json(429, {"type": "error", "error": error},
+                            {"retry-after": str(max(1, round(retry_after)))})
+            return
+        if self.server.admit_overloaded():
+            self._send_json(529, {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}})
+            return
+        time.sleep(self.server.latency)
+
+        model = body.get("model", "mock-model")
+        usage = self.server.usage_for(body)
+        text = ANSWER_TEXT
+        if "Confidence: N" in json.dumps(body.get("system", "")):
+            text += CONFIDENCE_LINE
+        tool_choice = body.get("tool_choice") or {}
+        if body.get("stream"):
+            self._send_stream(model, usage, text)
+        elif tool_choice.get("type") == "tool":
+            self._send_json(200, {
+                "id": "msg_mock",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "tool_use", "id": "toolu_mock", "name": tool_choice["name"],
+                             "input": TOOL_INPUT}],
+                "stop_reason": "tool_use",
+                "stop_sequence": None,
+                "usage": dict(usage, output_tokens=len(json.dumps(TOOL_INPUT)) // 4),
+            })
+        else:
+            self._send_json(200, {
+                "id": "msg_mock",
+                "type": "message",
+                "role": "assistant",
+                "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": dict(usage, output_tokens=24),
+            })
+
+    def _send_json(self, status, payload, headers=None):
+        """Send a JSON response on the kept-alive connection"""
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self._send_rate_limit_headers()
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model, usage, text):
+        """Send the answer as Messages API server-sent events"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self._send_rate_limit_headers()
+        self.end_headers()
+
+        def event(name, data):
+            self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event("message_start", {"type": "message_start", "message": {
+            "id": "msg_mock", "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None, "usage": dict(usage, output_tokens=1),
+        }})
+        event("content_block_start", {"type": "content_block_start", "index": 0,
+                                       "content_block": {"type": "text", "text": ""}})
+        for index, word in enumerate(text.split(" ")):
+            time.sleep(self.server.stream_delay)
+            if index == self.server.stall_after:
+                time.sleep(self.server.stall_seconds)
+            event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                           "delta": {"type": "text_delta", "text": word + " "}})
+        event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        event("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                "usage": {"output_tokens": 24}})
+        event("message_stop", {"type": "message_stop"})
+        self.close_connection = True
+
+    def _send_rate_limit_headers(self):
+        """Report the request budget the way the real API does"""
+        limit, remaining = self.server.rate_limit_status()
+        if limit is not None:
+            self.send_header("anthropic-ratelimit-requests-limit", str(limit))
+            self.send_header("anthropic-ratelimit-requests-remaining", str(remaining))
+            self.send_header("anthropic-ratelimit-tokens-limit", str(TOKENS_PER_MINUTE))
+            self.send_header("anthropic-ratelimit-tokens-remaining", str(TOKENS_PER_MINUTE))
+
+class MockClaudeServer(ThreadingHTTPServer):
+    """Threaded mock server that records request and connection counts"""
+
+    daemon_threads = True
+    request_queue_size = 128  # Clients open many connections at once on a cold start
+
+    def __init__(self, port=0, latency=0.3, requests_per_minute=None, burst=None, overloaded=0, stream_delay=0.0,
+                 stall_after=None, stall_seconds=0.0):
+        """
+        Initialize the MockClaudeServer
+
+        Args:
+            port (int): Port to listen on (0 picks a free port)
+            latency (float): Seconds each request takes to answer
+            requests_per_minute (int, optional): Throttle with 429s beyond this rate
+            burst (int, optional): Requests admitted at once from a full bucket.
+                                   Defaults to requests_per_minute
+            overloaded (int): Answer this many requests with 529 (overloaded) before answering normally
+            stream_delay (float): Seconds before each streamed text delta
+            stall_after (int, optional): Stop sending for stall_seconds after this many text deltas
+            stall_seconds (float): Length of the stall
+        """
+        super().__init__(("127.0.0.1", port), MockClaudeHandler)
+        self.latency = latency
+        self.requests_per_minute = requests_per_minute
+        self.overloaded = overloaded
+        self.stream_delay = stream_delay
+        self.stall_after = stall_after
+        self.stall_seconds = stall_seconds
+        self.requests = 0
+        self.throttled = 0
+        self.overloaded_responses = 0
+        self.connections = 0
+
+        # Prompt prefixes seen with cache_control
+        self.cached_prefixes = set()
+
+        # Request bucket, refilled at requests_per_minute / 60 per second
+        self.burst = burst or requests_per_minute
+        self.bucket_level = self.burst
+        self.bucket_updated_at = time.monotonic()
+        self.counter_lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def admit_request(self):
+        """
+        Count a request against the per-minute limit
+
+        Returns:
+            float or None: Seconds until a request would be admitted, or None if it is admitted
+        """
+        with self.counter_lock:
+            self.requests += 1
+            if self.requests_per_minute is None:
+                return None
+
+            now = time.monotonic()
+            refill_per_second = self.requests_per_minute / 60
+            self.bucket_level = min(self.burst, self.bucket_level + (now - self.bucket_updated_at) * refill_per_second)
+            self.bucket_updated_at = now
+            if self.bucket_level < 1:
+                self.throttled += 1
+                return (1 - self.bucket_level) / refill_per_second
+            self.bucket_level -= 1
+            return None
+
+    def admit_overloaded(self):
+        """
+        Count a request against the overloaded responses still to send
+
+        Returns:
+            bool: True if the request should be answered with 529
+        """
+        with self.counter_lock:
+            if self.overloaded_responses >= self.overloaded:
+                return False
+            self.overloaded_responses += 1
+            return True
+
+    def usage_for(self, body):
+        """
+        Input token usage of a request, with prompt caching
+
+        Tokens are counted as characters / 4. Everything up to the last
+        cache_control marker is the cacheable prefix.
+
+        Returns:
+            dict: input_tokens, cache_creation_input_tokens and cache_read_input_tokens
+        """
+        system = body.get("system") or []
+        if isinstance(system, str):
+            system = [{"type": "text", "text": system}]
+        parts = [(block.get("text", ""), "cache_control" in block) for block in system]
+        for message in body.get("messages", []):
+            content = message.get("content")
+            if isinstance(content, str):
+                parts.append((content, False))
+            else:
+                parts.extend((block.get("text", ""), "cache_control" in block) for block in content)
+
+        marked = [index for index, (_, cached) in enumerate(parts) if cached]
+        prefix_end = marked[-1] + 1 if marked else 0
+        prefix = "".join(text for text, _ in parts[:prefix_end])
+        rest = "".join(text for text, _ in parts[prefix_end:])
+
+        usage = {"input_tokens": max(1, len(rest) // 4), "cache_creation_input_tokens": 0,
+                 "cache_read_input_tokens": 0}
+        if prefix:
+            with self.counter_lock:
+                seen = prefix in self.cached_prefixes
+                self.cached_prefixes.add(prefix)
+            usage["cache_read_input_tokens" if seen else "cache_creation_input_tokens"] = len(prefix) // 4
+        else:
+            usage["input_tokens"] += len(prefix) // 4
+        return usage
+
+    def rate_limit_status(self):
+        """
+        Get the request limit and what is left of it
+
+        Returns:
+            tuple: (limit, remaining), both None without a limit
+        """
+        with self.counter_lock:
+            if self.requests_per_minute is None:
+                return None, None
+            return self.requests_per_minute, int(self.bucket_level)
+
+    def count_connection(self):
+        with self.counter_lock:
+            self.connections += 1
+
+    def reset_counts(self):
+        with self.counter_lock:
+            self.requests = 0
+            self.throttled = 0
+            self.overloaded_responses = 0
+            self.connections = 0
+
+    def start(self):
+        """Serve on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, name="mock-claude-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def handle_error(self, request, client_address):
+        # Clients that time out or cancel close the connection mid-response
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local mock of the Claude Messages API")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per request (default: %(default)s)")
+    parser.add_argument("--rpm", type=int, help="Requests per minute before answering 429 (default: no limit)")
+    parser.add_argument("--burst", type=int, help="Requests admitted at once (default: the --rpm value)")
+    parser.add_argument("--overloaded", type=int, default=0,
+                        help="Answer this many requests with 529 first (default: %(default)s)")
+    parser.add_argument("--stream-delay", type=float, default=0.0,
+                        help="Seconds before each streamed delta (default: %(default)s)")
+    parser.add_argument("--stall-after", type=int, help="Stall streams after this many deltas (default: never)")
+    parser.add_argument("--stall-seconds", type=float, default=10.0,
+                        help="Length of the stall (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    server = MockClaudeServer(args.port, args.latency, args.rpm, args.burst, args.overloaded, args.stream_delay,
+                              args.stall_after, args.stall_seconds)
+    print(f"Mock Claude API on {server.base_url} ({args.latency:.2f} s per request)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
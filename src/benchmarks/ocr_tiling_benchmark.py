@@ -0,0 +1,99 @@
+"""
+OCR tiling benchmark: single-pass OCR against tiled OCR on a process pool
+
+Run from the src directory (Tesseract must be installed):
+
+    python -m benchmarks.ocr_tiling_benchmark
+    python -m benchmarks.ocr_tiling_benchmark --workers 2 4 8 16 --images screenshot.png
+"""
+import argparse
+import difflib
+import time
+import cv2
+import numpy as np
+from ocr.ocr_engine import create_engine
+from ocr.text_extractor import TextExtractor
+from ocr.tiled_ocr import TiledOCR
+
+SAMPLE_LINES = [
+    "Question 12 of 40",
+    "Which of the following data structures gives O(1) average lookup by key?",
+    "A) A sorted array searched with binary search",
+    "B) A hash table with a good hash function",
+    "C) A balanced binary search tree",
+    "D) A singly linked list",
+    "Explain your answer in one or two sentences before moving on to the next question.",
+]
+
+def render_sample(width=3840, height=2160):
+    """
+    Render a screen-sized image filled with quiz text
+
+    Returns:
+        tuple: (BGR image, rendered text)
+    """
+    image = np.full((height, width, 3), 255, np.uint8)
+    lines = []
+    y = 60
+    while y < height - 20:
+        for line in SAMPLE_LINES:
+            if y >= height - 20:
+                break
+            lines.append(line)
+            cv2.putText(image, line, (40, y), cv2.FONT_HERSHEY_SIMPLEX, 1.1, (0, 0, 0), 2, cv2.LINE_AA)
+            y += 48
+        y += 40
+    return image, "\n".join(lines)
+
+def time_call(fn, image, repeats):
+    """Return the median time of fn(image) in seconds and the last result"""
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        result = fn(image)
+        timings.append(time.perf_counter() - start_time)
+    return float(np.median(timings)), result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tiled OCR against a single Tesseract pass")
+    parser.add_argument("--workers", nargs="+", type=int, default=[2, 4, 8, 16],
+                        help="Worker counts to benchmark (default: %(default)s)")
+    parser.add_argument("--images", nargs="+", help="Screenshots to OCR (default: a rendered 4K page)")
+    parser.add_argument("--engine", help="OCR engine for every process (default: OCR_ENGINE)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per measurement")
+    args = parser.parse_args(argv)
+
+    if args.images:
+        samples = [(path, cv2.imread(path)) for path in args.images]
+    else:
+        samples = [("rendered 3840x2160", render_sample()[0])]
+
+    engine = create_engine(args.engine)
+    extractor = TextExtractor(engine=engine, detect_region=False)
+
+    for name, image in samples:
+        if image is None:
+            print(f"{name}: could not be read")
+            continue
+
+        binary = extractor.preprocess_image(image)
+        single_time, single_text = time_call(engine.recognize, binary, args.repeats)
+        print(f"\n{name}: {binary.shape[1]}x{binary.shape[0]}")
+        print(f"{'workers':>8} {'bands':>6} {'median s':>9} {'speedup':>8} {'text match':>11}")
+        print(f"{1:>8} {1:>6} {single_time:>9.3f} {1.0:>8.2f} {1.0:>11.3f}")
+
+        for workers in args.workers:
+            tiled = TiledOCR(workers=workers, engine=engine, engine_name=engine.name)
+            try:
+                # Warm up the pool so process start-up is not timed
+                tiled.recognize(binary)
+                tiled_time, tiled_text = time_call(tiled.recognize, binary, args.repeats)
+            finally:
+                tiled.close()
+
+            match = difflib.SequenceMatcher(None, single_text, tiled_text).ratio()
+            print(f"{workers:>8} {tiled.band_count(binary):>6} {tiled_time:>9.3f} "
+                  f"{single_time / tiled_time:>8.2f} {match:>11.3f}")
+
+if __name__ == "__main__":
+    main()
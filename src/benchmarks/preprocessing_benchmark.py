@@ -0,0 +1,138 @@
+"""
+Preprocessing benchmark: per-stage time and OCR accuracy of each profile
+
+The corpus is a directory of images, each with a JSON file of the same name
+holding the ground truth in a "text" field. Run from the src directory
+(Tesseract must be installed):
+
+    python -m benchmarks.preprocessing_benchmark --corpus path/to/corpus
+    python -m benchmarks.preprocessing_benchmark --corpus path/to/corpus --profiles default denoise
+    python -m benchmarks.preprocessing_benchmark --no-ocr   # timings only
+"""
+import argparse
+import difflib
+import glob
+import json
+import os
+import re
+import time
+from collections import defaultdict
+import cv2
+import numpy as np
+from ocr.ocr_engine import create_engine
+from ocr.preprocessing import PROFILES, Preprocessor
+from benchmarks.ocr_tiling_benchmark import render_sample
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+def load_corpus(corpus_dir):
+    """
+    Load images and their ground-truth text
+
+    Args:
+        corpus_dir (str): Directory of images with matching .json files
+
+    Returns:
+        list: (name, BGR image, expected text) for every readable image
+    """
+    samples = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*"))):
+        stem, extension = os.path.splitext(path)
+        if extension.lower() not in IMAGE_EXTENSIONS or not os.path.exists(stem + ".json"):
+            continue
+
+        image = cv2.imread(path)
+        if image is None:
+            print(f"Skipping unreadable image: {path}")
+            continue
+        with open(stem + ".json", encoding="utf-8") as f:
+            samples.append((os.path.basename(path), image, json.load(f)["text"]))
+    return samples
+
+def text_accuracy(expected, actual):
+    """
+    Similarity of recognized text to the ground truth
+
+    Returns:
+        float: Character-level similarity between 0 and 1, ignoring whitespace differences
+    """
+    normalize = lambda text: re.sub(r"\s+", " ", text).strip()
+    return difflib.SequenceMatcher(None, normalize(expected), normalize(actual)).ratio()
+
+def benchmark_profile(profile, samples, engine=None):
+    """
+    Preprocess (and optionally OCR) every sample with one profile
+
+    Args:
+        profile (str): Profile name
+        samples (list): (name, image, expected text) tuples
+        engine (OCREngine, optional): Engine for accuracy; timings only if None
+
+    Returns:
+        dict: Mean milliseconds per stage, preprocessing total, OCR time and mean accuracy
+    """
+    preprocessor = Preprocessor(profile)
+    stage_times = defaultdict(list)
+    totals, ocr_times, accuracies = [], [], []
+
+    for _, image, expected in samples:
+        binary = preprocessor.run(image)
+        for name, seconds in preprocessor.last_timings:
+            stage_times[name].append(seconds * 1000)
+        totals.append(sum(seconds for _, seconds in preprocessor.last_timings) * 1000)
+
+        if engine is not None:
+            start_time = time.perf_counter()
+            text = engine.recognize(binary)
+            ocr_times.append((time.perf_counter() - start_time) * 1000)
+            accuracies.append(text_accuracy(expected, text))
+
+    return {
+        "stages": {name: float(np.mean(times)) for name, times in stage_times.items()},
+        "total_ms": float(np.mean(totals)),
+        "ocr_ms": float(np.mean(ocr_times)) if ocr_times else None,
+        "accuracy": float(np.mean(accuracies)) if accuracies else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark OCR preprocessing profiles")
+    parser.add_argument("--corpus", help="Directory of images with .json ground truth "
+                                         "(default: a rendered 4K page)")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES),
+                        help="Profiles to benchmark (default: all)")
+    parser.add_argument("--engine", help="OCR engine (default: OCR_ENGINE)")
+    parser.add_argument("--no-ocr", action="store_true", help="Only time preprocessing")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        samples = load_corpus(args.corpus)
+        if not samples:
+            print(f"No images with ground truth found in {args.corpus}")
+            return
+    else:
+        image, text = render_sample()
+        samples = [("rendered 3840x2160", image, text)]
+
+    engine = None if args.no_ocr else create_engine(args.engine)
+    print(f"{len(samples)} image(s)\n")
+
+    results = []
+    for profile in args.profiles:
+        stats = benchmark_profile(profile, samples, engine)
+        results.append((profile, stats))
+
+        stages = ", ".join(f"{name} {ms:.2f}" for name, ms in stats["stages"].items())
+        line = f"{profile:<12} preprocess {stats['total_ms']:7.2f} ms  [{stages}]"
+        if stats["accuracy"] is not None:
+            line += f"  ocr {stats['ocr_ms']:8.1f} ms  accuracy {stats['accuracy']:.3f}"
+        print(line)
+
+    if engine is not None:
+        # Fastest profile within one point of the best accuracy
+        best_accuracy = max(stats["accuracy"] for _, stats in results)
+        candidates = [(stats["total_ms"] + stats["ocr_ms"], profile)
+                      for profile, stats in results if stats["accuracy"] >= best_accuracy - 0.01]
+        print(f"\nFastest profile within 1% of the best accuracy: {min(candidates)[1]}")
+
+if __name__ == "__main__":
+    main()
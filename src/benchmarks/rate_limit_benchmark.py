@@ -0,0 +1,94 @@
+"""
+Rate limit benchmark: unscheduled requests against the RequestScheduler
+
+Starts a mock Messages API that throttles beyond a requests-per-minute
+budget (see mock_claude_server.py) and sends a burst of questions from a
+thread pool twice: once with no admission control or retries (what the
+client used to do), once through the RequestScheduler. Run from the src
+directory:
+
+    python -m benchmarks.rate_limit_benchmark
+    python -m benchmarks.rate_limit_benchmark --questions 200 --rpm 600 --burst 20 --concurrency 32
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ai.claude_client import ClaudeClient
+from ai.request_scheduler import RequestScheduler
+from benchmarks.claude_client_benchmark import make_questions
+from benchmarks.mock_claude_server import MockClaudeServer
+
+class NoScheduling(RequestScheduler):
+    """Sends every request at once and never retries, like the client before the scheduler"""
+
+    def __init__(self):
+        super().__init__(max_retries=0)
+
+    def admit(self, estimated_tokens):
+        return 0.0
+
+    def record_response(self, headers, estimated_tokens=0, used_tokens=None):
+        pass
+
+def run_batch(scheduler, questions, concurrency, latency, rpm, burst):
+    """
+    Answer a batch against a fresh throttling mock server
+
+    Returns:
+        dict: Answered and failed questions, 429 responses and elapsed seconds
+    """
+    server = MockClaudeServer(latency=latency, requests_per_minute=rpm, burst=burst).start()
+    os.environ["ANTHROPIC_BASE_URL"] = server.base_url
+    client = ClaudeClient(scheduler=scheduler, timeout=120)
+
+    def answer(question):
+        try:
+            client.get_answer(*question)
+            return True
+        except Exception:
+            return False
+
+    start_time = time.perf_counter()
+    try:
+        # The clients log every wait and retry; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(answer, questions))
+    finally:
+        server.stop()
+
+    return {
+        "answered": sum(outcomes),
+        "failed": len(outcomes) - sum(outcomes),
+        "throttled": server.throttled,
+        "elapsed": time.perf_counter() - start_time,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark rate limit handling against a throttling mock server")
+    parser.add_argument("--questions", type=int, default=100, help="Questions per run (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Worker threads (default: %(default)s)")
+    parser.add_argument("--rpm", type=int, default=300, help="Mock server requests per minute (default: %(default)s)")
+    parser.add_argument("--burst", type=int, default=10, help="Mock server burst size (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.1, help="Mock server seconds per request")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("ANTHROPIC_API_KEY", "mock")
+    questions = make_questions(args.questions)
+    print(f"{args.questions} questions, {args.concurrency} threads, "
+          f"server limit {args.rpm} requests/minute (burst {args.burst})\n")
+
+    runs = [
+        ("no scheduling, no retries", NoScheduling()),
+        ("RequestScheduler", RequestScheduler()),
+    ]
+    for name, scheduler in runs:
+        stats = run_batch(scheduler, questions, args.concurrency, args.latency, args.rpm, args.burst)
+        per_minute = stats["answered"] / stats["elapsed"] * 60
+        print(f"{name:<26} {stats['answered']:4d} answered  {stats['failed']:4d} failed  "
+              f"{stats['throttled']:4d} x 429  {stats['elapsed']:6.1f} s  {per_minute:6.0f} answers/minute")
+
+if __name__ == "__main__":
+    main()
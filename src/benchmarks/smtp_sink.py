@@ -0,0 +1,216 @@
+"""
+Local SMTP server that accepts and keeps every message, for export tests
+
+Runs an aiosmtpd server on a background thread. It accepts any login,
+stores the messages it receives and counts the connections it accepts,
+so benchmarks can show how many sessions a sender opened. Optional delays
+stand in for a remote server: one per session (handshake and login) and
+one per message. With a certificate it speaks implicit TLS or STARTTLS,
+to exercise the other EmailSender security modes.
+
+    python -m benchmarks.smtp_sink --port 8025 --latency 0.05
+    EMAIL_SMTP_HOST=127.0.0.1 EMAIL_SMTP_PORT=8025 EMAIL_SMTP_SECURITY=none python main.py
+
+Requires aiosmtpd (pip install aiosmtpd).
+"""
+import argparse
+import asyncio
+import socket
+import ssl
+import threading
+import time
+from email import message_from_bytes, policy
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP, AuthResult
+
+class SinkHandler:
+    """aiosmtpd handler that records each message"""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        # The first greeting of a session pays the handshake delay
+        if not getattr(session, "sink_greeted", False):
+            session.sink_greeted = True
+            await asyncio.sleep(self.sink.session_latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.sink.latency)
+        self.sink.record(envelope.mail_from, list(envelope.rcpt_tos), envelope.content)
+        return "250 Message accepted for delivery"
+
+class SinkController(Controller):
+    """Controller that counts the connections it accepts"""
+
+    def __init__(self, sink, **kwargs):
+        self.sink = sink
+        super().__init__(SinkHandler(sink), **kwargs)
+
+    def factory(self):
+        self.sink.count_connection()
+        return SMTP(self.handler, **self.SMTP_kwargs)
+
+class SmtpSink:
+    """SMTP server on localhost that keeps received messages in memory"""
+
+    def __init__(self, port=0, latency=0.0, session_latency=0.0, security="none", certfile=None, keyfile=None):
+        """
+        Initialize the SmtpSink
+
+        Args:
+            port (int): Port to listen on (0 picks a free port)
+            latency (float): Seconds each message takes to accept
+            session_latency (float): Seconds added once per session, like a remote handshake
+            security (str): "none", "starttls" or "ssl" (implicit TLS)
+            certfile (str, optional): Certificate for the TLS modes
+            keyfile (str, optional): Private key for the TLS modes
+
+        Raises:
+            ValueError: If a TLS mode is asked for without a certificate
+        """
+        self.host = "127.0.0.1"
+        self.port = port or self._free_port()
+        self.latency = latency
+        self.session_latency = session_latency
+        self.security = security
+
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        # Set whenever a message arrives, for wait_for()
+        self.received = threading.Condition(self.lock)
+
+        options = {
+            "hostname": self.host,
+            "port": self.port,
+            "authenticator": self._accept_login,
+            "auth_require_tls": False,
+        }
+        if security != "none":
+            if not certfile:
+                raise ValueError(f"SMTP security '{security}' needs a certificate (certfile)")
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(certfile, keyfile)
+            if security == "ssl":
+                options["ssl_context"] = context
+            else:
+                options["tls_context"] = context
+        self.controller = SinkController(self, **options)
+
+    @staticmethod
+    def _free_port():
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    @staticmethod
+    def _accept_login(server, session, envelope, mechanism, auth_data):
+        return AuthResult(success=True)
+
+    def sender_options(self):
+        """
+        Keyword arguments that point an EmailSender at this sink
+
+        Returns:
+            dict: smtp_host, smtp_port and smtp_security
+        """
+        return {"smtp_host": self.host, "smtp_port": self.port, "smtp_security": self.security}
+
+    def record(self, mail_from, recipients, content):
+        with self.received:
+            self.messages.append((time.perf_counter(), mail_from, recipients, content))
+            self.received.notify_all()
+
+    def count_connection(self):
+        with self.lock:
+            self.connections += 1
+
+    def message_count(self):
+        """Number of messages received (one per recipient with EmailSender)"""
+        with self.lock:
+            return len(self.messages)
+
+    def wait_for(self, count, timeout=30.0):
+        """
+        Wait until at least count messages have arrived
+
+        Returns:
+            bool: True if they arrived before the timeout
+        """
+        with self.received:
+            return self.received.wait_for(lambda: len(self.messages) >= count, timeout)
+
+    @staticmethod
+    def parse(content):
+        """
+        Parse a received message
+
+        Args:
+            content (bytes): Raw message as stored in messages
+
+        Returns:
+            email.message.EmailMessage: The message
+        """
+        return message_from_bytes(content, policy=policy.default)
+
+    def last_message(self):
+        """
+        Parse the most recent message
+
+        Returns:
+            email.message.EmailMessage or None: The message
+        """
+        with self.lock:
+            if not self.messages:
+                return None
+            content = self.messages[-1][3]
+        return self.parse(content)
+
+    def reset_counts(self):
+        with self.lock:
+            self.messages = []
+            self.connections = 0
+
+    def start(self):
+        """Serve on a background thread"""
+        self.controller.start()
+        # Starting makes one probe connection; it is not a client
+        self.reset_counts()
+        return self
+
+    def stop(self):
+        self.controller.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local SMTP server that accepts every message")
+    parser.add_argument("--port", type=int, default=8025, help="Port to listen on (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per message (default: %(default)s)")
+    parser.add_argument("--session-latency", type=float, default=0.0,
+                        help="Seconds per new session (default: %(default)s)")
+    parser.add_argument("--security", choices=["none", "starttls", "ssl"], default="none",
+                        help="Connection security (default: %(default)s)")
+    parser.add_argument("--certfile", help="Certificate for starttls or ssl")
+    parser.add_argument("--keyfile", help="Private key for starttls or ssl")
+    args = parser.parse_args(argv)
+
+    sink = SmtpSink(args.port, args.latency, args.session_latency, args.security, args.certfile, args.keyfile).start()
+    print(f"SMTP sink on {sink.host}:{sink.port} ({args.security}); Ctrl+C to stop")
+    seen = 0
+    try:
+        while True:
+            sink.wait_for(seen + 1, timeout=1.0)
+            with sink.lock:
+                new_messages = sink.messages[seen:]
+            for _, mail_from, recipients, content in new_messages:
+                print(f"{mail_from} -> {', '.join(recipients)} ({len(content) / 1024:.1f} KB)")
+            seen += len(new_messages)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Local HTTP endpoint that accepts and keeps every webhook post, for export tests
+
+Answers POST requests with 204 after an optional delay and stores the
+JSON bodies it received. It speaks HTTP/1.1 with keep-alive and counts
+the connections it accepts, so benchmarks can check that the webhook
+exporter reuses its connection.
+
+    python -m benchmarks.webhook_sink --port 8090
+    EXPORT_SINKS=webhook EXPORT_WEBHOOK_URL=http://127.0.0.1:8090/results python main.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class WebhookSinkHandler(BaseHTTPRequestHandler):
+    """Handles one connection to the webhook sink"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._send_status(400)
+            return
+
+        time.sleep(self.server.latency)
+        self.server.record(self.path, payload, self.headers.get("Authorization"))
+        self._send_status(self.server.status)
+
+    def _send_status(self, status):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+class WebhookSink(ThreadingHTTPServer):
+    """Threaded HTTP server that keeps the posts it receives"""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, status=204):
+        """
+        Initialize the WebhookSink
+
+        Args:
+            port (int): Port to listen on (0 picks a free port)
+            latency (float): Seconds each post takes to answer
+            status (int): HTTP status to answer with (set an error status to test failures)
+        """
+        super().__init__(("127.0.0.1", port), WebhookSinkHandler)
+        self.latency = latency
+        self.status = status
+        self.posts = []  # (received at, path, payload, authorization header)
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.received = threading.Condition(self.lock)
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/results"
+
+    def record(self, path, payload, authorization):
+        with self.received:
+            self.posts.append((time.perf_counter(), path, payload, authorization))
+            self.received.notify_all()
+
+    def count_connection(self):
+        with self.lock:
+            self.connections += 1
+
+    def post_count(self):
+        with self.lock:
+            return len(self.posts)
+
+    def wait_for(self, count, timeout=30.0):
+        """
+        Wait until at least count posts have arrived
+
+        Returns:
+            bool: True if they arrived before the timeout
+        """
+        with self.received:
+            return self.received.wait_for(lambda: len(self.posts) >= count, timeout)
+
+    def reset_counts(self):
+        with self.lock:
+            self.posts = []
+            self.connections = 0
+
+    def start(self):
+        """Serve on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, name="webhook-sink", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local HTTP endpoint that accepts every webhook post")
+    parser.add_argument("--port", type=int, default=8090, help="Port to listen on (default: %(default)s)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per post (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    sink = WebhookSink(args.port, args.latency).start()
+    print(f"Webhook sink on {sink.url}; Ctrl+C to stop")
+    seen = 0
+    try:
+        while True:
+            sink.wait_for(seen + 1, timeout=1.0)
+            with sink.lock:
+                new_posts = sink.posts[seen:]
+            for _, path, payload, _ in new_posts:
+                print(f"{path}: {json.dumps(payload)[:200]}")
+            seen += len(new_posts)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.stop()
+
+if __name__ == "__main__":
+    main()
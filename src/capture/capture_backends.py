@@ -0,0 +1,376 @@
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import threading
+import cv2
+import numpy as np
+from PIL import ImageGrab
+from dotenv import load_dotenv
+
+class CaptureBackend:
+    """Base class for screen grabbing backends used by ScreenCapture"""
+
+    name = "base"
+
+    def grab(self, bbox=None):
+        """
+        Grab the screen or a region of it
+
+        Args:
+            bbox (tuple, optional): (left, top, right, bottom) region to grab.
+                                    The whole screen is grabbed if not provided
+
+        Returns:
+            numpy.ndarray: Contiguous RGB array (height x width x 3, uint8)
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend"""
+        pass
+
+class PILBackend(CaptureBackend):
+    """Grabs the screen with PIL's ImageGrab (works everywhere PIL supports)"""
+
+    name = "pil"
+
+    def grab(self, bbox=None):
+        image = ImageGrab.grab(bbox=bbox)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        return np.ascontiguousarray(np.asarray(image))
+
+class MSSBackend(CaptureBackend):
+    """Grabs the screen with the mss package (GDI, Quartz or X11 under the hood)"""
+
+    name = "mss"
+
+    def __init__(self):
+        """
+        Initialize the mss backend
+
+        Raises:
+            ImportError: If mss is not installed
+        """
+        import mss
+        self._mss = mss
+
+        # mss handles are bound to the thread that created them
+        self._local = threading.local()
+
+    def _get_sct(self):
+        """Get the mss handle for the current thread"""
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = self._mss.mss()
+            self._local.sct = sct
+        return sct
+
+    def grab(self, bbox=None):
+        sct = self._get_sct()
+        if bbox is None:
+            monitor = sct.monitors[1]  # Primary monitor (index 0 is all monitors combined)
+        else:
+            left, top, right, bottom = bbox
+            monitor = {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+        shot = sct.grab(monitor)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
+
+    def close(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+class _XImage(ctypes.Structure):
+    # Leading fields of Xlib's XImage; only these are read or written
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+class XShmBackend(CaptureBackend):
+    """
+    Grabs the screen through the X11 MIT-SHM extension
+
+    The X server writes pixels straight into a shared memory segment that is
+    reused between grabs, so no image data goes through the X socket.
+    """
+
+    name = "xshm"
+
+    _Z_PIXMAP = 2
+    _IPC_PRIVATE = 0
+    _IPC_CREAT = 0o1000
+    _IPC_RMID = 0
+
+    def __init__(self, display_name=None):
+        """
+        Initialize the MIT-SHM backend
+
+        Args:
+            display_name (str, optional): X display to connect to. Defaults to $DISPLAY
+
+        Raises:
+            RuntimeError: If X11 or the MIT-SHM extension is not available
+        """
+        if not sys.platform.startswith("linux"):
+            raise RuntimeError("MIT-SHM capture is only available on Linux/X11")
+
+        x11_path = ctypes.util.find_library("X11")
+        xext_path = ctypes.util.find_library("Xext")
+        if not x11_path or not xext_path:
+            raise RuntimeError("libX11 and libXext are required for MIT-SHM capture")
+
+        self.x11 = ctypes.CDLL(x11_path)
+        self.xext = ctypes.CDLL(xext_path)
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._declare_functions()
+
+        self.display = self.x11.XOpenDisplay(display_name.encode() if display_name else None)
+        if not self.display:
+            raise RuntimeError("Cannot open X display")
+
+        if not self.xext.XShmQueryExtension(self.display):
+            self.x11.XCloseDisplay(self.display)
+            raise RuntimeError("X server does not support MIT-SHM")
+
+        screen = self.x11.XDefaultScreen(self.display)
+        self.root = self.x11.XDefaultRootWindow(self.display)
+        self.visual = self.x11.XDefaultVisual(self.display, screen)
+        self.depth = self.x11.XDefaultDepth(self.display, screen)
+        self.screen_size = (self.x11.XDisplayWidth(self.display, screen),
+                            self.x11.XDisplayHeight(self.display, screen))
+
+        # One connection and segment shared by the worker threads
+        self.lock = threading.Lock()
+        self.shminfo = None
+        self.ximage = None
+
+    def _declare_functions(self):
+        """Declare the ctypes signatures of the X11, Xext and libc calls"""
+        x11, xext, libc = self.x11, self.xext, self.libc
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                         ctypes.c_char_p, ctypes.POINTER(_XShmSegmentInfo),
+                                         ctypes.c_uint, ctypes.c_uint]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+                                      ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+        libc.free.argtypes = [ctypes.c_void_p]
+
+    def _allocate(self, width, height):
+        """Create the shared image for a grab size, replacing any previous one"""
+        self._release()
+
+        shminfo = _XShmSegmentInfo()
+        ximage = self.xext.XShmCreateImage(self.display, self.visual, self.depth, self._Z_PIXMAP,
+                                           None, ctypes.byref(shminfo), width, height)
+        if not ximage:
+            raise RuntimeError("XShmCreateImage failed")
+
+        size = ximage.contents.bytes_per_line * height
+        shmid = self.libc.shmget(self._IPC_PRIVATE, size, self._IPC_CREAT | 0o600)
+        if shmid < 0:
+            self.libc.free(ctypes.cast(ximage, ctypes.c_void_p))
+            raise RuntimeError(f"shmget failed (errno {ctypes.get_errno()})")
+
+        shmaddr = self.libc.shmat(shmid, None, 0)
+        if shmaddr is None or shmaddr == ctypes.c_void_p(-1).value:
+            self.libc.shmctl(shmid, self._IPC_RMID, None)
+            self.libc.free(ctypes.cast(ximage, ctypes.c_void_p))
+            raise RuntimeError(f"shmat failed (errno {ctypes.get_errno()})")
+
+        shminfo.shmid = shmid
+        shminfo.shmaddr = shmaddr
+        shminfo.readOnly = 0
+        ximage.contents.data = shmaddr
+
+        self.xext.XShmAttach(self.display, ctypes.byref(shminfo))
+        self.x11.XSync(self.display, 0)
+
+        # The segment is removed automatically once both sides detach
+        self.libc.shmctl(shmid, self._IPC_RMID, None)
+
+        self.shminfo = shminfo
+        self.ximage = ximage
+
+    def _release(self):
+        """Detach and free the current shared image"""
+        if self.ximage is None:
+            return
+
+        self.xext.XShmDetach(self.display, ctypes.byref(self.shminfo))
+        self.x11.XSync(self.display, 0)
+        self.libc.shmdt(self.shminfo.shmaddr)
+
+        # Free only the XImage struct; XDestroyImage would also free() the shared data
+        self.libc.free(ctypes.cast(self.ximage, ctypes.c_void_p))
+        self.shminfo = None
+        self.ximage = None
+
+    def grab(self, bbox=None):
+        if bbox is None:
+            left, top = 0, 0
+            width, height = self.screen_size
+        else:
+            left, top, right, bottom = bbox
+            width, height = right - left, bottom - top
+
+        with self.lock:
+            if self.ximage is None or (self.ximage.contents.width, self.ximage.contents.height) != (width, height):
+                self._allocate(width, height)
+
+            if not self.xext.XShmGetImage(self.display, self.root, self.ximage, left, top, 0xFFFFFFFF):
+                raise RuntimeError("XShmGetImage failed")
+
+            image = self.ximage.contents
+            if image.bits_per_pixel != 32:
+                raise RuntimeError(f"Unsupported X image format ({image.bits_per_pixel} bits per pixel)")
+
+            # View the shared segment as BGRX rows, then copy out while converting
+            raw = (ctypes.c_ubyte * (image.bytes_per_line * height)).from_address(self.shminfo.shmaddr)
+            rows = np.ctypeslib.as_array(raw).reshape(height, image.bytes_per_line)
+            bgrx = rows[:, :width * 4].reshape(height, width, 4)
+            return cv2.cvtColor(bgrx, cv2.COLOR_BGRA2RGB)
+
+    def close(self):
+        with self.lock:
+            if self.display:
+                self._release()
+                self.x11.XCloseDisplay(self.display)
+                self.display = None
+
+# Registry of available backends by name
+BACKENDS = {
+    PILBackend.name: PILBackend,
+    MSSBackend.name: MSSBackend,
+    XShmBackend.name: XShmBackend,
+}
+
+def available_backends():
+    """
+    Instantiate every backend that works on this machine
+
+    Returns:
+        list: CaptureBackend instances
+    """
+    backends = []
+    for name, backend_class in BACKENDS.items():
+        try:
+            backends.append(backend_class())
+        except Exception as e:
+            print(f"Capture backend '{name}' unavailable: {str(e)}")
+    return backends
+
+def measure_backend(backend, samples=3, bbox=None):
+    """
+    Measure the median time a backend takes to grab the screen
+
+    Args:
+        backend (CaptureBackend): The backend to measure
+        samples (int): Number of timed grabs
+        bbox (tuple, optional): Region to grab
+
+    Returns:
+        float: Median grab time in seconds
+    """
+    backend.grab(bbox)  # Warm up (allocations, connections)
+    timings = []
+    for _ in range(samples):
+        start_time = time.perf_counter()
+        backend.grab(bbox)
+        timings.append(time.perf_counter() - start_time)
+    return float(np.median(timings))
+
+def create_backend(backend_name=None):
+    """
+    Create the configured capture backend
+
+    Args:
+        backend_name (str, optional): "auto", "pil", "mss" or "xshm". If not provided,
+                                      will look for CAPTURE_BACKEND environment variable
+                                      and default to "auto", which measures every
+                                      available backend and keeps the fastest
+
+    Returns:
+        CaptureBackend: The backend
+    """
+    # Load environment variables
+    load_dotenv()
+    backend_name = (backend_name or os.getenv("CAPTURE_BACKEND") or "auto").lower()
+
+    if backend_name != "auto":
+        try:
+            return BACKENDS[backend_name]()
+        except KeyError:
+            print(f"Unknown capture backend '{backend_name}'. Selecting automatically.")
+        except Exception as e:
+            print(f"Capture backend '{backend_name}' unavailable: {str(e)}. Selecting automatically.")
+
+    fastest, fastest_time = None, None
+    for backend in available_backends():
+        try:
+            elapsed = measure_backend(backend)
+        except Exception as e:
+            print(f"Capture backend '{backend.name}' failed: {str(e)}")
+            backend.close()
+            continue
+
+        print(f"Capture backend '{backend.name}': {elapsed * 1000:.1f} ms per grab")
+        if fastest is None or elapsed < fastest_time:
+            if fastest is not None:
+                fastest.close()
+            fastest, fastest_time = backend, elapsed
+        else:
+            backend.close()
+
+    if fastest is None:
+        # Nothing could grab during selection; let PIL report errors on capture
+        return PILBackend()
+
+    print(f"Using capture backend '{fastest.name}'")
+    return fastest
@@ -0,0 +1,123 @@
+import os
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+
+class ChangeResult:
+    """Outcome of comparing a capture against the previous one"""
+
+    def __init__(self, changed_fraction, regions, changed):
+        self.changed_fraction = changed_fraction  # Fraction of the downsampled frame that changed (0-1)
+        self.regions = regions                    # (x, y, width, height) boxes in full-resolution pixels
+        self.changed = changed                    # True if the change exceeds the threshold
+
+    def __str__(self):
+        return f"{self.changed_fraction * 100:.2f}% changed in {len(self.regions)} region(s)"
+
+class ChangeDetector:
+    """
+    Detects whether the screen changed between captures
+
+    Frames are reduced to a small grayscale thumbnail and compared cell by
+    cell, so the check costs a few milliseconds even on a 4K capture.
+    """
+
+    DEFAULT_THRESHOLD = 0.002  # Fraction of thumbnail cells that must change
+    GRID_WIDTH = 192           # Thumbnail width; height follows the aspect ratio
+    PIXEL_DELTA = 24           # Minimum brightness difference for a cell to count as changed
+
+    def __init__(self, threshold=None, grid_width=None, pixel_delta=None):
+        """
+        Initialize the ChangeDetector
+
+        Args:
+            threshold (float, optional): Changed fraction at or below which the screen
+                                         counts as unchanged. If not provided, will look for
+                                         SCREEN_CHANGE_THRESHOLD environment variable
+            grid_width (int, optional): Width of the comparison thumbnail
+            pixel_delta (int, optional): Brightness difference that marks a cell as changed
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.threshold = float(threshold if threshold is not None
+                               else os.getenv("SCREEN_CHANGE_THRESHOLD") or self.DEFAULT_THRESHOLD)
+        self.grid_width = grid_width or self.GRID_WIDTH
+        self.pixel_delta = pixel_delta or self.PIXEL_DELTA
+
+        # Thumbnail and full-resolution shape of the capture compared against
+        self.previous_thumbnail = None
+        self.previous_shape = None
+
+        # Last capture compared with remember=False, until accept() makes it the baseline
+        self.pending_thumbnail = None
+        self.pending_shape = None
+
+    def _thumbnail(self, image):
+        """Reduce an image to a small grayscale thumbnail"""
+        # Channel order only changes the gray weights, which does not matter for a diff
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        height, width = gray.shape
+        grid_height = max(1, round(height * self.grid_width / width))
+        return cv2.resize(gray, (self.grid_width, grid_height), interpolation=cv2.INTER_AREA)
+
+    def compare(self, image, remember=True):
+        """
+        Compare a capture with the baseline capture
+
+        Args:
+            image (numpy.ndarray): The captured image
+            remember (bool): Make this capture the baseline for the next comparison.
+                             If False, it only becomes the baseline when accept() is called
+
+        Returns:
+            ChangeResult: How much of the screen changed and where
+        """
+        image = np.asarray(image)
+        thumbnail = self._thumbnail(image)
+        height, width = image.shape[:2]
+
+        self.pending_thumbnail = thumbnail
+        self.pending_shape = (height, width)
+        baseline_thumbnail, baseline_shape = self.previous_thumbnail, self.previous_shape
+        if remember:
+            self.accept()
+
+        # Nothing to compare against (first capture or resolution changed)
+        if baseline_thumbnail is None or baseline_shape != (height, width):
+            return ChangeResult(1.0, [(0, 0, width, height)], True)
+
+        mask = (cv2.absdiff(thumbnail, baseline_thumbnail) > self.pixel_delta).astype(np.uint8)
+
+        changed_fraction = float(mask.mean())
+        regions = self._changed_regions(mask, width / mask.shape[1], height / mask.shape[0])
+        return ChangeResult(changed_fraction, regions, changed_fraction > self.threshold)
+
+    def _changed_regions(self, mask, scale_x, scale_y):
+        """Group changed cells into boxes scaled back to full resolution"""
+        if not mask.any():
+            return []
+
+        # Merge nearby cells so one changed widget becomes one region
+        mask = cv2.dilate(mask, np.ones((3, 3), np.uint8))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+
+        regions = []
+        for x, y, w, h, _ in stats[1:count]:
+            regions.append((int(x * scale_x), int(y * scale_y), int(np.ceil(w * scale_x)), int(np.ceil(h * scale_y))))
+        return regions
+
+    def accept(self):
+        """Make the last compared capture the baseline"""
+        if self.pending_thumbnail is not None:
+            self.previous_thumbnail = self.pending_thumbnail
+            self.previous_shape = self.pending_shape
+            self.pending_thumbnail = None
+            self.pending_shape = None
+
+    def reset(self):
+        """Forget the baseline capture"""
+        self.previous_thumbnail = None
+        self.previous_shape = None
+        self.pending_thumbnail = None
+        self.pending_shape = None
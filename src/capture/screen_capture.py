@@ -1,102 +1,191 @@
+import io
+import threading
 import numpy as np
 import cv2
-from PIL import ImageGrab, Image
+from PIL import Image
 from PyQt6.QtGui import QImage, QPixmap
 from PyQt6.QtCore import Qt
+from capture.capture_backends import create_backend
 
 class ScreenCapture:
     """Class for handling screen capture operations"""
-    
-    def __init__(self):
-        self.captured_image = None
-        self.captured_pil_image = None
-    
+
+    # Channel order of the canonical capture buffer
+    COLOR_ORDER = "RGB"
+
+    def __init__(self, backend=None):
+        """
+        Initialize the ScreenCapture
+
+        Args:
+            backend (CaptureBackend or str, optional): Backend instance or name
+                                                       ("auto", "pil", "mss", "xshm").
+                                                       If not provided, CAPTURE_BACKEND
+                                                       is used when the first capture is taken
+        """
+        # Backends are created on first use, since automatic selection grabs the screen
+        self._backend = None if isinstance(backend, (str, type(None))) else backend
+        self._backend_name = backend if isinstance(backend, str) else None
+        self._backend_lock = threading.Lock()
+
+        # Canonical RGB buffer (height x width x 3, uint8) of the last capture.
+        # Every other representation is derived from it on demand.
+        self.buffer = None
+
+        # Incremented on every capture so derived data can be cached per capture
+        self.capture_id = 0
+
+        # Lazily derived representations of the current buffer
+        self._pil_view = None
+        self._bgr_image = None
+        self._png_bytes = None
+
+    def get_backend(self):
+        """
+        Get the capture backend, creating it on first use
+
+        Returns:
+            CaptureBackend: The backend
+        """
+        with self._backend_lock:
+            if self._backend is None:
+                self._backend = create_backend(self._backend_name)
+            return self._backend
+
+    def _set_buffer(self, rgb_array):
+        """
+        Make a grabbed RGB array the canonical buffer
+
+        Args:
+            rgb_array (numpy.ndarray): The grabbed screenshot from the backend
+        """
+        self.buffer = np.ascontiguousarray(rgb_array)
+        self.capture_id += 1
+
+        self._pil_view = None
+        self._bgr_image = None
+        self._png_bytes = None
+
     def capture_screen(self):
         """
         Capture the entire screen
-        
+
         Returns:
-            PIL.Image: The captured screenshot
-        """
-        # Capture the screen using PIL's ImageGrab
-        self.captured_pil_image = ImageGrab.grab()
-        
-        # Convert to numpy array for OpenCV operations
-        self.captured_image = np.array(self.captured_pil_image)
-        
-        # Convert from RGB to BGR (OpenCV format)
-        self.captured_image = cv2.cvtColor(self.captured_image, cv2.COLOR_RGB2BGR)
-        
-        return self.captured_pil_image
-    
+            numpy.ndarray: The captured screenshot as an RGB array
+        """
+        # Capture the screen using the selected backend
+        self._set_buffer(self.get_backend().grab())
+        return self.buffer
+
     def capture_region(self, x, y, width, height):
         """
         Capture a specific region of the screen
-        
+
         Args:
             x (int): Left coordinate
             y (int): Top coordinate
             width (int): Width of region
             height (int): Height of region
-            
+
         Returns:
-            PIL.Image: The captured region
+            numpy.ndarray: The captured region as an RGB array
         """
         # Capture specific region
-        self.captured_pil_image = ImageGrab.grab(bbox=(x, y, x + width, y + height))
-        
-        # Convert to numpy array for OpenCV operations
-        self.captured_image = np.array(self.captured_pil_image)
-        
-        # Convert from RGB to BGR (OpenCV format)
-        self.captured_image = cv2.cvtColor(self.captured_image, cv2.COLOR_RGB2BGR)
-        
-        return self.captured_pil_image
-    
+        self._set_buffer(self.get_backend().grab(bbox=(x, y, x + width, y + height)))
+        return self.buffer
+
     def get_captured_image(self):
         """
         Get the captured image as a numpy array
-        
+
         Returns:
-            numpy.ndarray: The captured image
+            numpy.ndarray: The canonical RGB buffer (not a copy)
         """
-        return self.captured_image
-    
+        return self.buffer
+
+    def get_captured_bgr_image(self):
+        """
+        Get the captured image in OpenCV's BGR channel order
+
+        The conversion is done on the first call and cached for this capture.
+
+        Returns:
+            numpy.ndarray: The captured image in BGR order
+        """
+        if self.buffer is None:
+            return None
+
+        if self._bgr_image is None:
+            self._bgr_image = cv2.cvtColor(self.buffer, cv2.COLOR_RGB2BGR)
+        return self._bgr_image
+
     def get_captured_pil_image(self):
         """
         Get the captured image as a PIL Image
-        
+
+        Returns:
+            PIL.Image: A view sharing memory with the canonical buffer
+        """
+        if self.buffer is None:
+            return None
+
+        if self._pil_view is None:
+            height, width = self.buffer.shape[:2]
+            self._pil_view = Image.frombuffer("RGB", (width, height), self.buffer, "raw", "RGB", 0, 1)
+        return self._pil_view
+
+    def get_png_bytes(self):
+        """
+        Get the captured image encoded as PNG
+
+        The image is encoded on the first call and cached for this capture.
+
         Returns:
-            PIL.Image: The captured image
+            bytes: The PNG data, or None if nothing has been captured
         """
-        return self.captured_pil_image
-    
+        if self.buffer is None:
+            return None
+
+        if self._png_bytes is None:
+            img_byte_arr = io.BytesIO()
+            self.get_captured_pil_image().save(img_byte_arr, format='PNG', compress_level=3)
+            self._png_bytes = img_byte_arr.getvalue()
+        return self._png_bytes
+
+    def get_qt_image(self):
+        """
+        Get a QImage over the canonical buffer without copying it
+
+        The QImage is only valid while this capture is current.
+
+        Returns:
+            QImage: The image, or None if nothing has been captured
+        """
+        if self.buffer is None:
+            return None
+
+        height, width = self.buffer.shape[:2]
+        return QImage(self.buffer.data, width, height, self.buffer.strides[0], QImage.Format.Format_RGB888)
+
     def get_qt_pixmap(self, max_width=None, max_height=None):
         """
         Convert the captured image to a QPixmap for display in PyQt
-        
+
         Args:
             max_width (int, optional): Maximum width for scaling
             max_height (int, optional): Maximum height for scaling
-            
+
         Returns:
             QPixmap: The image as a QPixmap
         """
-        if self.captured_pil_image is None:
+        q_img = self.get_qt_image()
+        if q_img is None:
             return None
-        
-        # Convert PIL Image to QImage
-        img = self.captured_pil_image
-        img_data = img.tobytes("raw", "RGB")
-        q_img = QImage(img_data, img.width, img.height, img.width * 3, QImage.Format.Format_RGB888)
-        
-        # Convert to QPixmap
-        pixmap = QPixmap.fromImage(q_img)
-        
-        # Scale if necessary
-        if max_width and max_height and (pixmap.width() > max_width or pixmap.height() > max_height):
-            pixmap = pixmap.scaled(max_width, max_height, 
-                                  Qt.AspectRatioMode.KeepAspectRatio, 
-                                  Qt.TransformationMode.SmoothTransformation)
-        
-        return pixmap
\ No newline at end of file
+
+        # Scale the zero-copy QImage first so only the preview is converted
+        if max_width and max_height and (q_img.width() > max_width or q_img.height() > max_height):
+            q_img = q_img.scaled(max_width, max_height,
+                                 Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+
+        return QPixmap.fromImage(q_img)
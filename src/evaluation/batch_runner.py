@@ -0,0 +1,551 @@
+"""
+Headless batch evaluation of Claude on quiz datasets
+
+Run from the src directory:
+
+    python main.py eval corpus/                      # directory of screenshots (OCR)
+    python main.py eval questions.jsonl -o results.jsonl --concurrency 16
+    python main.py eval corpus/manifest.jsonl --ocr  # OCR the images a JSONL points to
+    python main.py eval questions.jsonl --async --concurrency 64
+    python main.py eval questions.jsonl --route      # fast model first, escalate when unsure
+    python main.py eval questions.jsonl --structured # letter and confidence from a tool call
+
+Each input item becomes one line in the results JSONL as soon as it finishes.
+Re-running with the same output file skips items that already succeeded, so
+an interrupted run picks up where it stopped.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from PIL import Image
+from ai.async_claude_client import AsyncClaudeClient
+from ai.claude_client import ClaudeClient
+from ai.model_router import ModelRouter
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+class EvalItem:
+    """One question to evaluate"""
+
+    def __init__(self, item_id, question_text=None, image_path=None, question_type=None,
+                 expected_letter=None, expected_answer=None):
+        self.item_id = item_id                  # Unique id, used to resume runs
+        self.question_text = question_text      # Question text; None to OCR image_path
+        self.image_path = image_path            # Screenshot to OCR
+        self.question_type = question_type      # "multiple_choice", "short_answer" or None to classify
+        self.expected_letter = expected_letter  # Correct choice letter for multiple-choice questions
+        self.expected_answer = expected_answer  # Reference answer for short-answer questions
+
+def _item_from_record(record, base_dir, item_id, use_ocr):
+    """Build an EvalItem from a JSON record (corpus ground truth or a JSONL line)"""
+    image_path = record.get("image")
+    if image_path and not os.path.isabs(image_path):
+        image_path = os.path.join(base_dir, image_path)
+
+    question_text = None
+    if not use_ocr or not image_path:
+        question_text = record.get("text")
+        if not question_text and record.get("question"):
+            question_text = "\n".join([record["question"]] + list(record.get("choices") or []))
+
+    question_type = record.get("question_type")
+    if question_type is None and "choices" in record:
+        question_type = "multiple_choice" if record["choices"] else "short_answer"
+
+    return EvalItem(
+        str(record.get("id") or item_id),
+        question_text=question_text,
+        image_path=image_path,
+        question_type=question_type,
+        expected_letter=record.get("correct"),
+        expected_answer=record.get("answer"),
+    )
+
+def load_items(source, use_ocr=False):
+    """
+    Load evaluation items from a directory of images or a JSONL file
+
+    Images in a directory may have a .json file of the same name with the
+    answer key ("correct" letter and/or "answer"). JSONL lines hold "text" or
+    "question" (+ "choices"), optionally "image", "id", "question_type",
+    "correct" and "answer".
+
+    Args:
+        source (str): Directory or .jsonl path
+        use_ocr (bool): OCR the images a JSONL points to instead of using its text
+
+    Returns:
+        list: EvalItem objects
+    """
+    items = []
+    if os.path.isdir(source):
+        for path in sorted(glob.glob(os.path.join(source, "*"))):
+            stem, extension = os.path.splitext(path)
+            if extension.lower() not in IMAGE_EXTENSIONS:
+                continue
+            record = {}
+            if os.path.exists(stem + ".json"):
+                with open(stem + ".json", encoding="utf-8") as f:
+                    record = json.load(f)
+            record["image"] = path
+            record.setdefault("id", os.path.basename(stem))
+            items.append(_item_from_record(record, source, record["id"], use_ocr=True))
+        return items
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                items.append(_item_from_record(json.loads(line), base_dir, f"line_{line_number}", use_ocr))
+    return items
+
+def extract_choice_letter(answer_text):
+    """
+    Find the answer choice Claude picked
+
+    Args:
+        answer_text (str): Claude's answer
+
+    Returns:
+        str or None: The letter, or None if no choice was found
+    """
+    # Only a capital letter set off as a choice counts, so the article "A" or words such as "Because" do not
+    hedge = r"(?i:(?:clearly|definitely|probably|most\s+likely)\s+)?"
+    choice = r"\**\(?([A-H])\)?\**(?=[.:;,!)*]|\s*$)"
+    patterns = [
+        # "The correct answer is B", "Answer: (C)", "the right one is clearly C."
+        r"\b(?i:correct\s+(?:answer|option|choice)|answer)\s*(?i:is|:)?\s*[:\-]?\s*" + hedge
+        + r"\**\(?([A-H])\)?(?=[\s.:;,!)*]|$)",
+        r"\b(?i:it|one|that)(?:\s+(?i:is)|'s)\s+" + hedge + choice,
+        # "B) ...", "B. ...", "(B) ...", "**B** ..." or "**B.**" at the start of the response, or only the letter
+        r"^[\s>#_]*(?:\(([A-H])\)|\*\*\(?([A-H])\)?[.:)]?\*\*|([A-H])(?:[.:)]|\s*$))",
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, answer_text.strip())
+        if match:
+            return next(letter for letter in match.groups() if letter)
+    return None
+
+def _normalize(text):
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+class BatchEvaluator:
+    """Runs OCR and Claude over many quiz items with bounded concurrency"""
+
+    DEFAULT_CONCURRENCY = 8
+    DEFAULT_MAX_TOKENS = 1000
+
+    def __init__(self, claude_client, text_extractor_factory=None, concurrency=None, max_tokens=None,
+                 structured=False, ocr_concurrency=None):
+        """
+        Initialize the BatchEvaluator
+
+        Args:
+            claude_client (ClaudeClient): Client used to answer the questions
+            text_extractor_factory (callable, optional): Creates a TextExtractor; needed for items
+                                                         that must be OCR'd. Each OCR thread gets
+                                                         its own, since an extractor keeps the state
+                                                         of the image it is working on
+            concurrency (int, optional): Items processed at once. Defaults to DEFAULT_CONCURRENCY
+            ocr_concurrency (int, optional): Images OCR'd at once. Defaults to the CPU count divided
+                                             by OCR_WORKERS, since each extractor's tiled OCR starts
+                                             that many processes of its own
+            max_tokens (int, optional): Maximum tokens per answer. Defaults to DEFAULT_MAX_TOKENS,
+                                        or the client's STRUCTURED_MAX_TOKENS for structured answers
+            structured (bool): Ask for structured answers (letter, confidence, rationale)
+                               and score the letter instead of scraping it from text
+        """
+        self.claude_client = claude_client
+        self.text_extractor_factory = text_extractor_factory
+        self.thread_state = threading.local()
+        self.concurrency = concurrency or self.DEFAULT_CONCURRENCY
+        if ocr_concurrency is None:
+            ocr_concurrency = (os.cpu_count() or 1) // int(os.getenv("OCR_WORKERS") or 1)
+        self.ocr_concurrency = max(1, min(ocr_concurrency, self.concurrency))
+
+        # Threads OCR runs on while a run is in progress (None runs it on the caller's thread)
+        self.ocr_executor = None
+        self.max_tokens = max_tokens
+        self.structured = structured
+
+        # Serializes writes to the results file
+        self.write_lock = threading.Lock()
+
+    @staticmethod
+    def completed_ids(output_path):
+        """
+        Get the ids of items that already succeeded in a previous run
+
+        Args:
+            output_path (str): Results JSONL
+
+        Returns:
+            set: Item ids with status "ok"
+        """
+        done = set()
+        if not os.path.exists(output_path):
+            return done
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by an interrupted run
+                    continue
+                if record.get("status") == "ok":
+                    done.add(record["id"])
+        return done
+
+    def evaluate_item(self, item):
+        """
+        OCR (if needed), classify and answer one item
+
+        Args:
+            item (EvalItem): The item
+
+        Returns:
+            dict: The result record written to the results file
+        """
+        result = {"id": item.item_id, "image": item.image_path, "status": "ok", "error": None}
+        start_time = time.perf_counter()
+
+        try:
+            question_text, question_type = self._run_ocr_stage(item, result).result()
+            if self.structured:
+                answer = self.claude_client.get_structured_answer(question_text, question_type, self.max_tokens)
+            else:
+                answer = self.claude_client.get_answer(question_text, question_type,
+                                                       self.max_tokens or self.DEFAULT_MAX_TOKENS)
+            self._finish(item, result, question_text, question_type, answer)
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = f"{type(e).__name__}: {str(e)}"
+
+        result["latency"] = time.perf_counter() - start_time
+        return result
+
+    async def evaluate_item_async(self, item):
+        """
+        Async version of evaluate_item for an AsyncClaudeClient
+
+        OCR runs on the OCR threads; the Claude call shares the client's
+        connection pool with every other in-flight item.
+        """
+        result = {"id": item.item_id, "image": item.image_path, "status": "ok", "error": None}
+        start_time = time.perf_counter()
+
+        try:
+            question_text, question_type = await asyncio.wrap_future(self._run_ocr_stage(item, result))
+            if self.structured:
+                answer = await self.claude_client.ask_structured(question_text, question_type, self.max_tokens)
+            else:
+                answer = await self.claude_client.ask(question_text, question_type,
+                                                      self.max_tokens or self.DEFAULT_MAX_TOKENS)
+            self._finish(item, result, question_text, question_type, answer)
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = f"{type(e).__name__}: {str(e)}"
+
+        result["latency"] = time.perf_counter() - start_time
+        return result
+
+    def _text_extractor(self):
+        """Get the calling thread's TextExtractor, creating it on first use"""
+        text_extractor = getattr(self.thread_state, "text_extractor", None)
+        if text_extractor is None:
+            text_extractor = self.text_extractor_factory()
+            self.thread_state.text_extractor = text_extractor
+        return text_extractor
+
+    def _run_ocr_stage(self, item, result):
+        """
+        Submit _prepare to the OCR threads
+
+        Only ocr_concurrency threads ever create a TextExtractor, however many
+        items are in flight, so the number of OCR processes stays bounded.
+
+        Returns:
+            concurrent.futures.Future: Resolves to (question_text, question_type)
+        """
+        if self.ocr_executor is not None:
+            return self.ocr_executor.submit(self._prepare, item, result)
+
+        future = Future()
+        try:
+            future.set_result(self._prepare(item, result))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _prepare(self, item, result):
+        """OCR and classify an item; returns (question_text, question_type)"""
+        question_text = item.question_text
+        result["ocr_latency"] = 0.0
+        if question_text is None:
+            if self.text_extractor_factory is None:
+                raise ValueError("Item has no text and no text extractor was given")
+            ocr_start = time.perf_counter()
+            question_text = self._ocr(item.image_path)
+            result["ocr_latency"] = time.perf_counter() - ocr_start
+
+        question_type = item.question_type
+        if question_type is None:
+            if self.text_extractor_factory is not None:
+                is_multiple_choice = self._text_extractor().is_multiple_choice(question_text)
+            else:
+                is_multiple_choice = item.expected_letter is not None
+            question_type = "multiple_choice" if is_multiple_choice else "short_answer"
+        return question_text, question_type
+
+    def _finish(self, item, result, question_text, question_type, answer):
+        """Record and score Claude's answer"""
+        result.update({
+            "question_type": question_type,
+            "question_text": question_text,
+            "answer": answer.text,
+            "model": answer.model,
+            "answer_latency": answer.latency,
+            "input_tokens": answer.input_tokens,
+            "output_tokens": answer.output_tokens,
+            "cached": answer.cached,
+            "attempts": answer.attempts,
+            "cache_read_tokens": answer.cache_read_tokens,
+            "cache_write_tokens": answer.cache_write_tokens,
+            "confidence": getattr(answer, "confidence", None),
+        })
+        result.update(self.score(item, question_type, answer.text, getattr(answer, "letter", None),
+                                 getattr(answer, "short_answer", None)))
+
+    def _ocr(self, image_path):
+        """OCR an image file"""
+        with Image.open(image_path) as image:
+            return self._text_extractor().extract_text(image.convert("RGB"))
+
+    def score(self, item, question_type, answer_text, letter=None, short_answer=None):
+        """
+        Compare an answer with the item's key
+
+        Args:
+            item (EvalItem): The item
+            question_type (str): Either "multiple_choice" or "short_answer"
+            answer_text (str): Claude's answer
+            letter (str, optional): The option a structured answer picked; used instead
+                                    of extracting one from the text
+            short_answer (str, optional): The answer field of a structured answer; compared
+                                          instead of the full text, which adds the rationale
+
+        Returns:
+            dict: predicted letter, expected key and correctness (None without a key)
+        """
+        if question_type == "multiple_choice" or item.expected_letter:
+            predicted = letter or extract_choice_letter(answer_text)
+            expected = item.expected_letter.upper() if item.expected_letter else None
+            correct = None if expected is None else predicted == expected
+            return {"predicted": predicted, "expected": expected, "correct": correct}
+
+        expected = item.expected_answer
+        correct = None if not expected else _normalize(expected) in _normalize(short_answer or answer_text)
+        return {"predicted": None, "expected": expected, "correct": correct}
+
+    def run(self, items, output_path, resume=True, progress_every=25):
+        """
+        Evaluate items and append a result line for each as it finishes
+
+        Args:
+            items (list): EvalItem objects
+            output_path (str): Results JSONL (appended to)
+            resume (bool): Skip items that already succeeded in output_path
+            progress_every (int): Print progress after this many items
+
+        Returns:
+            dict: Summary of this run
+        """
+        done = self.completed_ids(output_path) if resume else set()
+        pending = [item for item in items if item.item_id not in done]
+        if done:
+            print(f"Resuming: {len(items) - len(pending)} of {len(items)} items already done")
+
+        start_time = time.perf_counter()
+        results = []
+
+        # A run killed mid-write can leave a partial last line; start on a fresh one
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            with open(output_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+            if needs_newline:
+                with open(output_path, "a", encoding="utf-8") as f:
+                    f.write("\n")
+
+        def record(result):
+            results.append(result)
+            with self.write_lock:
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+
+            count = len(results)
+            if count % progress_every == 0 or count == len(pending):
+                elapsed = time.perf_counter() - start_time
+                print(f"{count}/{len(pending)} items, {count / elapsed * 3600:.0f} items/hour")
+
+        if self.text_extractor_factory is not None:
+            self.ocr_executor = ThreadPoolExecutor(max_workers=self.ocr_concurrency, thread_name_prefix="ocr")
+
+        with open(output_path, "a", encoding="utf-8") as output:
+            try:
+                if isinstance(self.claude_client, AsyncClaudeClient):
+                    asyncio.run(self._run_async(pending, record))
+                else:
+                    self._run_threads(pending, record)
+            except KeyboardInterrupt:
+                print("Interrupted; finished items are saved and will be skipped on the next run")
+                raise
+            finally:
+                if self.ocr_executor is not None:
+                    self.ocr_executor.shutdown(wait=False, cancel_futures=True)
+                    self.ocr_executor = None
+
+        return self.summarize(results, time.perf_counter() - start_time)
+
+    def _run_threads(self, items, record):
+        """Evaluate items on a thread pool, one blocking Claude call per thread"""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(self.evaluate_item, item) for item in items]
+            try:
+                for future in as_completed(futures):
+                    record(future.result())
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    async def _run_async(self, items, record):
+        """
+        Evaluate items on one event loop
+
+        At most `concurrency` items are in flight; the next one is started as
+        each finishes, so a large corpus is not turned into tasks all at once.
+        """
+        remaining = iter(items)
+        in_flight = set()
+        try:
+            while True:
+                while len(in_flight) < self.concurrency:
+                    item = next(remaining, None)
+                    if item is None:
+                        break
+                    in_flight.add(asyncio.ensure_future(self.evaluate_item_async(item)))
+                if not in_flight:
+                    break
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    record(task.result())
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await self.claude_client.aclose()
+
+    @staticmethod
+    def summarize(results, elapsed):
+        """
+        Aggregate result records
+
+        Returns:
+            dict: Counts, accuracy, throughput, latency and token totals
+        """
+        succeeded = [result for result in results if result["status"] == "ok"]
+        scored = [result for result in succeeded if result.get("correct") is not None]
+        latencies = sorted(result["answer_latency"] for result in succeeded)
+
+        return {
+            "items": len(results),
+            "errors": len(results) - len(succeeded),
+            "scored": len(scored),
+            "accuracy": sum(result["correct"] for result in scored) / len(scored) if scored else None,
+            "items_per_hour": len(results) / elapsed * 3600 if elapsed > 0 else 0.0,
+            "median_answer_latency": latencies[len(latencies) // 2] if latencies else None,
+            "input_tokens": sum(result["input_tokens"] for result in succeeded),
+            "output_tokens": sum(result["output_tokens"] for result in succeeded),
+            "cached": sum(1 for result in succeeded if result["cached"]),
+            "retries": sum(max(0, result.get("attempts", 1) - 1) for result in succeeded),
+            "cache_read_tokens": sum(result.get("cache_read_tokens", 0) for result in succeeded),
+            "answered_by": dict(Counter(result["model"] for result in succeeded if not result["cached"])),
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py eval", description="Evaluate Claude on a quiz dataset")
+    parser.add_argument("source", help="Directory of screenshots or a JSONL file of questions")
+    parser.add_argument("-o", "--output", default="eval_results.jsonl",
+                        help="Results JSONL; existing successes are skipped (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=BatchEvaluator.DEFAULT_CONCURRENCY,
+                        help="Items processed at once (default: %(default)s)")
+    parser.add_argument("--ocr-concurrency", type=int,
+                        help="Images OCR'd at once (default: CPU count divided by OCR_WORKERS)")
+    parser.add_argument("--model", help="Claude model (default: ClaudeClient.DEFAULT_MODEL)")
+    parser.add_argument("--max-tokens", type=int,
+                        help="Maximum tokens per answer (default: 1000, or 256 with --structured)")
+    parser.add_argument("--ocr", action="store_true", help="OCR the images a JSONL points to instead of using its text")
+    parser.add_argument("--cache", action="store_true", help="Use the answer cache (off so every item hits the API)")
+    parser.add_argument("--no-resume", action="store_true", help="Re-run items that already succeeded")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Send requests from one event loop over a shared connection pool "
+                             "(--concurrency bounds in-flight requests)")
+    parser.add_argument("--structured", action="store_true",
+                        help="Ask for a letter, confidence and rationale through a tool call instead of prose")
+    parser.add_argument("--route", action="store_true",
+                        help="Ask a fast model first and escalate unsure answers (see CLAUDE_ROUTER_MODELS)")
+    args = parser.parse_args(argv)
+    if args.route and (args.use_async or args.model):
+        parser.error("--route cannot be combined with --async or --model")
+
+    # Load environment variables
+    load_dotenv()
+
+    items = load_items(args.source, use_ocr=args.ocr)
+    if not items:
+        print(f"No items found in {args.source}")
+        return 1
+
+    answer_cache = None
+    if args.cache:
+        from ai.answer_cache import AnswerCache
+        answer_cache = AnswerCache()
+    if args.route:
+        claude_client = ModelRouter(answer_cache=answer_cache)
+    elif args.use_async:
+        claude_client = AsyncClaudeClient(model=args.model, answer_cache=answer_cache,
+                                          max_concurrency=args.concurrency)
+    else:
+        claude_client = ClaudeClient(model=args.model, answer_cache=answer_cache)
+
+    text_extractor_factory = None
+    if any(item.question_text is None for item in items):
+        from ocr.ocr_cache import OCRCache
+        from ocr.text_extractor import TextExtractor
+        # The OCR cache is thread-safe, so the per-thread extractors share one
+        ocr_cache = OCRCache()
+
+        def text_extractor_factory():
+            text_extractor = TextExtractor(os.getenv("TESSERACT_PATH"), ocr_cache=ocr_cache)
+            # Every image is a different screen, so never reuse the previous question region
+            if text_extractor.region_detector is not None:
+                text_extractor.region_detector.reuse_last = False
+            return text_extractor
+
+    evaluator = BatchEvaluator(claude_client, text_extractor_factory, args.concurrency, args.max_tokens,
+                               structured=args.structured, ocr_concurrency=args.ocr_concurrency)
+    summary = evaluator.run(items, args.output, resume=not args.no_resume)
+
+    print(f"\nResults written to {args.output}")
+    for key, value in summary.items():
+        print(f"  {key}: {value:.3f}" if isinstance(value, float) else f"  {key}: {value}")
+    return 0
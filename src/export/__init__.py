@@ -1,6 +1,12 @@
 # Export module for the Quiz Analyzer application
 # Contains functionality for sending and exporting quiz answers
 
+from export.attachment_encoder import AttachmentEncoder, EncodedAttachment
 from export.email_sender import EmailSender
+from export.exporter import (Exporter, ExportRecord, ExportManager, JsonlExporter, ParquetExporter,
+                             WebhookExporter, DirectoryExporter, create_exporters)
+from export.outbox import Outbox
 
-__all__ = ['EmailSender']
\ No newline at end of file
+__all__ = ['AttachmentEncoder', 'EncodedAttachment', 'EmailSender', 'Outbox', 'Exporter', 'ExportRecord',
+           'ExportManager', 'JsonlExporter', 'ParquetExporter', 'WebhookExporter', 'DirectoryExporter',
+           'create_exporters']
\ No newline at end of file
@@ -0,0 +1,187 @@
+import io
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+from PIL import Image, features
+from dotenv import load_dotenv
+
+class EncodedAttachment:
+    """An encoded screenshot ready to attach to an email"""
+
+    def __init__(self, data, image_format, width, height, encode_time):
+        self.data = data                # Encoded bytes
+        self.format = image_format      # "PNG", "WEBP" or "JPEG"
+        self.width = width              # Size of the encoded image in pixels
+        self.height = height
+        self.encode_time = encode_time  # Seconds spent cropping, scaling and encoding
+
+    @property
+    def filename(self):
+        extension = {"JPEG": "jpg"}.get(self.format, self.format.lower())
+        return f"screenshot.{extension}"
+
+    def __str__(self):
+        return (f"{self.format} {self.width}x{self.height}, {len(self.data) / 1024:.0f} KB "
+                f"in {self.encode_time * 1000:.0f} ms")
+
+class AttachmentEncoder:
+    """
+    Turns captures into email attachments that fit a byte budget
+
+    The capture is cropped to the detected question region (with a margin),
+    scaled down to MAX_DIMENSION, then encoded as PNG, WebP and JPEG in that
+    order until one fits in the budget; if none does, the image is scaled
+    down further. Encoding runs on a background thread and the result is
+    cached per capture, so the GUI thread only waits if it asks before the
+    encoding is done.
+    """
+
+    DEFAULT_MAX_BYTES = 1024 * 1024  # Attachment budget
+    DEFAULT_MAX_DIMENSION = 1920     # Longest side in pixels before encoding
+    MIN_DIMENSION = 480              # Stop shrinking below this; send the smallest encoding
+    SHRINK_FACTOR = 0.75
+    REGION_MARGIN = 24               # Pixels kept around the question region
+    JPEG_QUALITY = 85
+    WEBP_QUALITY = 85
+    CACHE_SIZE = 8                   # Encoded captures kept
+
+    def __init__(self, max_bytes=None, max_dimension=None, crop_to_region=None):
+        """
+        Initialize the AttachmentEncoder
+
+        Args:
+            max_bytes (int, optional): Byte budget per attachment. Defaults to
+                                       ATTACHMENT_MAX_BYTES or DEFAULT_MAX_BYTES
+            max_dimension (int, optional): Longest side in pixels. Defaults to
+                                           ATTACHMENT_MAX_DIMENSION or DEFAULT_MAX_DIMENSION
+            crop_to_region (bool, optional): Crop to the question region when one is given.
+                                             Defaults to ATTACHMENT_CROP (on)
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.max_bytes = int(max_bytes or os.getenv("ATTACHMENT_MAX_BYTES") or self.DEFAULT_MAX_BYTES)
+        self.max_dimension = int(max_dimension or os.getenv("ATTACHMENT_MAX_DIMENSION")
+                                 or self.DEFAULT_MAX_DIMENSION)
+        if crop_to_region is None:
+            crop_to_region = os.getenv("ATTACHMENT_CROP", "true").lower() not in ("0", "false", "no")
+        self.crop_to_region = crop_to_region
+
+        # Formats tried in order; WebP only if Pillow was built with it
+        self.formats = ["PNG", "WEBP", "JPEG"] if features.check("webp") else ["PNG", "JPEG"]
+
+        # Futures of encoded captures, keyed by (capture_id, region), least recently used first
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="attachment-encoder")
+
+    def submit(self, capture_id, image, region=None):
+        """
+        Start encoding a capture in the background (once per capture and region)
+
+        Args:
+            capture_id (int): Identifies the capture, for the cache
+            image (numpy.ndarray): The capture as an RGB array; it must not be modified afterwards
+            region (tuple, optional): (x, y, width, height) of the question block
+
+        Returns:
+            concurrent.futures.Future: Resolves to an EncodedAttachment
+        """
+        key = (capture_id, tuple(region) if region is not None and self.crop_to_region else None)
+        with self.lock:
+            future = self.cache.get(key)
+            # A failed encoding is tried again rather than cached
+            if future is None or (future.done() and future.exception() is not None):
+                future = self.executor.submit(self.encode, image, key[1])
+                self.cache[key] = future
+                while len(self.cache) > self.CACHE_SIZE:
+                    self.cache.popitem(last=False)
+            else:
+                self.cache.move_to_end(key)
+        return future
+
+    def get(self, capture_id, image, region=None):
+        """
+        Get the encoded capture, waiting for the background encoding if needed
+
+        Returns:
+            EncodedAttachment: The attachment
+        """
+        return self.submit(capture_id, image, region).result()
+
+    def encode(self, image, region=None):
+        """
+        Crop, scale and encode an image within the byte budget
+
+        Args:
+            image (numpy.ndarray): RGB array
+            region (tuple, optional): (x, y, width, height) to crop to
+
+        Returns:
+            EncodedAttachment: The first encoding that fits, or the smallest one tried
+        """
+        start_time = time.perf_counter()
+        if region is not None:
+            image = self._crop(image, region)
+        image = self._scale(image, self.max_dimension)
+
+        smallest = None
+        while True:
+            pil_image = Image.fromarray(np.ascontiguousarray(image))
+            for image_format in self.formats:
+                data = self._save(pil_image, image_format)
+                if smallest is None or len(data) < len(smallest[0]):
+                    smallest = (data, image_format, pil_image.size)
+                if len(data) <= self.max_bytes:
+                    return EncodedAttachment(data, image_format, pil_image.width, pil_image.height,
+                                             time.perf_counter() - start_time)
+
+            longest = max(image.shape[:2])
+            if longest <= self.MIN_DIMENSION:
+                break
+            image = self._scale(image, max(self.MIN_DIMENSION, int(longest * self.SHRINK_FACTOR)))
+
+        data, image_format, (width, height) = smallest
+        print(f"Attachment is {len(data) / 1024:.0f} KB, over the {self.max_bytes / 1024:.0f} KB budget")
+        return EncodedAttachment(data, image_format, width, height, time.perf_counter() - start_time)
+
+    def _crop(self, image, region):
+        """Crop to the region plus REGION_MARGIN, clamped to the image"""
+        x, y, width, height = region
+        image_height, image_width = image.shape[:2]
+        left = max(0, x - self.REGION_MARGIN)
+        top = max(0, y - self.REGION_MARGIN)
+        right = min(image_width, x + width + self.REGION_MARGIN)
+        bottom = min(image_height, y + height + self.REGION_MARGIN)
+        if right <= left or bottom <= top:
+            return image
+        return image[top:bottom, left:right]
+
+    @staticmethod
+    def _scale(image, max_dimension):
+        """Scale down so the longest side is at most max_dimension"""
+        height, width = image.shape[:2]
+        scale = max_dimension / max(height, width)
+        if scale >= 1:
+            return image
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    def _save(self, pil_image, image_format):
+        """Encode with settings that suit screenshots"""
+        buffer = io.BytesIO()
+        if image_format == "PNG":
+            pil_image.save(buffer, format="PNG", compress_level=3)
+        elif image_format == "WEBP":
+            pil_image.save(buffer, format="WEBP", quality=self.WEBP_QUALITY, method=4)
+        else:
+            pil_image.save(buffer, format="JPEG", quality=self.JPEG_QUALITY, optimize=True)
+        return buffer.getvalue()
+
+    def close(self):
+        """Stop the background thread"""
+        self.executor.shutdown(wait=False)
@@ -1,14 +1,39 @@
 import os
 import smtplib
+import threading
+import time
+from email import policy
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
 from dotenv import load_dotenv
+from export.exporter import Exporter
 
-class EmailSender:
-    """Class for sending emails with quiz answers"""
+class EmailSender(Exporter):
+    """
+    Class for sending emails with quiz answers
+    
+    The authenticated SMTP session is opened on the first send and reused
+    by later ones, so sending to several recipients costs one TLS handshake
+    and login. It is closed after IDLE_TIMEOUT seconds without use (or by
+    close() / leaving a with block) and reopened on demand.
+    
+    Gmail over implicit TLS is the default; another server (such as the
+    local sink in benchmarks/smtp_sink.py) can be set with EMAIL_SMTP_HOST,
+    EMAIL_SMTP_PORT and EMAIL_SMTP_SECURITY.
+    """
+    
+    name = "email"
     
-    def __init__(self, sender_email=None, app_password=None):
+    SMTP_HOST = "smtp.gmail.com"
+    SMTP_SECURITY = "ssl"
+    IDLE_TIMEOUT = 60  # Seconds an unused session stays open
+    
+    # Connection security modes and their usual ports
+    SECURITY_PORTS = {"ssl": 465, "starttls": 587, "none": 25}
+    
+    def __init__(self, sender_email=None, app_password=None, idle_timeout=None,
+                 smtp_host=None, smtp_port=None, smtp_security=None):
         """
         Initialize the EmailSender with Gmail credentials
         
@@ -17,6 +42,16 @@ class EmailSender:
                                          If not provided, will look for EMAIL_ADDRESS env variable
             app_password (str, optional): Gmail app password 
                                          If not provided, will look for EMAIL_APP_PASSWORD env variable
+            idle_timeout (float, optional): Seconds before an unused session is closed.
+                                            Defaults to EMAIL_IDLE_TIMEOUT_SECONDS or IDLE_TIMEOUT
+            smtp_host (str, optional): SMTP server. Defaults to EMAIL_SMTP_HOST or SMTP_HOST
+            smtp_port (int, optional): SMTP port. Defaults to EMAIL_SMTP_PORT or the usual
+                                       port of the security mode
+            smtp_security (str, optional): "ssl" (implicit TLS), "starttls" or "none".
+                                           Defaults to EMAIL_SMTP_SECURITY or SMTP_SECURITY
+        
+        Raises:
+            ValueError: If credentials are missing or the security mode is unknown
         """
         # Load environment variables
         load_dotenv()
@@ -31,6 +66,158 @@ class EmailSender:
         
         if not self.app_password:
             raise ValueError("App password is required. Please provide it or set EMAIL_APP_PASSWORD environment variable.")
+        
+        self.idle_timeout = float(idle_timeout or os.getenv("EMAIL_IDLE_TIMEOUT_SECONDS") or self.IDLE_TIMEOUT)
+        
+        # SMTP server settings
+        self.smtp_host = smtp_host or os.getenv("EMAIL_SMTP_HOST") or self.SMTP_HOST
+        self.smtp_security = (smtp_security or os.getenv("EMAIL_SMTP_SECURITY") or self.SMTP_SECURITY).lower()
+        if self.smtp_security not in self.SECURITY_PORTS:
+            raise ValueError(f"Unknown SMTP security mode '{self.smtp_security}'. "
+                             f"Use one of: {', '.join(self.SECURITY_PORTS)}")
+        self.smtp_port = int(smtp_port or os.getenv("EMAIL_SMTP_PORT") or self.SECURITY_PORTS[self.smtp_security])
+        
+        # Pooled SMTP session, shared by worker threads one send at a time
+        self.server = None
+        self.last_used_at = 0.0
+        self.idle_timer = None
+        self.lock = threading.RLock()
+        
+        # Handshakes made this session, to check that sends share them
+        self.connections = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _connect(self):
+        """Open and authenticate a new SMTP session"""
+        if self.smtp_security == "ssl":
+            server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port)
+        else:
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+        try:
+            if self.smtp_security == "starttls":
+                server.starttls()
+            # Servers without AUTH (a local relay or sink) take mail unauthenticated
+            server.ehlo_or_helo_if_needed()
+            if server.has_extn("auth"):
+                server.login(self.sender_email, self.app_password)
+        except Exception:
+            server.close()
+            raise
+        self.connections += 1
+        return server
+    
+    def _get_server(self):
+        """Get the open session, reconnecting if there is none or it sat idle too long"""
+        if self.server is not None and time.monotonic() - self.last_used_at > self.idle_timeout:
+            self._close_server()
+        if self.server is None:
+            self.server = self._connect()
+        self.last_used_at = time.monotonic()
+        return self.server
+    
+    def _close_server(self):
+        """Close the session, ignoring errors from a connection the server already dropped"""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+    
+    def _schedule_idle_close(self):
+        """Restart the timer that closes the session once it is idle"""
+        self.last_used_at = time.monotonic()
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+        self.idle_timer = threading.Timer(self.idle_timeout, self._close_if_idle)
+        self.idle_timer.daemon = True
+        self.idle_timer.start()
+    
+    def _close_if_idle(self):
+        with self.lock:
+            if self.server is not None and time.monotonic() - self.last_used_at >= self.idle_timeout:
+                self._close_server()
+    
+    def close(self):
+        """Close the SMTP session (the next send opens a new one)"""
+        with self.lock:
+            if self.idle_timer is not None:
+                self.idle_timer.cancel()
+                self.idle_timer = None
+            self._close_server()
+    
+    def build_message(self, question_text, answer_text, subject="Quiz Answer from Claude", image_data=None):
+        """
+        Build the email for a quiz answer, without a recipient
+        
+        Args:
+            question_text (str): The quiz question
+            answer_text (str): Claude's answer to the question
+            subject (str, optional): Email subject line
+            image_data (bytes, optional): Screenshot image data to attach
+            
+        Returns:
+            bytes: The message with CRLF line endings and no To header
+        """
+        # Create message
+        message = MIMEMultipart()
+        message["From"] = self.sender_email
+        message["Subject"] = subject
+        
+        # Create the email body with HTML formatting
+        html_content = f"""
+        <html>
+        <body>
+            <h2>Quiz Question</h2>
+            <p>{question_text}</p>
+            
+            <h2>Claude's Answer</h2>
+            <p>{answer_text}</p>
+            
+            <hr>
+            <p><em>Sent from Quiz Analyzer Application</em></p>
+        </body>
+        </html>
+        """
+        
+        # Attach the HTML content
+        message.attach(MIMEText(html_content, "html"))
+        
+        # Attach the screenshot if provided
+        if image_data:
+            image = MIMEImage(image_data)
+            extension = {"jpeg": "jpg"}.get(image.get_content_subtype(), image.get_content_subtype())
+            image.add_header("Content-Disposition", "attachment", filename=f"screenshot.{extension}")
+            message.attach(image)
+        
+        # Encode once; every recipient gets the same bytes behind their own To header
+        return message.as_bytes(policy=policy.SMTP)
+    
+    def export(self, record):
+        """
+        Send a pipeline result to its recipients (the Exporter interface)
+        
+        Args:
+            record (ExportRecord): The result, with its recipients and subject
+            
+        Returns:
+            bool: True if every recipient was sent the email
+            str: Success message or the errors
+        """
+        if not record.recipients:
+            return False, "No recipients selected"
+        results = self.send_many(record.recipients, record.question_text, record.answer_text,
+                                 record.subject, record.image_data)
+        failures = [message for _, success, message in results if not success]
+        if failures:
+            return False, "; ".join(failures)
+        return True, f"Email sent to {len(results)} recipient(s)"
     
     def send_quiz_answer(self, recipient_email, question_text, answer_text, 
                         subject="Quiz Answer from Claude", image_data=None):
@@ -48,90 +235,63 @@ class EmailSender:
             bool: True if email was sent successfully, False otherwise
             str: Success message or error description
         """
-        try:
-            # Create message
-            message = MIMEMultipart()
-            message["From"] = self.sender_email
-            message["To"] = recipient_email
-            message["Subject"] = subject
-            
-            # Create the email body with HTML formatting
-            html_content = f"""
-            <html>
-            <body>
-                <h2>Quiz Question</h2>
-                <p>{question_text}</p>
-                
-                <h2>Claude's Answer</h2>
-                <p>{answer_text}</p>
-                
-                <hr>
-                <p><em>Sent from Quiz Analyzer Application</em></p>
-            </body>
-            </html>
-            """
-            
-            # Attach the HTML content
-            message.attach(MIMEText(html_content, "html"))
-            
-            # Attach the screenshot if provided
-            if image_data:
-                image = MIMEImage(image_data)
-                image.add_header("Content-Disposition", "attachment", filename="screenshot.png")
-                message.attach(image)
-            
-            # Connect to Gmail's SMTP server
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-                # Login to the account
-                server.login(self.sender_email, self.app_password)
-                
-                # Send the email
-                server.send_message(message)
-            
-            return True, "Email sent successfully to " + recipient_email
-            
-        except smtplib.SMTPAuthenticationError:
-            return False, "Authentication failed. Please check your email and app password."
-        except smtplib.SMTPException as e:
-            return False, f"SMTP error: {str(e)}"
-        except Exception as e:
-            return False, f"Unexpected error: {str(e)}"
-
-# Simple test function to verify the module works
-def test_email_sender():
-    """
-    Test the EmailSender class with sample data
-    This function can be called directly to test the module
+        _, success, message = self.send_many([recipient_email], question_text, answer_text,
+                                             subject, image_data)[0]
+        return success, message
     
-    Example:
-        # Set your test email address
-        recipient = "test@example.com"
-        
-        # Run the test
-        test_email_sender(recipient)
-    """
-    try:
-        # Create the sender
-        sender = EmailSender()
-        
-        # Sample data
-        recipient = input("Enter recipient email for test: ")
-        question = "What is the capital of France?"
-        answer = "The capital of France is Paris."
-        
-        # Send a test email
-        success, message = sender.send_quiz_answer(recipient, question, answer)
+    def send_many(self, recipients, question_text, answer_text, subject="Quiz Answer from Claude",
+                  image_data=None):
+        """
+        Send the same quiz answer to several recipients over one SMTP session
         
-        # Print result
-        print(f"Result: {'Success' if success else 'Failed'}")
-        print(f"Message: {message}")
+        The message is built once and only the To header differs per
+        recipient. A session the server dropped is reopened once.
         
-        return success
+        Args:
+            recipients (list): Email addresses to send to
+            question_text (str): The quiz question
+            answer_text (str): Claude's answer to the question
+            subject (str, optional): Email subject line
+            image_data (bytes, optional): Screenshot image data to attach
+            
+        Returns:
+            list: (recipient, success, message) for each recipient
+        """
+        try:
+            body = self.build_message(question_text, answer_text, subject, image_data)
+        except Exception as e:
+            return [(recipient, False, f"Unexpected error: {str(e)}") for recipient in recipients]
         
-    except Exception as e:
-        print(f"Test failed: {str(e)}")
-        return False
-
-if __name__ == "__main__":
-    # If this file is run directly, perform a test
-    test_email_sender()
\ No newline at end of file
+        results = []
+        with self.lock:
+            for index, recipient in enumerate(recipients):
+                try:
+                    self._send_one(recipient, body)
+                    results.append((recipient, True, "Email sent successfully to " + recipient))
+                except smtplib.SMTPAuthenticationError:
+                    # Every other recipient would fail the same way
+                    message = "Authentication failed. Please check your email and app password."
+                    results.extend((r, False, message) for r in recipients[index:])
+                    break
+                except smtplib.SMTPException as e:
+                    results.append((recipient, False, f"SMTP error: {str(e)}"))
+                except OSError as e:
+                    # The server cannot be reached, so the other recipients cannot be sent either
+                    self._close_server()
+                    message = f"Connection error: {str(e)}"
+                    results.extend((r, False, message) for r in recipients[index:])
+                    break
+                except Exception as e:
+                    self._close_server()
+                    results.append((recipient, False, f"Unexpected error: {str(e)}"))
+            self._schedule_idle_close()
+        return results
+    
+    def _send_one(self, recipient, body):
+        """Send the prepared message to one recipient, reconnecting once if the session was dropped"""
+        data = f"To: {recipient}\r\n".encode("utf-8") + body
+        try:
+            self._get_server().sendmail(self.sender_email, [recipient], data)
+        except smtplib.SMTPServerDisconnected:
+            self._close_server()
+            self._get_server().sendmail(self.sender_email, [recipient], data)
@@ -0,0 +1,425 @@
+import os
+import json
+import time
+import uuid
+import threading
+import http.client
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from app_data import data_path
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+class ExportRecord:
+    """The result of one pipeline run, as handed to every exporter"""
+
+    def __init__(self, question_text, answer_text, question_type=None, image_data=None, recipients=None,
+                 subject="Quiz Answer from Claude", record_id=None, metadata=None):
+        self.record_id = record_id or uuid.uuid4().hex[:8]  # Pipeline run ID when there is one
+        self.created_at = time.time()
+        self.question_text = question_text
+        self.answer_text = answer_text
+        self.question_type = question_type
+        self.image_data = image_data          # Encoded screenshot, if any
+        self.recipients = list(recipients or [])  # Email recipients (only the email exporter uses them)
+        self.subject = subject                # Email subject line
+        self.metadata = dict(metadata or {})  # Anything else worth keeping, such as stage timings
+
+    @property
+    def image_extension(self):
+        """File extension of the screenshot ("png", "webp", "jpg"), or None without one"""
+        if not self.image_data:
+            return None
+        if self.image_data.startswith(b"\x89PNG"):
+            return "png"
+        if self.image_data[8:12] == b"WEBP":
+            return "webp"
+        return "jpg"
+
+    def to_dict(self):
+        """
+        Get the record as JSON-serializable data (the screenshot is left out)
+
+        Returns:
+            dict: Record fields
+        """
+        return {
+            "record_id": self.record_id,
+            "created_at": self.created_at,
+            "question_type": self.question_type,
+            "question_text": self.question_text,
+            "answer_text": self.answer_text,
+            "image_bytes": len(self.image_data or b""),
+            "metadata": self.metadata,
+        }
+
+class Exporter:
+    """Base class for the places pipeline results are sent to"""
+
+    name = "base"
+
+    def export(self, record):
+        """
+        Send one result
+
+        Args:
+            record (ExportRecord): The result
+
+        Returns:
+            tuple: (success, message)
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the exporter"""
+        pass
+
+class JsonlExporter(Exporter):
+    """Appends each result as one JSON line to a results log"""
+
+    name = "jsonl"
+
+    RESULTS_FILE = "results.jsonl"
+
+    def __init__(self, path=None):
+        """
+        Initialize the JsonlExporter
+
+        Args:
+            path (str, optional): Log file. Defaults to EXPORT_JSONL_PATH or a file in the data directory
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.path = path or os.getenv("EXPORT_JSONL_PATH") or data_path(self.RESULTS_FILE)
+        # Kept open for the session; every line is flushed so readers see it at once
+        self.lock = threading.Lock()
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def export(self, record):
+        line = json.dumps(record.to_dict(), ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+        return True, f"Appended to {self.path}"
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+class ParquetExporter(Exporter):
+    """
+    Writes results to a Parquet file, for loading into dataframes
+
+    Records are buffered and written as row groups of BATCH_SIZE; the file
+    is only complete after close(), so use the JSONL log to follow results
+    live. Needs pyarrow.
+    """
+
+    name = "parquet"
+
+    BATCH_SIZE = 50
+
+    SCHEMA_FIELDS = [
+        ("record_id", "string"),
+        ("created_at", "float64"),
+        ("question_type", "string"),
+        ("question_text", "string"),
+        ("answer_text", "string"),
+        ("image_bytes", "int64"),
+        ("metadata", "string"),  # JSON, since its keys vary
+    ]
+
+    def __init__(self, path=None, batch_size=None):
+        """
+        Initialize the ParquetExporter
+
+        Args:
+            path (str, optional): Output file. Defaults to EXPORT_PARQUET_PATH or a
+                                  timestamped file in the data directory
+            batch_size (int, optional): Records per row group. Defaults to BATCH_SIZE
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        if pyarrow is None:
+            raise ImportError("pyarrow is required for Parquet export (pip install pyarrow)")
+
+        # Load environment variables
+        load_dotenv()
+
+        self.path = path or os.getenv("EXPORT_PARQUET_PATH") or data_path(
+            time.strftime("results-%Y%m%d-%H%M%S.parquet")
+        )
+        self.batch_size = int(batch_size or self.BATCH_SIZE)
+        self.schema = pyarrow.schema([(name, getattr(pyarrow, kind)()) for name, kind in self.SCHEMA_FIELDS])
+        self.lock = threading.Lock()
+        self.rows = []
+        self.writer = None
+
+    def export(self, record):
+        row = record.to_dict()
+        row["metadata"] = json.dumps(row["metadata"])
+        with self.lock:
+            self.rows.append(row)
+            if len(self.rows) >= self.batch_size:
+                self._write_rows()
+        return True, f"Buffered for {self.path}"
+
+    def _write_rows(self):
+        """Write the buffered rows as one row group"""
+        if not self.rows:
+            return
+        if self.writer is None:
+            self.writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+        self.writer.write_table(pyarrow.Table.from_pylist(self.rows, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        with self.lock:
+            self._write_rows()
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+
+class WebhookExporter(Exporter):
+    """
+    POSTs each result as JSON to an HTTP endpoint
+
+    One keep-alive connection is reused for every post and reopened when
+    the server drops it. The screenshot is not sent.
+    """
+
+    name = "webhook"
+
+    TIMEOUT = 5.0  # Seconds per request
+
+    def __init__(self, url=None, token=None, timeout=None):
+        """
+        Initialize the WebhookExporter
+
+        Args:
+            url (str, optional): Endpoint URL. Defaults to EXPORT_WEBHOOK_URL
+            token (str, optional): Sent as a bearer token. Defaults to EXPORT_WEBHOOK_TOKEN
+            timeout (float, optional): Seconds per request. Defaults to EXPORT_WEBHOOK_TIMEOUT or TIMEOUT
+
+        Raises:
+            ValueError: If no URL is configured or it is not http(s)
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.url = url or os.getenv("EXPORT_WEBHOOK_URL")
+        if not self.url:
+            raise ValueError("Webhook URL is required. Please provide it or set EXPORT_WEBHOOK_URL environment variable.")
+        parts = urlsplit(self.url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Webhook URL must be http or https: {self.url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        self.timeout = float(timeout or os.getenv("EXPORT_WEBHOOK_TIMEOUT") or self.TIMEOUT)
+        self.headers = {"Content-Type": "application/json"}
+        token = token or os.getenv("EXPORT_WEBHOOK_TOKEN")
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+        self.lock = threading.Lock()
+        self.connection = None
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _post(self, body):
+        """Send the body on the kept-alive connection and read the response"""
+        if self.connection is None:
+            self.connection = self._connect()
+        self.connection.request("POST", self.target, body=body, headers=self.headers)
+        response = self.connection.getresponse()
+        response.read()
+        if response.will_close:
+            self._close_connection()
+        return response.status
+
+    def export(self, record):
+        body = json.dumps(record.to_dict(), ensure_ascii=False).encode("utf-8")
+        with self.lock:
+            try:
+                status = self._post(body)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed the idle connection; try once on a new one
+                self._close_connection()
+                try:
+                    status = self._post(body)
+                except OSError as e:
+                    self._close_connection()
+                    return False, f"Webhook error: {str(e)}"
+            except (OSError, http.client.HTTPException) as e:
+                self._close_connection()
+                return False, f"Webhook error: {str(e)}"
+
+        if 200 <= status < 300:
+            return True, f"Posted to {self.url}"
+        return False, f"Webhook answered HTTP {status}"
+
+    def _close_connection(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def close(self):
+        with self.lock:
+            self._close_connection()
+
+class DirectoryExporter(Exporter):
+    """
+    Drops each result into a directory as <record_id>.json plus its screenshot
+
+    Files are written under a temporary name and renamed into place, so a
+    program watching the directory never reads a partial file. The JSON is
+    written last and names the screenshot.
+    """
+
+    name = "directory"
+
+    EXPORT_DIRECTORY = "exports"
+
+    def __init__(self, path=None):
+        """
+        Initialize the DirectoryExporter
+
+        Args:
+            path (str, optional): Directory. Defaults to EXPORT_DIRECTORY or a folder in the data directory
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.path = path or os.getenv("EXPORT_DIRECTORY") or data_path(self.EXPORT_DIRECTORY)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _write(self, filename, data):
+        temp_path = os.path.join(self.path, f".{filename}.tmp")
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, os.path.join(self.path, filename))
+
+    def export(self, record):
+        data = record.to_dict()
+        if record.image_data:
+            data["image_file"] = f"{record.record_id}.{record.image_extension}"
+            self._write(data["image_file"], record.image_data)
+        self._write(f"{record.record_id}.json", json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+        return True, f"Saved to {self.path}"
+
+EXPORTERS = {
+    JsonlExporter.name: JsonlExporter,
+    ParquetExporter.name: ParquetExporter,
+    WebhookExporter.name: WebhookExporter,
+    DirectoryExporter.name: DirectoryExporter,
+}
+
+def create_exporters(sink_names=None, email_exporter=None):
+    """
+    Create the configured exporters
+
+    Args:
+        sink_names (str or list, optional): Comma-separated names or a list of "email",
+                                            "jsonl", "parquet", "webhook" and "directory".
+                                            If not provided, will look for EXPORT_SINKS
+                                            environment variable and default to "email"
+        email_exporter (Exporter, optional): Exporter used for "email" (an EmailSender
+                                             or Outbox), since it needs the email settings
+
+    Returns:
+        list: Exporter instances; sinks that cannot be set up are skipped with a message
+    """
+    # Load environment variables
+    load_dotenv()
+    if sink_names is None:
+        sink_names = os.getenv("EXPORT_SINKS") or "email"
+    if isinstance(sink_names, str):
+        sink_names = sink_names.split(",")
+
+    exporters = []
+    for name in dict.fromkeys(name.strip().lower() for name in sink_names if name.strip()):
+        if name == "email":
+            if email_exporter is None:
+                print("Export sink 'email' unavailable: email is not configured")
+            else:
+                exporters.append(email_exporter)
+            continue
+        if name not in EXPORTERS:
+            print(f"Unknown export sink '{name}'. Use one of: email, {', '.join(EXPORTERS)}")
+            continue
+        try:
+            exporters.append(EXPORTERS[name]())
+        except Exception as e:
+            print(f"Export sink '{name}' unavailable: {str(e)}")
+    return exporters
+
+class ExportManager:
+    """Sends each result to every exporter at once"""
+
+    def __init__(self, exporters):
+        """
+        Initialize the ExportManager
+
+        Args:
+            exporters (list): Exporter instances, e.g. from create_exporters()
+        """
+        self.exporters = list(exporters)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.exporters)),
+                                           thread_name_prefix="exporter")
+
+    def names(self):
+        """
+        Get the names of the exporters
+
+        Returns:
+            list: Exporter names, in order
+        """
+        return [exporter.name for exporter in self.exporters]
+
+    def export(self, record):
+        """
+        Send a result to every exporter concurrently and wait for all of them
+
+        A slow or failing exporter does not hold up or break the others.
+
+        Args:
+            record (ExportRecord): The result
+
+        Returns:
+            list: (exporter name, success, message) for each exporter
+        """
+        futures = [(exporter, self.executor.submit(self._export_one, exporter, record))
+                   for exporter in self.exporters]
+        return [(exporter.name,) + future.result() for exporter, future in futures]
+
+    @staticmethod
+    def _export_one(exporter, record):
+        """Run one exporter, turning errors into a failed result"""
+        start_time = time.perf_counter()
+        try:
+            success, message = exporter.export(record)
+        except Exception as e:
+            success, message = False, f"{type(e).__name__}: {str(e)}"
+        elapsed = time.perf_counter() - start_time
+        return success, f"{message} ({elapsed * 1000:.0f} ms)"
+
+    def close(self):
+        """Close every exporter"""
+        self.executor.shutdown(wait=True)
+        for exporter in self.exporters:
+            try:
+                exporter.close()
+            except Exception as e:
+                print(f"Error closing export sink '{exporter.name}': {str(e)}")
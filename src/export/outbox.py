@@ -0,0 +1,304 @@
+import os
+import time
+import uuid
+import random
+import sqlite3
+import threading
+from dotenv import load_dotenv
+from app_data import data_path
+from export.exporter import Exporter
+
+class Outbox(Exporter):
+    """
+    Persistent queue of quiz answer emails, sent by a background thread
+
+    Messages are written to a SQLite spool before enqueue() returns, so
+    callers never wait for the SMTP server and a crash does not lose them.
+    The sender thread delivers each message to its recipients through the
+    EmailSender and retries failed recipients with exponential backoff until
+    MAX_ATTEMPTS is reached. Enqueuing again with the same message ID (the
+    pipeline run ID for exported results) is a no-op, so a result is not sent
+    twice; without an ID every call is a new message, so re-sending works.
+    """
+
+    name = "email"
+
+    OUTBOX_FILE = "outbox.sqlite3"
+    MAX_ATTEMPTS = 6
+    BASE_DELAY = 5.0     # Seconds before the first retry (doubles each attempt)
+    MAX_DELAY = 600.0    # Longest wait between attempts
+    KEEP_SENT_HOURS = 24 * 7
+
+    # Delivery states of a recipient
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    def __init__(self, email_sender, db_path=None, max_attempts=None):
+        """
+        Initialize the Outbox
+
+        Args:
+            email_sender (EmailSender): Sender used to deliver the messages
+            db_path (str, optional): Path to the SQLite spool. If not provided, will look
+                                     for EMAIL_OUTBOX_PATH environment variable and fall back
+                                     to a file in the per-user data directory
+            max_attempts (int, optional): Attempts per recipient before giving up.
+                                          Defaults to EMAIL_OUTBOX_MAX_ATTEMPTS or MAX_ATTEMPTS
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.email_sender = email_sender
+        self.db_path = db_path or os.getenv("EMAIL_OUTBOX_PATH") or data_path(self.OUTBOX_FILE)
+        self.max_attempts = int(max_attempts or os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS") or self.MAX_ATTEMPTS)
+
+        # The connection is shared with the sender thread, so access is serialized
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "message_id TEXT PRIMARY KEY, "
+                "subject TEXT NOT NULL, "
+                "question_text TEXT NOT NULL, "
+                "answer_text TEXT NOT NULL, "
+                "image_data BLOB, "
+                "created_at REAL NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS deliveries ("
+                "message_id TEXT NOT NULL REFERENCES messages (message_id), "
+                "recipient TEXT NOT NULL, "
+                "status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "next_attempt_at REAL NOT NULL, "
+                "last_error TEXT, "
+                "sent_at REAL, "
+                "PRIMARY KEY (message_id, recipient))"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS deliveries_due ON deliveries (status, next_attempt_at)")
+
+        # Set when new work arrives, so the sender does not wait out its sleep
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def enqueue(self, recipients, question_text, answer_text, subject="Quiz Answer from Claude",
+                image_data=None, message_id=None):
+        """
+        Queue a message for delivery and return immediately
+
+        Recipients that already have this message queued or sent are skipped.
+
+        Args:
+            recipients (list): Email addresses to send to
+            question_text (str): The quiz question
+            answer_text (str): Claude's answer
+            subject (str, optional): Email subject line
+            image_data (bytes, optional): Screenshot image data to attach
+            message_id (str, optional): Deduplication key, such as the pipeline run ID.
+                                        Defaults to a new ID, so the message is always sent
+
+        Returns:
+            str: The message ID, for status()
+        """
+        message_id = message_id or uuid.uuid4().hex
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO messages "
+                "(message_id, subject, question_text, answer_text, image_data, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (message_id, subject, question_text, answer_text, image_data, now)
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO deliveries (message_id, recipient, status, next_attempt_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(message_id, recipient, self.PENDING, now) for recipient in recipients]
+            )
+        self.wakeup.set()
+        return message_id
+
+    def export(self, record):
+        """
+        Queue a pipeline result for its recipients (the Exporter interface)
+
+        Args:
+            record (ExportRecord): The result, with its recipients and subject
+
+        Returns:
+            tuple: (success, message); success once the message is queued
+        """
+        if not record.recipients:
+            return False, "No recipients selected"
+        # Keyed on the record, so exporting the same pipeline run again does not send it twice
+        self.enqueue(record.recipients, record.question_text, record.answer_text, record.subject, record.image_data,
+                     message_id=f"record-{record.record_id}")
+        return True, f"Email queued for {', '.join(record.recipients)}"
+
+    def status(self, message_id):
+        """
+        Get the delivery state of a message
+
+        Args:
+            message_id (str): ID returned by enqueue()
+
+        Returns:
+            dict: Recipient to {"status", "attempts", "last_error"}
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT recipient, status, attempts, last_error FROM deliveries WHERE message_id = ?",
+                (message_id,)
+            ).fetchall()
+        return {recipient: {"status": status, "attempts": attempts, "last_error": last_error}
+                for recipient, status, attempts, last_error in rows}
+
+    def counts(self):
+        """
+        Get the number of deliveries in each state, for the GUI to poll
+
+        Returns:
+            dict: pending, sent and failed counts
+        """
+        counts = {self.PENDING: 0, self.SENT: 0, self.FAILED: 0}
+        with self.lock:
+            for status, count in self.conn.execute("SELECT status, COUNT(*) FROM deliveries GROUP BY status"):
+                counts[status] = count
+        return counts
+
+    def retry_failed(self):
+        """Queue every failed delivery again"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE deliveries SET status = ?, attempts = 0, next_attempt_at = ? WHERE status = ?",
+                (self.PENDING, time.time(), self.FAILED)
+            )
+        self.wakeup.set()
+
+    def start(self):
+        """Start the sender thread"""
+        if self.thread is None or not self.thread.is_alive():
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop the sender thread; undelivered messages stay queued for the next start"""
+        self.stopping.set()
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def close(self):
+        """Stop sending and close the spool"""
+        self.stop()
+        with self.lock:
+            self.conn.close()
+
+    def _run(self):
+        """Sender thread: deliver due messages, then sleep until the next one is due"""
+        while not self.stopping.is_set():
+            try:
+                delay = self.process_due()
+            except Exception as e:
+                print(f"Outbox error: {str(e)}")
+                delay = self.BASE_DELAY
+            self.wakeup.wait(delay)
+            self.wakeup.clear()
+
+    def process_due(self):
+        """
+        Attempt every delivery that is due
+
+        Returns:
+            float: Seconds until the next retry is due (an hour when nothing is queued)
+        """
+        now = time.time()
+        with self.lock:
+            due = self.conn.execute(
+                "SELECT d.message_id, d.recipient, d.attempts FROM deliveries d "
+                "WHERE d.status = ? AND d.next_attempt_at <= ? ORDER BY d.next_attempt_at",
+                (self.PENDING, now)
+            ).fetchall()
+
+        # One send_many per message, so its recipients share the SMTP session and the encoded body
+        by_message = {}
+        for message_id, recipient, attempts in due:
+            by_message.setdefault(message_id, []).append((recipient, attempts))
+        for message_id, recipients in by_message.items():
+            if self.stopping.is_set():
+                break
+            self._deliver(message_id, recipients)
+
+        self._purge_sent()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MIN(next_attempt_at) FROM deliveries WHERE status = ?", (self.PENDING,)
+            ).fetchone()
+        if row[0] is None:
+            return 3600.0
+        return max(0.0, row[0] - time.time())
+
+    def _deliver(self, message_id, recipients):
+        """Send one message to its due recipients and record the outcome"""
+        with self.lock:
+            message = self.conn.execute(
+                "SELECT subject, question_text, answer_text, image_data FROM messages WHERE message_id = ?",
+                (message_id,)
+            ).fetchone()
+        subject, question_text, answer_text, image_data = message
+        attempts = dict(recipients)
+
+        results = self.email_sender.send_many(list(attempts), question_text, answer_text, subject, image_data)
+
+        # Recipients of a message share one jitter, so their retries stay in one batch
+        now = time.time()
+        jitter = random.uniform(0.5, 1.0)
+        with self.lock, self.conn:
+            for recipient, success, result_message in results:
+                attempt = attempts[recipient] + 1
+                if success:
+                    self.conn.execute(
+                        "UPDATE deliveries SET status = ?, attempts = ?, last_error = NULL, sent_at = ? "
+                        "WHERE message_id = ? AND recipient = ?",
+                        (self.SENT, attempt, now, message_id, recipient)
+                    )
+                    continue
+
+                status = self.FAILED if attempt >= self.max_attempts else self.PENDING
+                self.conn.execute(
+                    "UPDATE deliveries SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? "
+                    "WHERE message_id = ? AND recipient = ?",
+                    (status, attempt, result_message, now + self.retry_delay(attempt) * jitter, message_id, recipient)
+                )
+                if status == self.FAILED:
+                    print(f"Outbox gave up on {recipient} after {attempt} attempts: {result_message}")
+                else:
+                    print(f"Outbox will retry {recipient} (attempt {attempt} failed: {result_message})")
+
+    def retry_delay(self, attempt):
+        """
+        Backoff after a failed attempt
+
+        Args:
+            attempt (int): Attempts made so far, starting at 1
+
+        Returns:
+            float: Seconds, doubling per attempt and capped at MAX_DELAY (before jitter)
+        """
+        return min(self.MAX_DELAY, self.BASE_DELAY * 2 ** (attempt - 1))
+
+    def _purge_sent(self):
+        """Drop messages queued more than KEEP_SENT_HOURS ago that have nothing left to send"""
+        cutoff = time.time() - self.KEEP_SENT_HOURS * 3600
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM messages WHERE created_at < ? AND message_id NOT IN "
+                "(SELECT message_id FROM deliveries WHERE status = ?)",
+                (cutoff, self.PENDING)
+            )
+            self.conn.execute("DELETE FROM deliveries WHERE message_id NOT IN (SELECT message_id FROM messages)")
@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QMessageBox, QInputDialog, QApplication
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QAction
 from dotenv import load_dotenv
 import os
@@ -10,15 +10,11 @@ from gui.question_panel import QuestionPanel
 from gui.response_panel import ResponsePanel
 from gui.system_tray_manager import SystemTrayManager
 from gui.hotkey_manager import HotkeyManager
+from gui.worker import WorkerPool
 
 class MainWindow(QMainWindow):
     """Main window for the Quiz Analyzer application"""
     
-    # Signals for communication between components
-    capture_completed = pyqtSignal(bool)  # Signal with success status
-    claude_completed = pyqtSignal(bool)   # Signal with success status
-    email_completed = pyqtSignal(bool)    # Signal with success status
-    
     def __init__(self):
         super().__init__()
         
@@ -34,6 +30,9 @@ class MainWindow(QMainWindow):
         # Initialize UI components
         self._init_ui()
         
+        # Whether a manual analysis is waiting for its result
+        self._analysis_pending = False
+        
         # Initialize system tray
         self.system_tray = SystemTrayManager(self)
         
@@ -44,7 +43,7 @@ class MainWindow(QMainWindow):
         self.hotkey_manager = HotkeyManager(self)
         self.hotkey_manager.start()
         
-        # Connect component signals to main window signals for forwarding
+        # Connect component signals
         self._connect_signals()
     
     def _init_ui(self):
@@ -71,34 +70,22 @@ class MainWindow(QMainWindow):
     
     def _connect_signals(self):
         """Connect signals between components"""
-        # Forward signals from components to main window signals
-        self.capture_panel.capture_completed.connect(self.capture_completed)
-        self.response_panel.claude_completed.connect(self.claude_completed)
-        self.response_panel.email_completed.connect(self.email_completed)
-        
-        # Connect capture button to process captured images
-        self.capture_panel.capture_completed.connect(self.on_capture_completed)
-        
         # CHANGE: Connect the new analyze button in question panel
         self.question_panel.analyze_btn.clicked.connect(self.on_analyze_button_clicked)
+        self.question_panel.text_extracted.connect(self.on_text_extracted)
         
-        # Connect hotkey manager to components
+        # Connect hotkey manager to components (the pipeline owns the
+        # automated capture -> OCR -> answer -> email sequence)
         self.hotkey_manager.connect_signals(
             self.capture_panel,
             self.question_panel,
             self.response_panel
         )
         
-        # Connect send button in response panel
+        # Connect send and email buttons in response panel
         self.response_panel.send_btn.clicked.connect(self.on_send_to_claude_clicked)
+        self.response_panel.email_btn.clicked.connect(self.on_send_email_clicked)
     
-    def on_capture_completed(self, success):
-        """Handle completion of capture to process the image"""
-        if success:
-            # Get the captured image and process it with OCR
-            image = self.capture_panel.get_captured_image()
-            self.question_panel.process_image(image)
-            
     # CHANGE: Added new method to handle the analyze button click
     def on_analyze_button_clicked(self):
         """Handle manual analysis button click in question panel"""
@@ -111,8 +98,19 @@ class MainWindow(QMainWindow):
             )
             return
             
-        # Process the image with OCR
-        success = self.question_panel.process_image(image)
+        # Process the image with OCR in the background
+        self._analysis_pending = self.question_panel.process_image(image, emit_signal=True)
+    
+    def on_text_extracted(self, success):
+        """Report the result of a manual analysis"""
+        # Encode the attachment now, for the pipeline's export stage or a manual email
+        if success:
+            self.capture_panel.prepare_attachment(self.question_panel.get_question_region())
+        
+        # Only report analyses started from the analyze button
+        if not self._analysis_pending:
+            return
+        self._analysis_pending = False
         
         # Show appropriate message
         if success:
@@ -129,11 +127,22 @@ class MainWindow(QMainWindow):
     def on_send_to_claude_clicked(self):
         """Handle send to Claude button click"""
         question_text = self.question_panel.get_question_text()
-        question_type = "multiple_choice" if self.question_panel.is_multiple_choice() else "short_answer"
+        question_type = self.question_panel.get_question_type()
         
         # Send to Claude
         self.response_panel.send_to_claude(question_text, question_type)
     
+    def on_send_email_clicked(self):
+        """Handle send by email button click"""
+        question_text = self.question_panel.get_question_text()
+        answer_text = self.response_panel.get_answer_text()
+        
+        # The screenshot, cropped to the question and encoded within the attachment budget
+        # in the background; the email worker waits for it
+        image_data = self.capture_panel.prepare_attachment(self.question_panel.get_question_region())
+        
+        self.response_panel.send_by_email(question_text, answer_text, image_data, show_dialog=True)
+    
     def show_hotkey_settings(self):
         """Show the hotkey settings dialog"""
         self.hotkey_manager.show_settings_dialog()
@@ -152,38 +161,12 @@ class MainWindow(QMainWindow):
         # Stop the hotkey service
         if hasattr(self, 'hotkey_manager'):
             self.hotkey_manager.stop()
+        
+        # Drop the results of any background work still in flight
+        WorkerPool.shared().cancel_all()
+        
+        # Finish result files and stop the email outbox
+        self.response_panel.close_exporters()
             
         # Close the application
         QApplication.quit()
-    
-    # These methods provide backward compatibility with the hotkey service
-    def capture_screen(self, emit_signal=False):
-        """Forward to capture panel"""
-        return self.capture_panel.capture_screen(emit_signal)
-    
-    def send_to_claude(self, emit_signal=False):
-        """Forward to response panel"""
-        question_text = self.question_panel.get_question_text()
-        question_type = "multiple_choice" if self.question_panel.is_multiple_choice() else "short_answer"
-        return self.response_panel.send_to_claude(question_text, question_type, emit_signal)
-    
-    def send_by_email(self, show_dialog=True, emit_signal=False):
-        """Forward to response panel"""
-        question_text = self.question_panel.get_question_text()
-        answer_text = self.response_panel.get_response_text()
-        
-        # Get the screenshot image if available
-        image_data = None
-        if self.capture_panel.get_captured_pil_image():
-            import io
-            img_byte_arr = io.BytesIO()
-            self.capture_panel.get_captured_pil_image().save(img_byte_arr, format='PNG')
-            image_data = img_byte_arr.getvalue()
-        
-        return self.response_panel.send_by_email(
-            question_text, 
-            answer_text,
-            image_data, 
-            show_dialog, 
-            emit_signal
-        )
\ No newline at end of file
@@ -3,6 +3,10 @@ from PyQt6.QtWidgets import (QGroupBox, QVBoxLayout, QHBoxLayout,
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QPixmap
 from capture.screen_capture import ScreenCapture
+from export.attachment_encoder import AttachmentEncoder
+from gui.worker import WorkerPool
+from PIL import Image
+import io
 
 class CapturePanel(QGroupBox):
     """UI panel for screenshot capture functionality"""
@@ -16,6 +20,13 @@ class CapturePanel(QGroupBox):
         # Initialize screen capture component
         self.screen_capture = ScreenCapture()
         
+        # Screenshots are cropped, scaled and encoded for email in the background
+        self.attachment_encoder = AttachmentEncoder()
+        
+        # Captures run on the shared worker pool
+        self.worker_pool = WorkerPool.shared()
+        self.capture_worker = None
+        
         # Set up the layout
         self._init_ui()
     
@@ -42,19 +53,36 @@ class CapturePanel(QGroupBox):
     
     def capture_screen(self, emit_signal=False):
         """
-        Capture the screen and update the UI
+        Start capturing the screen in the background and update the UI when done
         
         Args:
             emit_signal (bool): Whether to emit the capture_completed signal
             
         Returns:
-            bool: Success status
+            bool: True if the capture started, False otherwise
         """
+        if self.capture_worker is not None:
+            print("A capture is already in progress")
+            if emit_signal:
+                self.capture_completed.emit(False)
+            return False
+        
+        self.capture_btn.setEnabled(False)
+        
+        # Grab the screen off the GUI thread; the preview is built on completion
+        self.capture_worker = self.worker_pool.submit(
+            self.screen_capture.capture_screen,
+            on_result=lambda _: self._on_capture_result(emit_signal),
+            on_error=lambda e: self._on_capture_error(e, emit_signal),
+            on_cancelled=lambda: self._on_capture_cancelled(emit_signal),
+            on_finished=self._on_capture_finished
+        )
+        return True
+    
+    def _on_capture_result(self, emit_signal):
+        """Show the preview of a finished capture"""
         success = False
         try:
-            # Capture the entire screen
-            self.screen_capture.capture_screen()
-            
             # Get the captured image as a QPixmap and display it
             preview_pixmap = self.screen_capture.get_qt_pixmap(
                 max_width=self.preview_label.width(),
@@ -75,17 +103,74 @@ class CapturePanel(QGroupBox):
         # Emit signal only if requested (for hotkey sequence)
         if emit_signal:
             self.capture_completed.emit(success)
-        return success
+    
+    def _on_capture_error(self, error, emit_signal):
+        """Handle a capture that raised an exception"""
+        print(f"Failed to capture screen: {str(error)}")
+        self.preview_label.setText("Error capturing screen")
+        if emit_signal:
+            self.capture_completed.emit(False)
+    
+    def _on_capture_cancelled(self, emit_signal):
+        """Handle a capture that was cancelled"""
+        if emit_signal:
+            self.capture_completed.emit(False)
+    
+    def _on_capture_finished(self):
+        """Reset the UI once the capture worker is done"""
+        self.capture_worker = None
+        self.capture_btn.setEnabled(True)
     
     def get_captured_image(self):
         """
         Get the captured image
         
         Returns:
-            The captured image or None
+            numpy.ndarray or None: The captured RGB buffer (shared, not a copy)
         """
         return self.screen_capture.get_captured_image()
     
+    def get_captured_png_bytes(self):
+        """
+        Get the captured image encoded as PNG (encoded once per capture)
+        
+        Returns:
+            bytes or None: The PNG data
+        """
+        return self.screen_capture.get_png_bytes()
+    
+    def prepare_attachment(self, region=None):
+        """
+        Start encoding the capture as an email attachment in the background
+        
+        Args:
+            region (tuple, optional): (x, y, width, height) of the question block to crop to
+            
+        Returns:
+            callable or None: Returns the encoded bytes (PNG, WebP or JPEG) within the
+                              attachment budget, waiting for the encoding if needed. Call
+                              it on a worker thread, never the GUI thread. None if there
+                              is no capture
+        """
+        capture_id, buffer = self.screen_capture.capture_id, self.screen_capture.buffer
+        if buffer is None:
+            return None
+        future = self.attachment_encoder.submit(capture_id, buffer, region)
+        
+        def load_attachment():
+            try:
+                attachment = future.result()
+            except Exception as e:
+                print(f"Error encoding attachment, sending PNG: {str(e)}")
+                # The buffer of this capture, not whatever was captured since
+                png_bytes = io.BytesIO()
+                Image.fromarray(buffer).save(png_bytes, format="PNG", compress_level=3)
+                return png_bytes.getvalue()
+            print(f"Attachment: {attachment}")
+            return attachment.data
+        
+        return load_attachment
+    
     def get_captured_pil_image(self):
         """
         Get the captured PIL image
@@ -3,17 +3,26 @@ from PyQt6.QtWidgets import (QGroupBox, QVBoxLayout, QHBoxLayout,
                            QMessageBox, QPushButton)  # CHANGE: Added QPushButton import
 from PyQt6.QtCore import pyqtSignal
 from ocr.text_extractor import TextExtractor
+from capture.screen_capture import ScreenCapture
+from gui.worker import WorkerPool
 import os
 
 class QuestionPanel(QGroupBox):
     """UI panel for question extraction and editing"""
     
+    # Signal emitted when text extraction is completed
+    text_extracted = pyqtSignal(bool)  # Signal with success status
+    
     def __init__(self, parent=None):
         super().__init__("Step 2: Question Extraction", parent)
         
         # Initialize OCR component
         self._init_text_extractor()
         
+        # OCR runs on the shared worker pool
+        self.worker_pool = WorkerPool.shared()
+        self.ocr_worker = None
+        
         # Set up the layout
         self._init_ui()
     
@@ -78,45 +87,108 @@ class QuestionPanel(QGroupBox):
         
         question_layout.addLayout(type_layout)
     
-    def process_image(self, image):
+    def process_image(self, image, emit_signal=False):
         """
-        Extract text from an image using OCR
+        Start extracting text from an image and classify the question when done
         
         Args:
             image: The image to process
+            emit_signal (bool): Whether to emit the text_extracted signal
             
         Returns:
-            bool: Success status
+            bool: True if the extraction started, False otherwise
         """
-        try:
-            if image is None:
-                self.question_text.setText("No image captured yet")
-                return False
-                
-            # Extract text from the image
-            extracted_text = self.text_extractor.extract_text(image)
+        return self._start_extraction(image, classify=True, emit_signal=emit_signal)
+    
+    def extract_text(self, image, emit_signal=False):
+        """
+        Start extracting text from an image using OCR
+        
+        Args:
+            image: The image to process
+            emit_signal (bool): Whether to emit the text_extracted signal
             
-            if not extracted_text:
-                self.question_text.setText("No text found in the image")
-                return False
-                
+        Returns:
+            bool: True if the extraction started, False otherwise
+        """
+        return self._start_extraction(image, classify=False, emit_signal=emit_signal)
+    
+    def _start_extraction(self, image, classify, emit_signal):
+        """Run OCR on the worker pool and display the result on completion"""
+        if image is None:
+            self.question_text.setText("No image captured yet")
+            if emit_signal:
+                self.text_extracted.emit(False)
+            return False
+        
+        if self.ocr_worker is not None:
+            print("Text extraction is already in progress")
+            if emit_signal:
+                self.text_extracted.emit(False)
+            return False
+        
+        self.analyze_btn.setEnabled(False)
+        self.question_text.setText("Extracting text... Please wait.")
+        
+        self.ocr_worker = self.worker_pool.submit(
+            self.text_extractor.extract_text, image,
+            color_order=ScreenCapture.COLOR_ORDER,
+            on_result=lambda text: self._on_text_extracted(text, classify, emit_signal),
+            on_error=lambda e: self._on_extraction_error(e, emit_signal),
+            on_cancelled=lambda: self._on_extraction_cancelled(emit_signal),
+            on_finished=self._on_extraction_finished
+        )
+        return True
+    
+    def _on_text_extracted(self, extracted_text, classify, emit_signal):
+        """Display the extracted text"""
+        success = False
+        if not extracted_text:
+            self.question_text.setText("No text found in the image")
+        else:
             # Set the extracted text
             self.question_text.setText(extracted_text)
-            
-            # Determine if it's a multiple choice question
-            is_mc = self.text_extractor.is_multiple_choice(extracted_text)
-            
-            # Update the radio button selection
-            self.radio_mc.setChecked(is_mc)
-            self.radio_short.setChecked(not is_mc)
-            
-            return True
-            
-        except Exception as e:
-            error_msg = f"Failed to process image: {str(e)}"
-            print(error_msg)
-            self.question_text.setText(error_msg)
-            return False
+            if classify:
+                self.classify_question()
+            success = True
+        
+        if emit_signal:
+            self.text_extracted.emit(success)
+    
+    def _on_extraction_error(self, error, emit_signal):
+        """Handle an extraction that raised an exception"""
+        error_msg = f"Failed to process image: {str(error)}"
+        print(error_msg)
+        self.question_text.setText(error_msg)
+        if emit_signal:
+            self.text_extracted.emit(False)
+    
+    def _on_extraction_cancelled(self, emit_signal):
+        """Handle an extraction that was cancelled"""
+        self.question_text.setText("Text extraction cancelled")
+        if emit_signal:
+            self.text_extracted.emit(False)
+    
+    def _on_extraction_finished(self):
+        """Reset the UI once the OCR worker is done"""
+        self.ocr_worker = None
+        self.analyze_btn.setEnabled(True)
+    
+    def classify_question(self):
+        """
+        Determine the question type from the current text and update the selection
+        
+        Returns:
+            str: Either "multiple_choice" or "short_answer"
+        """
+        # Determine if it's a multiple choice question
+        is_mc = self.text_extractor.is_multiple_choice(self.get_question_text())
+        
+        # Update the radio button selection
+        self.radio_mc.setChecked(is_mc)
+        self.radio_short.setChecked(not is_mc)
+        
+        return self.get_question_type()
     
     def get_question_text(self):
         """
@@ -127,6 +199,15 @@ class QuestionPanel(QGroupBox):
         """
         return self.question_text.toPlainText()
     
+    def get_question_region(self):
+        """
+        Get where the question was found in the last image
+        
+        Returns:
+            tuple or None: (x, y, width, height), or None if the whole image was read
+        """
+        return self.text_extractor.last_region
+    
     def is_multiple_choice(self):
         """
         Check if the current question is marked as multiple choice
@@ -134,4 +215,26 @@ class QuestionPanel(QGroupBox):
         Returns:
             bool: True if multiple choice, False if short answer
         """
-        return self.radio_mc.isChecked()
\ No newline at end of file
+        return self.radio_mc.isChecked()
+    
+    def get_question_type(self):
+        """
+        Get the current question type
+        
+        Returns:
+            str: Either "multiple_choice" or "short_answer"
+        """
+        return "multiple_choice" if self.is_multiple_choice() else "short_answer"
+    
+    def set_question(self, question_text, question_type):
+        """
+        Display a question without running OCR
+        
+        Args:
+            question_text (str): The question text
+            question_type (str): Either "multiple_choice" or "short_answer"
+        """
+        self.question_text.setText(question_text)
+        is_mc = question_type == "multiple_choice"
+        self.radio_mc.setChecked(is_mc)
+        self.radio_short.setChecked(not is_mc)
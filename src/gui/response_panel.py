@@ -2,10 +2,17 @@ from PyQt6.QtWidgets import (QGroupBox, QVBoxLayout, QHBoxLayout,
                            QPushButton, QLabel, QTextEdit, QProgressBar,
                            QMessageBox, QDialog)
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
-from ai.claude_client import ClaudeClient
+from ai.claude_client import ClaudeClient, RequestTimedOut
+from ai.model_router import ModelRouter
+from ai.answer_cache import AnswerCache
 from export.email_sender import EmailSender
+from export.outbox import Outbox
+from export.exporter import ExportManager, ExportRecord, create_exporters
 from gui.email_dialog import EmailDialog
+from gui.worker import WorkerPool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 class ResponsePanel(QGroupBox):
@@ -14,6 +21,13 @@ class ResponsePanel(QGroupBox):
     # Signals
     claude_completed = pyqtSignal(bool)  # Signal with success status
     email_completed = pyqtSignal(bool)   # Signal with success status
+    export_completed = pyqtSignal(bool)  # Signal with success status (every sink succeeded)
+    
+    # How often buffered stream text is appended to the response box
+    FLUSH_INTERVAL_MS = 50
+    
+    # How often the outbox status label is refreshed
+    OUTBOX_POLL_MS = 1000
     
     def __init__(self, parent=None):
         super().__init__("Step 3: AI Analysis", parent)
@@ -21,6 +35,31 @@ class ResponsePanel(QGroupBox):
         # Initialize components
         self._init_components()
         
+        # Claude and SMTP calls run on the shared worker pool
+        self.worker_pool = WorkerPool.shared()
+        self.claude_worker = None
+        
+        # Cancel event of the request in flight. It also identifies the request,
+        # so signals from a request that was already cancelled are ignored
+        self.claude_cancel_event = None
+        self.claude_emit_signal = False
+        
+        # True while the response box shows an answer rather than a status or error message
+        self.has_answer = False
+        
+        # Gives up on a request once its deadline passes, even if the worker is stuck
+        self.deadline_timer = QTimer(self)
+        self.deadline_timer.setSingleShot(True)
+        self.deadline_timer.timeout.connect(self._on_claude_deadline)
+        
+        # Streamed text is buffered and appended in batches
+        self.pending_text = []
+        self.stream_started_at = None
+        self.first_visible_latency = None
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self._flush_pending_text)
+        
         # Set up the layout
         self._init_ui()
     
@@ -29,9 +68,13 @@ class ResponsePanel(QGroupBox):
         # Load environment variables
         load_dotenv()
         
-        # Initialize Claude API client
+        # Claude client with a persistent answer cache; CLAUDE_ROUTING asks a fast model first
         try:
-            self.claude_client = ClaudeClient()
+            answer_cache = self._init_answer_cache()
+            if os.getenv("CLAUDE_ROUTING", "false").lower() in ("1", "true", "yes"):
+                self.claude_client = ModelRouter(answer_cache=answer_cache)
+            else:
+                self.claude_client = ClaudeClient(answer_cache=answer_cache)
         except ValueError as e:
             print(f"API Key Missing: {str(e)}")
             self.claude_client = None
@@ -42,6 +85,31 @@ class ResponsePanel(QGroupBox):
         except ValueError as e:
             print(f"Email Configuration Missing: {str(e)}")
             self.email_sender = None
+        
+        # Queue emails in a persistent outbox sent in the background, unless EMAIL_OUTBOX is off
+        self.outbox = None
+        if self.email_sender is not None and os.getenv("EMAIL_OUTBOX", "true").lower() not in ("0", "false", "no"):
+            try:
+                self.outbox = Outbox(self.email_sender).start()
+            except Exception as e:
+                print(f"Email outbox unavailable, sending directly: {str(e)}")
+        
+        # Pipeline results go to every sink listed in EXPORT_SINKS (email by default)
+        self.export_manager = ExportManager(create_exporters(email_exporter=self.outbox or self.email_sender))
+        print(f"Export sinks: {', '.join(self.export_manager.names()) or 'none'}")
+    
+    def _init_answer_cache(self):
+        """
+        Open the answer cache
+        
+        Returns:
+            AnswerCache or None: The cache, or None if it could not be opened
+        """
+        try:
+            return AnswerCache()
+        except Exception as e:
+            print(f"Answer cache unavailable: {str(e)}")
+            return None
     
     def _init_ui(self):
         """Initialize the UI components"""
@@ -51,7 +119,7 @@ class ResponsePanel(QGroupBox):
         send_layout = QHBoxLayout()
         self.send_btn = QPushButton("Send to Claude")
         self.send_btn.setMinimumHeight(40)
-        self.send_btn.clicked.connect(lambda: self.send_to_claude(emit_signal=False))
+        # Connected in the MainWindow class, which supplies the question
         send_layout.addWidget(self.send_btn)
         
         # Add progress bar
@@ -60,6 +128,12 @@ class ResponsePanel(QGroupBox):
         self.progress_bar.setVisible(False)
         send_layout.addWidget(self.progress_bar)
         
+        # Cancel button, shown while a request is in flight
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.clicked.connect(lambda: self.cancel_claude())
+        send_layout.addWidget(self.cancel_btn)
+        
         send_layout.addStretch()
         answer_layout.addLayout(send_layout)
         
@@ -73,10 +147,22 @@ class ResponsePanel(QGroupBox):
         email_layout = QHBoxLayout()
         self.email_btn = QPushButton("Send Answer by Email")
         self.email_btn.setMinimumHeight(30)
-        self.email_btn.clicked.connect(lambda: self.send_by_email(show_dialog=True, emit_signal=False))
+        # Connected in the MainWindow class, which supplies the content
         email_layout.addWidget(self.email_btn)
+        
+        # Outbox status, polled while there is anything to report
+        self.outbox_label = QLabel()
+        self.outbox_label.setVisible(False)
+        email_layout.addWidget(self.outbox_label)
         email_layout.addStretch()
         answer_layout.addLayout(email_layout)
+        
+        if self.outbox is not None:
+            self.outbox_timer = QTimer(self)
+            self.outbox_timer.setInterval(self.OUTBOX_POLL_MS)
+            self.outbox_timer.timeout.connect(self._update_outbox_status)
+            self.outbox_timer.start()
+            self._update_outbox_status()
     
     def send_to_claude(self, question_text, question_type="multiple_choice", emit_signal=False):
         """
@@ -106,41 +192,171 @@ class ResponsePanel(QGroupBox):
                 self.claude_completed.emit(False)
             return False
             
+        if self.claude_worker is not None:
+            print("A Claude request is already in progress")
+            if emit_signal:
+                self.claude_completed.emit(False)
+            return False
+            
         # Show progress bar and disable send button during API call
         self.progress_bar.setVisible(True)
         self.send_btn.setEnabled(False)
+        self.cancel_btn.setVisible(True)
+        self.has_answer = False
         self.response_text.setText("Sending to Claude... Please wait.")
         
-        # Use a timer to allow the UI to update
-        QTimer.singleShot(100, lambda: self._send_to_claude_async(question_text, question_type, emit_signal))
+        # Stream the answer on a worker thread so the UI stays responsive
+        self.pending_text = []
+        self.stream_started_at = time.perf_counter()
+        self.first_visible_latency = None
+        self.flush_timer.start()
+        
+        cancel_event = threading.Event()
+        self.claude_cancel_event = cancel_event
+        self.claude_emit_signal = emit_signal
+        self.claude_worker = self.worker_pool.submit(
+            self._stream_claude_response,
+            question_text,
+            question_type,
+            cancel_event,
+            on_progress=lambda text: self._on_claude_progress(text, cancel_event),
+            on_result=lambda metrics: self._on_claude_response(metrics, cancel_event),
+            on_error=lambda e: self._on_claude_error(e, cancel_event),
+            on_cancelled=lambda: self._on_claude_cancelled(cancel_event),
+            on_finished=lambda: self._on_claude_finished(cancel_event)
+        )
+        self.deadline_timer.start(int(self.claude_client.timeout * 1000))
         return True  # Return success for starting the process
     
-    def _send_to_claude_async(self, question_text, question_type, emit_signal=False):
-        """Async helper function to make the API call without freezing the UI"""
-        success = False
-        try:
-            # Get response from Claude
-            response = self.claude_client.ask_question(
-                question_text=question_text,
-                question_type=question_type
-            )
-            
-            # Display the response
-            self.response_text.setText(response)
-            success = True
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to get response from Claude: {str(e)}")
-            self.response_text.setText(f"Error communicating with Claude: {str(e)}")
-            
-        finally:
-            # Hide progress bar and re-enable send button
-            self.progress_bar.setVisible(False)
-            self.send_btn.setEnabled(True)
+    def cancel_claude(self, message="Request cancelled."):
+        """
+        Stop waiting for the Claude request in flight
+        
+        The panel is ready for the next request immediately. The worker stops at
+        its next chunk of text (or when the transport times out) and anything it
+        returns later is dropped.
+        
+        Args:
+            message (str): Text shown in place of the answer
             
-            # Emit signal only if requested (for hotkey sequence)
-            if emit_signal:
-                self.claude_completed.emit(success)
+        Returns:
+            bool: True if a request was cancelled
+        """
+        if self.claude_cancel_event is None:
+            return False
+        
+        self.claude_cancel_event.set()
+        if self.claude_worker is not None:
+            self.claude_worker.cancel()
+        
+        emit_signal = self.claude_emit_signal
+        self._on_claude_finished(self.claude_cancel_event)
+        self.response_text.setText(message)
+        print(message)
+        if emit_signal:
+            self.claude_completed.emit(False)
+        return True
+    
+    def _on_claude_deadline(self):
+        """Give up on a request that did not finish within its deadline"""
+        self.cancel_claude(
+            f"Request timed out. Claude did not answer within {self.claude_client.timeout:g} seconds."
+        )
+    
+    def _stream_claude_response(self, question_text, question_type, cancel_event, progress_callback):
+        """
+        Stream Claude's answer, reporting each text delta (runs on a worker thread)
+        
+        Returns:
+            StreamMetrics: Latency metrics of the stream
+        """
+        for text in self.claude_client.stream_question(
+            question_text=question_text,
+            question_type=question_type,
+            cancel_event=cancel_event
+        ):
+            progress_callback(text)
+        return self.claude_client.last_stream_metrics
+    
+    def _on_claude_progress(self, text, cancel_event):
+        """Buffer a text delta from the request in flight"""
+        if cancel_event is self.claude_cancel_event:
+            self.pending_text.append(text)
+    
+    def _flush_pending_text(self):
+        """Append the buffered stream text to the response box"""
+        if not self.pending_text:
+            return
+        
+        text = "".join(self.pending_text)
+        self.pending_text.clear()
+        
+        # Replace the placeholder with the first batch of text
+        if self.first_visible_latency is None:
+            self.first_visible_latency = time.perf_counter() - self.stream_started_at
+            print(f"First answer text visible after {self.first_visible_latency:.2f} seconds")
+            self.response_text.clear()
+        
+        cursor = self.response_text.textCursor()
+        cursor.movePosition(cursor.MoveOperation.End)
+        cursor.insertText(text)
+    
+    def _on_claude_response(self, metrics, cancel_event):
+        """Finish displaying Claude's streamed response"""
+        if cancel_event is not self.claude_cancel_event:
+            return
+        self._flush_pending_text()
+        
+        # The stream ended without any text
+        if self.first_visible_latency is None:
+            self.response_text.setText("Claude returned an empty response.")
+        else:
+            self.has_answer = True
+        
+        print(f"Claude response displayed ({metrics})")
+        
+        # Emit signal only if requested (for hotkey sequence)
+        if self.claude_emit_signal:
+            self.claude_completed.emit(True)
+    
+    def _on_claude_error(self, error, cancel_event):
+        """Handle a Claude request that raised an exception"""
+        if cancel_event is not self.claude_cancel_event:
+            return
+        if isinstance(error, RequestTimedOut):
+            # Same outcome as the panel's own deadline
+            self.cancel_claude(f"Request timed out. {str(error)}.")
+            return
+        
+        self.response_text.setText(f"Error communicating with Claude: {str(error)}")
+        if self.claude_emit_signal:
+            self.claude_completed.emit(False)
+        else:
+            QMessageBox.critical(self, "Error", f"Failed to get response from Claude: {str(error)}")
+    
+    def _on_claude_cancelled(self, cancel_event):
+        """Handle a worker cancelled from outside the panel (e.g. WorkerPool.cancel_all)"""
+        if cancel_event is self.claude_cancel_event:
+            self.cancel_claude()
+    
+    def _on_claude_finished(self, cancel_event):
+        """Hide progress bar and re-enable send button once the request in flight is over"""
+        if cancel_event is not self.claude_cancel_event:
+            return
+        
+        self.deadline_timer.stop()
+        self.flush_timer.stop()
+        self.claude_worker = None
+        self.claude_cancel_event = None
+        self.claude_emit_signal = False
+        
+        # Streamed text is buffered and appended in batches
+        self.pending_text = []
+        self.stream_started_at = None
+        self.first_visible_latency = None
+        self.progress_bar.setVisible(False)
+        self.cancel_btn.setVisible(False)
+        self.send_btn.setEnabled(True)
     
     def send_by_email(self, question_text, answer_text, image_data=None, show_dialog=True, emit_signal=False):
         """
@@ -149,7 +365,9 @@ class ResponsePanel(QGroupBox):
         Args:
             question_text (str): The question text
             answer_text (str): The answer text
-            image_data (bytes, optional): Screenshot image data to attach
+            image_data (bytes or callable, optional): Screenshot image data to attach, or a
+                                                      function returning it (called on the
+                                                      worker thread, as it may wait for encoding)
             show_dialog (bool): Whether to show the email dialog or send automatically
             emit_signal (bool): Whether to emit the email_completed signal
             
@@ -157,7 +375,6 @@ class ResponsePanel(QGroupBox):
             bool: True if email sending process started successfully, False otherwise
         """
         print(f"Sending by email. Show dialog: {show_dialog}")
-        success = False
         
         # Check if email sender is initialized
         if self.email_sender is None:
@@ -167,7 +384,8 @@ class ResponsePanel(QGroupBox):
                     "Email sender is not initialized. Please check your email configuration in the .env file."
                 )
             print("Email sender is not initialized")
-            self.email_completed.emit(False)
+            if emit_signal:
+                self.email_completed.emit(False)
             return False
         
         # Check if we have content to send
@@ -178,7 +396,8 @@ class ResponsePanel(QGroupBox):
                     "Missing content. Please make sure you have captured a question and received an answer."
                 )
             print("Missing content for email")
-            self.email_completed.emit(False)
+            if emit_signal:
+                self.email_completed.emit(False)
             return False
         
         if show_dialog:
@@ -186,69 +405,188 @@ class ResponsePanel(QGroupBox):
             dialog = EmailDialog(self)
             result = dialog.exec()
             
-            if result == QDialog.DialogCode.Accepted:
-                # Get recipients
-                recipients = dialog.get_checked_emails()
-                subject = dialog.get_subject() or "Quiz Answer from Claude"
+            if result != QDialog.DialogCode.Accepted:
+                if emit_signal:
+                    self.email_completed.emit(False)
+                return False
                 
-                # Send to each recipient
-                for recipient in recipients:
-                    # Use a timer to allow the UI to update
-                    QTimer.singleShot(100, lambda r=recipient: self._send_email_async(
-                        r, question_text, answer_text, subject, image_data, show_dialog))
-                success = True
-            else:
-                success = False
+            # Get recipients
+            recipients = dialog.get_checked_emails()
+            subject = dialog.get_subject() or "Quiz Answer from Claude"
         else:
             # Automatic mode - get recipients from recipient manager
             from gui.recipient_manager import RecipientManager
             recipient_manager = RecipientManager()
-            recipients = recipient_manager.get_checked_recipients()
+            recipients = [r.email for r in recipient_manager.get_checked_recipients()]
             
             if not recipients:
                 print("No recipients selected for automatic email")
-                self.email_completed.emit(False)
+                if emit_signal:
+                    self.email_completed.emit(False)
                 return False
                 
             subject = "Quiz Answer from Claude (Auto-Sent)"
-            
-            # Send to each recipient
-            for recipient in recipients:
-                try:
-                    # Send directly without timer
-                    self._send_email_async(
-                        recipient.email, 
-                        question_text, 
-                        answer_text, 
-                        subject, 
-                        image_data,
-                        show_dialog,
-                        emit_signal
-                    )
-                    success = True
-                except Exception as e:
-                    print(f"Error sending automatic email: {str(e)}")
-                    success = False
-        
-        # If no actual sending occurs, emit completion now
-        if emit_signal and not success:
-            self.email_completed.emit(False)
         
-        return success
-    
-    def _send_email_async(self, recipient, question_text, answer_text, subject, image_data=None, show_dialog=True, emit_signal=False):
-        """Async helper function to send email without freezing the UI"""
-        success = False
-        try:
-            # Send the email
-            success, message = self.email_sender.send_quiz_answer(
-                recipient_email=recipient,
-                question_text=question_text,
-                answer_text=answer_text,
-                subject=subject,
-                image_data=image_data
+        # With the outbox, the export is done once the message is safely queued
+        if self.outbox is not None:
+            self.worker_pool.submit(
+                self._queue_emails,
+                recipients, question_text, answer_text, subject, image_data,
+                on_result=lambda _: self._on_emails_queued(recipients, show_dialog, emit_signal),
+                on_error=lambda e: self._on_email_error(e, show_dialog, emit_signal),
+                on_cancelled=lambda: self._on_email_cancelled(emit_signal)
             )
+            return True
+        
+        # Send to every recipient on a worker thread, reporting completion once for the batch
+        self.worker_pool.submit(
+            self._send_emails,
+            recipients, question_text, answer_text, subject, image_data,
+            on_result=lambda results: self._on_emails_sent(results, show_dialog, emit_signal),
+            on_error=lambda e: self._on_email_error(e, show_dialog, emit_signal),
+            on_cancelled=lambda: self._on_email_cancelled(emit_signal)
+        )
+        return True
+    
+    def export_results(self, question_text, answer_text, question_type=None, image_data=None,
+                       run_id=None, metadata=None, emit_signal=False):
+        """
+        Send a pipeline result to every export sink at once (without dialogs)
+        
+        Args:
+            question_text (str): The question text
+            answer_text (str): Claude's answer
+            question_type (str, optional): Either "multiple_choice" or "short_answer"
+            image_data (bytes or callable, optional): Screenshot image data, or a function
+                                                      returning it (called on the worker thread)
+            run_id (str, optional): Pipeline run ID, used as the record ID
+            metadata (dict, optional): Extra fields for the record, such as stage timings
+            emit_signal (bool): Whether to emit the export_completed signal
             
+        Returns:
+            bool: True if the export started successfully, False otherwise
+        """
+        if not question_text or not answer_text:
+            print("Missing content for export")
+            if emit_signal:
+                self.export_completed.emit(False)
+            return False
+        
+        if not self.export_manager.exporters:
+            print("No export sinks are configured")
+            if emit_signal:
+                self.export_completed.emit(False)
+            return False
+        
+        # Only the email sink needs recipients
+        recipients = []
+        if "email" in self.export_manager.names():
+            from gui.recipient_manager import RecipientManager
+            recipients = [r.email for r in RecipientManager().get_checked_recipients()]
+        
+        record = ExportRecord(question_text, answer_text, question_type, None, recipients,
+                              subject="Quiz Answer from Claude (Auto-Sent)", record_id=run_id, metadata=metadata)
+        self.worker_pool.submit(
+            self._export_record, record, image_data,
+            on_result=lambda results: self._on_exported(results, emit_signal),
+            on_error=lambda e: self._on_export_error(e, emit_signal),
+            on_cancelled=lambda: self._on_export_cancelled(emit_signal)
+        )
+        return True
+    
+    def _on_exported(self, results, emit_signal=False):
+        """Log the result of every export sink"""
+        for name, success, message in results:
+            print(f"Export to {name}: {'Success - ' if success else 'Failed - '}{message}")
+        if self.outbox is not None:
+            self._update_outbox_status()
+        if emit_signal:
+            self.export_completed.emit(all(success for _, success, _ in results))
+    
+    def _on_export_error(self, error, emit_signal=False):
+        """Handle an export that raised an exception"""
+        print(f"Error exporting results: {str(error)}")
+        if emit_signal:
+            self.export_completed.emit(False)
+    
+    def _on_export_cancelled(self, emit_signal=False):
+        """Handle an export that was cancelled"""
+        print("Export cancelled")
+        if emit_signal:
+            self.export_completed.emit(False)
+    
+    def close_exporters(self):
+        """Close the export sinks, the outbox and the SMTP session"""
+        # Stop polling the outbox before its spool is closed
+        if self.outbox is not None:
+            self.outbox_timer.stop()
+        self.export_manager.close()
+        
+        # The panel owns these whether or not email is one of the export sinks
+        if self.outbox is not None:
+            self.outbox.close()
+        if self.email_sender is not None:
+            self.email_sender.close()
+    
+    @staticmethod
+    def _resolve_image(image_data):
+        """Get the screenshot bytes, calling image_data if it is a function (worker threads only)"""
+        return image_data() if callable(image_data) else image_data
+    
+    def _export_record(self, record, image_data=None):
+        """
+        Attach the screenshot and send the record to every sink (runs on a worker thread)
+        
+        Returns:
+            list: (sink name, success, message) for each sink
+        """
+        record.image_data = self._resolve_image(image_data)
+        return self.export_manager.export(record)
+    
+    def _queue_emails(self, recipients, question_text, answer_text, subject, image_data=None):
+        """
+        Queue the email in the outbox (runs on a worker thread)
+        
+        Returns:
+            str: The outbox message ID
+        """
+        return self.outbox.enqueue(recipients, question_text, answer_text, subject, self._resolve_image(image_data))
+    
+    def _send_emails(self, recipients, question_text, answer_text, subject, image_data=None):
+        """
+        Send the email to every recipient over one SMTP session (runs on a worker thread)
+        
+        Returns:
+            list: (recipient, success, message) for each recipient
+        """
+        return self.email_sender.send_many(recipients, question_text, answer_text, subject,
+                                           self._resolve_image(image_data))
+    
+    def _on_emails_queued(self, recipients, show_dialog=True, emit_signal=False):
+        """Report a message that was queued in the outbox"""
+        message = f"Email queued for {', '.join(recipients)}"
+        if show_dialog:
+            QMessageBox.information(self, "Queued", message)
+        else:
+            print(message)
+        self._update_outbox_status()
+        if emit_signal:
+            self.email_completed.emit(True)
+    
+    def _update_outbox_status(self):
+        """Show how many queued emails are still pending or have failed"""
+        counts = self.outbox.counts()
+        parts = []
+        if counts[Outbox.PENDING]:
+            parts.append(f"{counts[Outbox.PENDING]} pending")
+        if counts[Outbox.FAILED]:
+            parts.append(f"{counts[Outbox.FAILED]} failed")
+        self.outbox_label.setText("Outbox: " + ", ".join(parts))
+        self.outbox_label.setVisible(bool(parts))
+    
+    def _on_emails_sent(self, results, show_dialog=True, emit_signal=False):
+        """Report the result of a batch of emails"""
+        for recipient, success, message in results:
             # Show result only if show_dialog is True
             if show_dialog:
                 if success:
@@ -258,17 +596,25 @@ class ResponsePanel(QGroupBox):
             else:
                 # Just log the result in automatic mode
                 print(f"Email to {recipient}: {'Success' if success else 'Failed - ' + message}")
-                
-        except Exception as e:
-            if show_dialog:
-                QMessageBox.critical(self, "Error", f"Failed to send email: {str(e)}")
-            else:
-                print(f"Error sending email: {str(e)}")
-            success = False
         
         if emit_signal:
             # Emit signal with success status
-            self.email_completed.emit(success)
+            self.email_completed.emit(all(success for _, success, _ in results))
+    
+    def _on_email_error(self, error, show_dialog=True, emit_signal=False):
+        """Handle an email batch that raised an exception"""
+        if show_dialog:
+            QMessageBox.critical(self, "Error", f"Failed to send email: {str(error)}")
+        else:
+            print(f"Error sending email: {str(error)}")
+        if emit_signal:
+            self.email_completed.emit(False)
+    
+    def _on_email_cancelled(self, emit_signal=False):
+        """Handle an email batch that was cancelled"""
+        print("Email sending cancelled")
+        if emit_signal:
+            self.email_completed.emit(False)
     
     def get_response_text(self):
         """
@@ -277,4 +623,24 @@ class ResponsePanel(QGroupBox):
         Returns:
             str: The response text
         """
-        return self.response_text.toPlainText()
\ No newline at end of file
+        return self.response_text.toPlainText()
+    
+    def get_answer_text(self):
+        """
+        Get Claude's answer, if the panel is showing one
+        
+        Returns:
+            str or None: The answer, or None while a request is in flight or after
+                         it failed, so error messages are never sent as answers
+        """
+        return self.response_text.toPlainText() if self.has_answer else None
+    
+    def set_response_text(self, text):
+        """
+        Display a response without calling Claude
+        
+        Args:
+            text (str): The response text
+        """
+        self.response_text.setText(text)
+        self.has_answer = bool(text)
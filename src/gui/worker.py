@@ -0,0 +1,146 @@
+import threading
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+class WorkerSignals(QObject):
+    """Signals emitted by a Worker, delivered on the thread that created it"""
+
+    result = pyqtSignal(object)    # Return value of the function
+    progress = pyqtSignal(object)  # Intermediate value reported by the function
+    error = pyqtSignal(object)     # Exception raised by the function
+    cancelled = pyqtSignal()       # Worker was cancelled; any result was dropped
+    finished = pyqtSignal()        # Always emitted last
+
+class Worker(QRunnable):
+    """Runs a function on a QThreadPool thread and reports back through signals"""
+
+    def __init__(self, fn, *args, **kwargs):
+        """
+        Initialize the worker
+
+        Args:
+            fn (callable): The function to run in the background
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+        """
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+        # Created on the calling (GUI) thread so emits are queued back to it
+        self.signals = WorkerSignals()
+
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """
+        Request cancellation
+
+        A worker that has not started yet is skipped. A running function is not
+        interrupted, but its result is dropped and `cancelled` is emitted instead.
+        """
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        """Check if cancellation was requested"""
+        return self._cancel_event.is_set()
+
+    def run(self):
+        """Run the function (called by QThreadPool)"""
+        try:
+            if self.is_cancelled():
+                self.signals.cancelled.emit()
+                return
+
+            try:
+                result = self.fn(*self.args, **self.kwargs)
+            except Exception as e:
+                if self.is_cancelled():
+                    self.signals.cancelled.emit()
+                else:
+                    self.signals.error.emit(e)
+                return
+
+            if self.is_cancelled():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+class WorkerPool:
+    """Shared QThreadPool front end that keeps track of in-flight workers"""
+
+    _shared = None
+
+    def __init__(self, thread_pool=None):
+        """
+        Initialize the worker pool
+
+        Args:
+            thread_pool (QThreadPool, optional): Pool to run workers on.
+                                                 Defaults to the global instance.
+        """
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self.active_workers = set()
+
+    @classmethod
+    def shared(cls):
+        """
+        Get the pool shared by the GUI panels
+
+        Returns:
+            WorkerPool: The shared pool
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def submit(self, fn, *args, on_result=None, on_error=None, on_cancelled=None,
+               on_finished=None, on_progress=None, **kwargs):
+        """
+        Run a function in the background
+
+        Args:
+            fn (callable): The function to run
+            *args: Positional arguments for the function
+            on_result (callable, optional): Called with the return value
+            on_error (callable, optional): Called with the raised exception
+            on_cancelled (callable, optional): Called if the worker was cancelled
+            on_finished (callable, optional): Called after any of the above
+            on_progress (callable, optional): Called with each value the function
+                                              passes to its progress_callback argument
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            Worker: The started worker, which can be cancelled
+        """
+        worker = Worker(fn, *args, **kwargs)
+
+        if on_result:
+            worker.signals.result.connect(on_result)
+        if on_error:
+            worker.signals.error.connect(on_error)
+        if on_cancelled:
+            worker.signals.cancelled.connect(on_cancelled)
+        if on_finished:
+            worker.signals.finished.connect(on_finished)
+        if on_progress:
+            worker.kwargs['progress_callback'] = worker.signals.progress.emit
+            worker.signals.progress.connect(on_progress)
+
+        # Keep a reference until the worker is done
+        self.active_workers.add(worker)
+        worker.signals.finished.connect(lambda: self.active_workers.discard(worker))
+
+        self.thread_pool.start(worker)
+        return worker
+
+    def active_count(self):
+        """Get the number of workers that have not finished yet"""
+        return len(self.active_workers)
+
+    def cancel_all(self):
+        """Request cancellation of every in-flight worker"""
+        for worker in list(self.active_workers):
+            worker.cancel()
@@ -1,8 +1,14 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from gui.app_window import MainWindow
 
 def main():
+    # Headless subcommands don't need the GUI (or a display)
+    if len(sys.argv) > 1 and sys.argv[1] == "eval":
+        from evaluation.batch_runner import main as eval_main
+        sys.exit(eval_main(sys.argv[2:]))
+
+    from PyQt6.QtWidgets import QApplication
+    from gui.app_window import MainWindow
+
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from ocr.ocr_engine import OCRResult
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+class OCRCache:
+    """
+    Cache of OCR results keyed by the content of the preprocessed image
+
+    Recent results live in a bounded in-memory LRU. An optional SQLite file
+    keeps results across restarts; entries found there are promoted to memory.
+    """
+
+    DEFAULT_MAX_ENTRIES = 64
+    DEFAULT_MAX_DISK_ENTRIES = 5000
+
+    def __init__(self, max_entries=None, disk_path=None, max_disk_entries=None):
+        """
+        Initialize the OCRCache
+
+        Args:
+            max_entries (int, optional): Results kept in memory. Defaults to
+                                         OCR_CACHE_SIZE or DEFAULT_MAX_ENTRIES
+            disk_path (str, optional): SQLite file for the on-disk tier. If not provided,
+                                       will look for OCR_CACHE_PATH environment variable;
+                                       without either, only memory is used
+            max_disk_entries (int, optional): Results kept on disk. Defaults to
+                                              OCR_CACHE_MAX_DISK_ENTRIES or DEFAULT_MAX_DISK_ENTRIES
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.max_entries = int(max_entries or os.getenv("OCR_CACHE_SIZE") or self.DEFAULT_MAX_ENTRIES)
+        self.max_disk_entries = int(max_disk_entries or os.getenv("OCR_CACHE_MAX_DISK_ENTRIES")
+                                    or self.DEFAULT_MAX_DISK_ENTRIES)
+        self.disk_path = disk_path or os.getenv("OCR_CACHE_PATH")
+
+        # Hit/miss counters for this session
+        self.hits = 0
+        self.misses = 0
+
+        # OCR runs on worker threads, so both tiers are guarded by one lock
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+        self.conn = None
+        if self.disk_path:
+            self.conn = sqlite3.connect(self.disk_path, check_same_thread=False)
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS ocr_results ("
+                    "key TEXT PRIMARY KEY, "
+                    "text TEXT NOT NULL, "
+                    "confidences TEXT NOT NULL, "
+                    "last_used_at REAL NOT NULL)"
+                )
+                self.conn.execute("CREATE INDEX IF NOT EXISTS ocr_results_last_used ON ocr_results (last_used_at)")
+
+    @staticmethod
+    def make_key(image, engine_id=""):
+        """
+        Hash a preprocessed image
+
+        Args:
+            image (numpy.ndarray): The preprocessed (binary) image
+            engine_id (str): Identifies the engine and language, since they change the result
+
+        Returns:
+            str: Hex digest of the engine, shape and pixels
+        """
+        header = f"{engine_id}|{image.shape}|{image.dtype}".encode("utf-8")
+        # Hash the pixel buffer in place instead of copying it with tobytes()
+        data = memoryview(image) if image.flags.c_contiguous else image.tobytes()
+
+        if xxhash is not None:
+            hasher = xxhash.xxh3_128()
+        else:
+            hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(header)
+        hasher.update(data)
+        return hasher.hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached result
+
+        Args:
+            key (str): Key from make_key
+
+        Returns:
+            OCRResult or None: The cached result, or None on a miss
+        """
+        with self.lock:
+            result = self.entries.get(key)
+            if result is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+            if self.conn is not None:
+                with self.conn:
+                    row = self.conn.execute(
+                        "SELECT text, confidences FROM ocr_results WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        self.conn.execute("UPDATE ocr_results SET last_used_at = ? WHERE key = ?",
+                                          (time.time(), key))
+                        result = OCRResult(row[0], json.loads(row[1]))
+                        self._remember(key, result)
+                        self.hits += 1
+                        return result
+
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        """
+        Store a result and evict least recently used entries
+
+        Args:
+            key (str): Key from make_key
+            result (OCRResult): The result to cache
+        """
+        with self.lock:
+            self._remember(key, result)
+
+            if self.conn is not None:
+                with self.conn:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO ocr_results (key, text, confidences, last_used_at) VALUES (?, ?, ?, ?)",
+                        (key, result.text, json.dumps(result.confidences), time.time())
+                    )
+                    self.conn.execute(
+                        "DELETE FROM ocr_results WHERE key NOT IN "
+                        "(SELECT key FROM ocr_results ORDER BY last_used_at DESC LIMIT ?)",
+                        (self.max_disk_entries,)
+                    )
+
+    def _remember(self, key, result):
+        """Add a result to the memory tier (lock must be held)"""
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every cached result from both tiers"""
+        with self.lock:
+            self.entries.clear()
+            if self.conn is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM ocr_results")
+
+    def stats(self):
+        """
+        Get the cache counters
+
+        Returns:
+            dict: hits, misses and number of entries in memory
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+    def close(self):
+        """Close the on-disk tier"""
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
@@ -0,0 +1,182 @@
+import os
+import threading
+import numpy as np
+import pytesseract
+from dotenv import load_dotenv
+
+class OCRResult:
+    """Recognized text and per-word confidences"""
+
+    def __init__(self, text, confidences=None):
+        self.text = text                        # Recognized text
+        self.confidences = confidences or []    # Word confidences (0-100), in reading order
+
+    def mean_confidence(self):
+        """Average word confidence, or None if the engine reported none"""
+        if not self.confidences:
+            return None
+        return sum(self.confidences) / len(self.confidences)
+
+class OCREngine:
+    """Base class for the OCR backends used by TextExtractor"""
+
+    name = "base"
+
+    def recognize(self, image):
+        """
+        Recognize the text in a preprocessed image
+
+        Args:
+            image (numpy.ndarray): Preprocessed (binary or grayscale) image
+
+        Returns:
+            str: The recognized text
+        """
+        raise NotImplementedError
+
+    def recognize_result(self, image):
+        """
+        Recognize the text in a preprocessed image along with word confidences
+
+        Args:
+            image (numpy.ndarray): Preprocessed (binary or grayscale) image
+
+        Returns:
+            OCRResult: The recognized text and confidences
+        """
+        return OCRResult(self.recognize(image))
+
+    def close(self):
+        """Release any resources held by the engine"""
+        pass
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract executable through pytesseract (one process per image)"""
+
+    name = "pytesseract"
+
+    def __init__(self, tesseract_path=None, lang="eng", confidences=False):
+        """
+        Initialize the pytesseract engine
+
+        Args:
+            tesseract_path (str, optional): Path to tesseract executable
+                                           (needed on Windows)
+            lang (str): Tesseract language code(s)
+            confidences (bool): Also report word confidences. This costs a second
+                                tesseract run per image, so it is off by default
+        """
+        # Set tesseract path if provided (required on Windows)
+        if tesseract_path:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        self.lang = lang
+        self.confidences = confidences
+
+    def recognize(self, image):
+        return pytesseract.image_to_string(image, lang=self.lang)
+
+    def recognize_result(self, image):
+        text = self.recognize(image)
+        if not self.confidences:
+            return OCRResult(text)
+
+        # The text keeps image_to_string's layout; image_to_data is only read for the confidences
+        data = pytesseract.image_to_data(image, lang=self.lang, output_type=pytesseract.Output.DICT)
+        confidences = [float(conf) for level, word, conf in zip(data["level"], data["text"], data["conf"])
+                       if level == 5 and word.strip()]
+        return OCRResult(text, confidences)
+
+class TesserocrEngine(OCREngine):
+    """
+    Keeps a libtesseract instance loaded in-process through tesserocr
+
+    Language data is loaded once when the engine is created, so each image
+    only pays for recognition.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang="eng", tessdata_path=None):
+        """
+        Initialize the tesserocr engine
+
+        Args:
+            lang (str): Tesseract language code(s)
+            tessdata_path (str, optional): Directory containing the language data
+
+        Raises:
+            ImportError: If tesserocr is not installed
+            RuntimeError: If the language data cannot be loaded
+        """
+        import tesserocr
+
+        if tessdata_path:
+            self.api = tesserocr.PyTessBaseAPI(path=tessdata_path, lang=lang)
+        else:
+            self.api = tesserocr.PyTessBaseAPI(lang=lang)
+        self.lang = lang
+
+        # A single API instance is not thread-safe
+        self.lock = threading.Lock()
+
+    def _set_image(self, image):
+        """Hand the pixel buffer to tesseract directly instead of building a PIL image; call with the lock held"""
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        self.api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, image.strides[0])
+
+    def recognize(self, image):
+        with self.lock:
+            self._set_image(image)
+            return self.api.GetUTF8Text()
+
+    def recognize_result(self, image):
+        with self.lock:
+            self._set_image(image)
+            text = self.api.GetUTF8Text()
+            # Confidences come from the recognition GetUTF8Text already ran
+            return OCRResult(text, [float(conf) for conf in self.api.AllWordConfidences()])
+
+    def close(self):
+        with self.lock:
+            self.api.End()
+
+def create_engine(engine_name=None, tesseract_path=None, lang="eng"):
+    """
+    Create the configured OCR engine, falling back to pytesseract
+
+    Args:
+        engine_name (str, optional): "auto", "tesserocr" or "pytesseract".
+                                     If not provided, will look for OCR_ENGINE
+                                     environment variable and default to "auto"
+        tesseract_path (str, optional): Path to tesseract executable
+                                       (needed on Windows)
+        lang (str): Tesseract language code(s)
+
+    Returns:
+        OCREngine: The engine
+    """
+    # Load environment variables
+    load_dotenv()
+    engine_name = (engine_name or os.getenv("OCR_ENGINE") or "auto").lower()
+
+    if engine_name in ("auto", "tesserocr"):
+        # Language data normally sits next to the executable on Windows
+        tessdata_path = os.getenv("TESSDATA_PREFIX")
+        if not tessdata_path and tesseract_path:
+            candidate = os.path.join(os.path.dirname(tesseract_path), "tessdata")
+            if os.path.isdir(candidate):
+                tessdata_path = candidate
+
+        try:
+            engine = TesserocrEngine(lang=lang, tessdata_path=tessdata_path)
+            print("Using in-process tesserocr OCR engine")
+            return engine
+        except ImportError:
+            if engine_name == "tesserocr":
+                print("tesserocr is not installed. Falling back to pytesseract.")
+        except Exception as e:
+            print(f"Failed to start tesserocr: {str(e)}. Falling back to pytesseract.")
+
+    return PytesseractEngine(tesseract_path=tesseract_path, lang=lang)
@@ -0,0 +1,185 @@
+import cv2
+import numpy as np
+from capture.change_detector import ChangeDetector
+
+class RegionDetector:
+    """
+    Finds the dominant text block (question and choices) in a screenshot
+
+    Text strokes are found with a morphological gradient, smeared into lines
+    and blocks with closing operations, and the connected component holding
+    the most text is grown with the blocks aligned above and below it (the
+    choices under a question). Long rules, full-width strips and anything on
+    the top or bottom edge (browser chrome, taskbars) are ignored. Detection
+    runs on a downscaled copy. The last region is reused while nothing
+    changed outside it since it was detected, so repeat captures of the same
+    layout skip detection but a longer or moved question is detected again.
+    """
+
+    DETECTION_WIDTH = 1280     # Width of the downscaled image used for detection
+    PADDING = 12               # Pixels added around the detected block (full resolution)
+    MIN_AREA_FRACTION = 0.002  # Blocks smaller than this fraction of the screen are ignored
+
+    def __init__(self, detection_width=None, padding=None, reuse_last=True):
+        """
+        Initialize the RegionDetector
+
+        Args:
+            detection_width (int, optional): Width of the image detection runs on
+            padding (int, optional): Margin added around the detected block
+            reuse_last (bool): Reuse the last region for captures of the same size
+        """
+        self.detection_width = detection_width or self.DETECTION_WIDTH
+        self.padding = self.PADDING if padding is None else padding
+        self.reuse_last = reuse_last
+
+        # Last detected region and the image shape it was detected on
+        self.last_region = None
+        self.last_shape = None
+
+        # Remembers the screen the last region was detected on
+        self.change_detector = ChangeDetector()
+
+    def locate(self, gray):
+        """
+        Get the question region, reusing the last one when possible
+
+        Args:
+            gray (numpy.ndarray): Grayscale screenshot
+
+        Returns:
+            tuple or None: (x, y, width, height) of the block, or None if no block was found
+        """
+        if self.reuse_last and self.last_region is not None and self.last_shape == gray.shape:
+            # Compared with the screen the region was detected on, not the previous capture
+            change = self.change_detector.compare(gray, remember=False)
+            if self._changes_inside(change.regions, self.last_region, gray.shape[1]):
+                return self.last_region
+
+        region = self.detect(gray)
+        if region is not None:
+            self.last_region = region
+            self.last_shape = gray.shape
+            if self.reuse_last:
+                self.change_detector.compare(gray)
+        return region
+
+    def _changes_inside(self, changes, region, width):
+        """
+        Check that every changed area lies within the region
+
+        Changed areas are measured on a coarse grid, so they may overhang the
+        region by one grid cell.
+        """
+        x, y, region_width, region_height = region
+        slack = width / self.change_detector.grid_width
+        for change_x, change_y, change_width, change_height in changes:
+            if (change_x < x - slack or change_y < y - slack
+                    or change_x + change_width > x + region_width + slack
+                    or change_y + change_height > y + region_height + slack):
+                return False
+        return True
+
+    def detect(self, gray):
+        """
+        Detect the dominant text block
+
+        Args:
+            gray (numpy.ndarray): Grayscale screenshot
+
+        Returns:
+            tuple or None: (x, y, width, height) of the block, or None if no block was found
+        """
+        height, width = gray.shape
+        scale = min(1.0, self.detection_width / width)
+        small = gray if scale == 1.0 else cv2.resize(
+            gray, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA
+        )
+        small_height, small_width = small.shape
+
+        # Stroke edges respond to both dark-on-light and light-on-dark text
+        gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+        _, ink = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+        # Drop long rules (toolbar, sidebar and window borders) so they do not join text to the UI
+        rules = cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (small_width // 8, 1)))
+        rules |= cv2.morphologyEx(ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, small_height // 8)))
+        ink = cv2.subtract(ink, rules)
+
+        # Join characters into lines, then lines into paragraphs/blocks
+        lines = cv2.morphologyEx(ink, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (25, 3)))
+        blocks = cv2.morphologyEx(lines, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 31)))
+
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(blocks, connectivity=8)
+        if count <= 1:
+            return None
+
+        # Amount of text inside each component
+        ink_per_label = np.bincount(labels[ink > 0], minlength=count)
+
+        min_area = self.MIN_AREA_FRACTION * small_width * small_height
+        candidates = []
+        for label in range(1, count):
+            x, y, w, h, area = stats[label]
+            if w * h < min_area:
+                continue
+            # Skip full-width bars (taskbars, tab strips, toolbars) and anything
+            # touching the top or bottom edge (title bars, browser chrome, docks)
+            if w > 0.9 * small_width and h < 0.12 * small_height:
+                continue
+            if y == 0 or y + h == small_height:
+                continue
+            candidates.append((int(ink_per_label[label]), [int(x), int(y), int(x + w), int(y + h)]))
+
+        if not candidates:
+            return None
+
+        x0, y0, x1, y1 = self._grow_block(candidates, lines)
+        x0 = max(0, int(x0 / scale) - self.padding)
+        y0 = max(0, int(y0 / scale) - self.padding)
+        x1 = min(width, int(np.ceil(x1 / scale)) + self.padding)
+        y1 = min(height, int(np.ceil(y1 / scale)) + self.padding)
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def _grow_block(self, candidates, lines):
+        """
+        Start from the block with the most text and add the blocks stacked above or below it
+
+        A question and its choices are often separated by more than a line of
+        space, so they end up as separate components. Blocks within a few text
+        lines of the current box are merged when they are aligned with it (same
+        left edge, same centre, or inside its horizontal span), which keeps
+        toolbars and page headers out.
+        """
+        candidates = sorted(candidates, key=lambda candidate: candidate[0], reverse=True)
+        box = list(candidates[0][1])
+        remaining = [bounds for _, bounds in candidates[1:]]
+
+        # Text line height of the starting block (other UI text may be much smaller)
+        line_count, _, line_stats, _ = cv2.connectedComponentsWithStats(lines, connectivity=8)
+        heights = [h for x, y, w, h, _ in line_stats[1:line_count]
+                   if box[0] <= x + w / 2 <= box[2] and box[1] <= y + h / 2 <= box[3]]
+        line_height = float(np.median(heights)) if heights else 10.0
+        max_gap = 3 * line_height
+        max_offset = 2 * line_height
+
+        merged = True
+        while merged:
+            merged = False
+            for bounds in list(remaining):
+                x0, y0, x1, y1 = bounds
+                vertical_gap = max(y0 - box[3], box[1] - y1, 0)
+                aligned = (abs(x0 - box[0]) <= max_offset
+                           or abs((x0 + x1) - (box[0] + box[2])) / 2 <= max_offset
+                           or (x0 >= box[0] and x1 <= box[2]))
+                if vertical_gap <= max_gap and aligned:
+                    box = [min(box[0], x0), min(box[1], y0), max(box[2], x1), max(box[3], y1)]
+                    remaining.remove(bounds)
+                    merged = True
+        return box
+
+    def reset(self):
+        """Forget the last region so the next capture runs detection again"""
+        self.last_region = None
+        self.last_shape = None
+        self.change_detector.reset()
@@ -1,69 +1,141 @@
+import os
 import cv2
 import numpy as np
-import pytesseract
 from PIL import Image
+from dotenv import load_dotenv
+from ocr.ocr_engine import create_engine
+from ocr.ocr_cache import OCRCache
+from ocr.preprocessing import Preprocessor
+from ocr.region_detector import RegionDetector
+from ocr.tiled_ocr import TiledOCR
 
 class TextExtractor:
     """Class for extracting text from images using OCR"""
     
-    def __init__(self, tesseract_path=None):
+    def __init__(self, tesseract_path=None, engine=None, detect_region=None, workers=None, ocr_cache=None, preprocess_profile=None):
         """
         Initialize the TextExtractor
         
         Args:
             tesseract_path (str, optional): Path to tesseract executable
                                            (needed on Windows)
+            engine (OCREngine, optional): OCR backend to use. If not provided,
+                                          the configured engine is created once here
+            detect_region (bool, optional): Crop to the detected question block before OCR.
+                                            If not provided, will look for OCR_DETECT_REGION
+                                            environment variable and default to True
+            workers (int, optional): Worker processes for tiled OCR of large images.
+                                     If not provided, will look for OCR_WORKERS
+                                     environment variable. 1 (the default) disables tiling
+            ocr_cache (OCRCache, optional): Cache of results by preprocessed image.
+                                            If not provided, one is created from the
+                                            OCR_CACHE_* environment variables
+            preprocess_profile (str or list, optional): Preprocessing profile (see
+                                                        ocr.preprocessing.PROFILES). If not provided,
+                                                        will look for OCR_PREPROCESS_PROFILE
         """
-        # Set tesseract path if provided (required on Windows)
-        if tesseract_path:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        # Load environment variables
+        load_dotenv()
+        
+        # Create the OCR engine up front so language data is loaded at startup
+        self.engine = engine or create_engine(tesseract_path=tesseract_path)
+        
+        self.preprocessor = Preprocessor(preprocess_profile)
+        
+        if detect_region is None:
+            detect_region = os.getenv("OCR_DETECT_REGION", "true").lower() not in ("0", "false", "no")
+        self.region_detector = RegionDetector() if detect_region else None
+        
+        # Tiled OCR runs bands of large images on warm worker processes
+        workers = int(workers or os.getenv("OCR_WORKERS") or 1)
+        self.tiled_ocr = None
+        if workers > 1:
+            engine_name = self.engine.name if self.engine.name in ("tesserocr", "pytesseract") else None
+            self.tiled_ocr = TiledOCR(workers=workers, engine=self.engine, engine_name=engine_name,
+                                      tesseract_path=tesseract_path)
+            self.tiled_ocr.start()
+        
+        # Identical preprocessed images skip recognition
+        self.ocr_cache = ocr_cache or OCRCache()
+        self.engine_id = f"{self.engine.name}:{getattr(self.engine, 'lang', '')}"
+        
+        # OCRResult (text and confidences) of the last extraction
+        self.last_result = None
+        
+        # (x, y, width, height) of the crop used for the last extraction, None for the full image
+        self.last_region = None
     
-    def preprocess_image(self, image):
+    def preprocess_image(self, image, color_order="BGR"):
         """
         Preprocess the image to improve OCR accuracy
         
         Args:
             image (numpy.ndarray): The image to preprocess
+            color_order (str): Channel order of color images, "BGR" or "RGB"
             
         Returns:
             numpy.ndarray: The preprocessed image
         """
-        # Convert to grayscale if it's a color image
+        # Run the configured stages (grayscale and Otsu threshold by default)
+        return self.preprocessor.run(image, color_order)
+    
+    def _to_gray(self, image, color_order="BGR"):
+        """Convert a color image to grayscale, passing grayscale images through"""
         if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image
-            
-        # Apply thresholding to get a binary image
-        _, binary = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        
-        # Invert the image (black text on white background is better for OCR)
-        binary = 255 - binary
-        
-        return binary
+            conversion = cv2.COLOR_RGB2GRAY if color_order == "RGB" else cv2.COLOR_BGR2GRAY
+            return cv2.cvtColor(image, conversion)
+        return image
+    
+    def _recognize(self, preprocessed):
+        """Recognize a preprocessed image through the cache, tiled across worker processes when enabled"""
+        key = self.ocr_cache.make_key(preprocessed, self.engine_id)
+        result = self.ocr_cache.get(key)
+        
+        if result is None:
+            recognizer = self.tiled_ocr if self.tiled_ocr is not None else self.engine
+            result = recognizer.recognize_result(preprocessed)
+            self.ocr_cache.put(key, result)
+        
+        self.last_result = result
+        return result.text
     
-    def extract_text(self, image):
+    def extract_text(self, image, color_order="BGR"):
         """
         Extract text from an image
         
         Args:
             image (numpy.ndarray or PIL.Image): The image to extract text from
+            color_order (str): Channel order of numpy color images, "BGR" or "RGB"
             
         Returns:
             str: The extracted text
         """
-        # Convert PIL Image to numpy array if needed
+        # Convert PIL Image to numpy array if needed (PIL images are RGB)
         if isinstance(image, Image.Image):
-            image = np.array(image)
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-        
-        # Preprocess the image
-        preprocessed = self.preprocess_image(image)
-        
-        # Extract text using pytesseract
-        text = pytesseract.image_to_string(preprocessed)
+            image = np.asarray(image)
+            color_order = "RGB"
+        
+        self.last_region = None
+        self.last_result = None
+        
+        if self.region_detector is None:
+            return self._recognize(self.preprocess_image(image, color_order))
+        
+        # Only the question block is thresholded and recognized
+        gray = self._to_gray(image, color_order)
+        region = self.region_detector.locate(gray)
+        if region is not None:
+            x, y, width, height = region
+            text = self._recognize(self.preprocess_image(gray[y:y + height, x:x + width]))
+            if text.strip():
+                self.last_region = region
+                return text
+            
+            # The remembered block no longer holds the question, detect again next time
+            print("No text in detected question region, falling back to the full image")
+            self.region_detector.reset()
         
-        return text
+        return self._recognize(self.preprocess_image(gray))
     
     def is_multiple_choice(self, text):
         """
@@ -0,0 +1,232 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+import numpy as np
+from dotenv import load_dotenv
+from ocr.ocr_engine import OCRResult, create_engine
+
+# OCR engine of the current worker process, created once by _init_worker
+_worker_engine = None
+
+def _init_worker(engine_name, tesseract_path, lang):
+    """Load the OCR engine once when a worker process starts"""
+    global _worker_engine
+    _worker_engine = create_engine(engine_name, tesseract_path=tesseract_path, lang=lang)
+
+def _recognize_band(band):
+    """Recognize one band in a worker process"""
+    try:
+        return _worker_engine.recognize_result(band)
+    except Exception as e:
+        # Some pytesseract exceptions cannot be unpickled and would break the pool
+        raise RuntimeError(f"{type(e).__name__}: {str(e)}") from None
+
+def _ping():
+    """No-op task used to start the worker processes"""
+    return os.getpid()
+
+def find_line_gaps(binary, max_ink_fraction=0.002):
+    """
+    Find runs of blank rows between text lines
+
+    Args:
+        binary (numpy.ndarray): Preprocessed binary image
+        max_ink_fraction (float): Fraction of ink pixels a row may have and still count as blank
+
+    Returns:
+        list: (first_row, last_row_exclusive) for every blank run
+    """
+    ink = binary < 128
+    # Text is the minority colour whatever the polarity
+    if ink.mean() > 0.5:
+        ink = ~ink
+
+    blank = ink.sum(axis=1) <= max_ink_fraction * binary.shape[1]
+
+    gaps = []
+    start = None
+    for row, is_blank in enumerate(blank):
+        if is_blank and start is None:
+            start = row
+        elif not is_blank and start is not None:
+            gaps.append((start, row))
+            start = None
+    if start is not None:
+        gaps.append((start, len(blank)))
+    return gaps
+
+def split_into_bands(binary, band_count, overlap=24):
+    """
+    Split a preprocessed image into horizontal bands at line gaps
+
+    Each cut is placed in the blank gap closest to an even split, and the
+    neighbouring bands share that gap so no line is cut. Where no gap is
+    close enough the cut is forced and the bands overlap by `overlap` rows;
+    lines read twice there are removed by merge_band_text.
+
+    Args:
+        binary (numpy.ndarray): Preprocessed binary image
+        band_count (int): Desired number of bands
+        overlap (int): Rows shared by bands around a forced cut
+
+    Returns:
+        list: (top, bottom, forced) for every band, top to bottom. `forced` is True
+              when the band starts at a forced cut
+    """
+    height = binary.shape[0]
+    if band_count <= 1:
+        return [(0, height, False)]
+
+    # Interior gaps only; blank margins at the top and bottom are not cut points
+    gaps = [gap for gap in find_line_gaps(binary) if gap[0] > 0 and gap[1] < height]
+    band_height = height / band_count
+
+    cuts = []
+    for index in range(1, band_count):
+        target = index * band_height
+        previous = cuts[-1][1] if cuts else 0
+        candidates = [gap for gap in gaps if gap[0] >= previous]
+        best = min(candidates, key=lambda gap: abs((gap[0] + gap[1]) / 2 - target), default=None)
+
+        if best is not None and abs((best[0] + best[1]) / 2 - target) <= band_height / 2:
+            cuts.append((best[0], best[1], False))
+        else:
+            cut = int(target)
+            cuts.append((max(previous, cut - overlap), min(height, cut + overlap), True))
+
+    bands = []
+    top, forced = 0, False
+    for gap_top, gap_bottom, cut_forced in cuts:
+        # Bands extend across the shared gap (or overlap) on both sides
+        bands.append((top, gap_bottom, forced))
+        top, forced = gap_top, cut_forced
+    bands.append((top, height, forced))
+    return bands
+
+def merge_band_text(texts, forced):
+    """
+    Merge band text in reading order
+
+    Args:
+        texts (list): Recognized text of every band, top to bottom
+        forced (list): For every band, whether it starts at a forced cut
+
+    Returns:
+        str: The merged text
+    """
+    lines = []
+    for text, band_forced in zip(texts, forced):
+        band_lines = text.rstrip().split("\n")
+
+        # Drop lines that the previous band already read in the overlap
+        if band_forced and lines:
+            for size in range(min(len(lines), len(band_lines)), 0, -1):
+                if [line.strip() for line in lines[-size:]] == [line.strip() for line in band_lines[:size]]:
+                    band_lines = band_lines[size:]
+                    break
+
+        lines.extend(band_lines)
+    return "\n".join(lines)
+
+class TiledOCR:
+    """
+    Recognizes large images as horizontal bands on a pool of worker processes
+
+    Every worker loads its own OCR engine once when it starts, so a band only
+    pays for recognition. Images too small to split are recognized in-process.
+    """
+
+    MIN_BAND_HEIGHT = 160  # Bands are never made shorter than this
+
+    def __init__(self, workers=None, engine=None, engine_name=None, tesseract_path=None, lang="eng"):
+        """
+        Initialize the TiledOCR
+
+        Args:
+            workers (int, optional): Number of worker processes. If not provided,
+                                     will look for OCR_WORKERS environment variable
+                                     and default to the number of CPUs
+            engine (OCREngine, optional): In-process engine for images too small to split
+            engine_name (str, optional): Engine each worker creates (see create_engine)
+            tesseract_path (str, optional): Path to tesseract executable
+                                           (needed on Windows)
+            lang (str): Tesseract language code(s)
+        """
+        # Load environment variables
+        load_dotenv()
+
+        self.workers = int(workers or os.getenv("OCR_WORKERS") or os.cpu_count() or 1)
+        self.engine_name = engine_name
+        self.tesseract_path = tesseract_path
+        self.lang = lang
+        self.engine = engine
+        self.executor = None
+
+    def start(self):
+        """
+        Start the worker processes so their engines are loaded before the first image
+
+        Returns:
+            ProcessPoolExecutor: The pool
+        """
+        if self.executor is None:
+            # Spawn rather than fork: the GUI process runs Qt and worker threads
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.engine_name, self.tesseract_path, self.lang),
+            )
+            # Workers are started lazily by the executor, so hand each one a task
+            for _ in range(self.workers):
+                self.executor.submit(_ping)
+        return self.executor
+
+    def band_count(self, image):
+        """Number of bands an image is split into"""
+        return max(1, min(self.workers, image.shape[0] // self.MIN_BAND_HEIGHT))
+
+    def recognize(self, image):
+        """
+        Recognize the text in a preprocessed image
+
+        Args:
+            image (numpy.ndarray): Preprocessed (binary) image
+
+        Returns:
+            str: The recognized text, in reading order
+        """
+        return self.recognize_result(image).text
+
+    def recognize_result(self, image):
+        """
+        Recognize the text in a preprocessed image along with word confidences
+
+        Args:
+            image (numpy.ndarray): Preprocessed (binary) image
+
+        Returns:
+            OCRResult: The merged text and the confidences of every band
+        """
+        bands = split_into_bands(image, self.band_count(image))
+
+        if len(bands) == 1:
+            if self.engine is not None:
+                return self.engine.recognize_result(image)
+            return self.start().submit(_recognize_band, image).result()
+
+        executor = self.start()
+        futures = [executor.submit(_recognize_band, np.ascontiguousarray(image[top:bottom]))
+                   for top, bottom, _ in bands]
+        wait(futures)
+        results = [future.result() for future in futures]
+
+        text = merge_band_text([result.text for result in results], [forced for _, _, forced in bands])
+        confidences = [conf for result in results for conf in result.confidences]
+        return OCRResult(text, confidences)
+
+    def close(self):
+        """Stop the worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
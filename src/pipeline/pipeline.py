@@ -0,0 +1,296 @@
+import time
+import uuid
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from capture.change_detector import ChangeDetector
+
+class PipelineRun:
+    """State and per-stage timings for a single trigger of the pipeline"""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:8]
+        self.started_at = time.perf_counter()
+
+        # Stage currently in progress and when it started
+        self.stage = None
+        self.stage_started_at = None
+
+        # Elapsed seconds for each completed stage, in execution order
+        self.stage_timings = {}
+
+        # Results produced along the way
+        self.question_text = None
+        self.question_type = None
+        self.answer_text = None
+        self.success = None
+
+        # Set once the export stage succeeded for this run's answer
+        self.exported = False
+
+        # Screen change since the previous capture, and the run whose
+        # answer was reused when the screen had not changed
+        self.change = None
+        self.reused_run_id = None
+
+    def total_time(self):
+        """
+        Get the time elapsed since the run started
+
+        Returns:
+            float: Elapsed time in seconds
+        """
+        return time.perf_counter() - self.started_at
+
+    def summary(self):
+        """
+        Build a one-line summary of the stage timings
+
+        Returns:
+            str: Summary suitable for logging
+        """
+        stages = " | ".join(f"{name} {elapsed:.2f}s" for name, elapsed in self.stage_timings.items())
+        return f"[Pipeline {self.run_id}] {stages} | total {self.total_time():.2f}s"
+
+
+class Pipeline(QObject):
+    """
+    Runs the capture -> OCR -> classify -> answer -> export sequence
+
+    Each trigger creates a PipelineRun. Completion signals from the panels only
+    advance the run when they belong to the stage in progress, so every stage
+    runs exactly once per trigger.
+    """
+
+    STAGES = ("capture", "ocr", "classify", "answer", "export")
+
+    # Signals
+    stage_completed = pyqtSignal(str, str, bool)  # run ID, stage name, success status
+    run_completed = pyqtSignal(str, bool)         # run ID, success status
+
+    def __init__(self, capture_panel, question_panel, response_panel, change_detector=None):
+        """
+        Initialize the pipeline
+
+        Args:
+            capture_panel: The capture panel component
+            question_panel: The question panel component
+            response_panel: The response panel component
+            change_detector (ChangeDetector, optional): Detector used to skip
+                                                        unchanged screens
+        """
+        super().__init__()
+        self.capture_panel = capture_panel
+        self.question_panel = question_panel
+        self.response_panel = response_panel
+
+        # The run in progress (None when idle) and the last finished run
+        self.current_run = None
+        self.last_run = None
+
+        # Latest run that produced an answer, reused while the screen is unchanged
+        self.change_detector = change_detector or ChangeDetector()
+        self.last_answered_run = None
+
+        # Asynchronous stages report back through the panel signals
+        self.capture_panel.capture_completed.connect(self._on_capture_completed)
+        self.question_panel.text_extracted.connect(self._on_ocr_completed)
+        self.response_panel.claude_completed.connect(self._on_answer_completed)
+        self.response_panel.export_completed.connect(self._on_export_completed)
+
+    def is_running(self):
+        """Check if a run is in progress"""
+        return self.current_run is not None
+
+    def trigger(self):
+        """
+        Start a new run unless one is already in progress
+
+        Returns:
+            str or None: The run ID, or None if the trigger was ignored
+        """
+        if self.is_running():
+            print(f"[Pipeline {self.current_run.run_id}] Run already in progress. Ignoring new trigger.")
+            return None
+
+        self.current_run = PipelineRun()
+        print(f"[Pipeline {self.current_run.run_id}] Run started")
+
+        # Use QTimer so the run always starts from the event loop
+        QTimer.singleShot(0, self._start_capture)
+        return self.current_run.run_id
+
+    def _begin_stage(self, stage):
+        """Mark a stage as started for the current run"""
+        run = self.current_run
+        run.stage = stage
+        run.stage_started_at = time.perf_counter()
+        print(f"[Pipeline {run.run_id}] Starting {stage}...")
+
+    def _finish_stage(self, stage, success):
+        """
+        Record the end of a stage
+
+        Args:
+            stage (str): The stage that reported completion
+            success (bool): Whether the stage succeeded
+
+        Returns:
+            bool: True if the run should continue with the next stage
+        """
+        run = self.current_run
+
+        # Drop completions that do not belong to the stage in progress
+        if run is None or run.stage != stage:
+            return False
+
+        elapsed = time.perf_counter() - run.stage_started_at
+        run.stage_timings[stage] = elapsed
+        run.stage = None
+        print(f"[Pipeline {run.run_id}] {stage} {'succeeded' if success else 'failed'} in {elapsed:.2f} seconds")
+        self.stage_completed.emit(run.run_id, stage, success)
+
+        if not success:
+            self._finish_run(False)
+            return False
+        return True
+
+    def _finish_run(self, success):
+        """End the current run and log its timings"""
+        run = self.current_run
+        run.success = success
+        self.current_run = None
+        self.last_run = run
+        print(run.summary())
+        self.run_completed.emit(run.run_id, success)
+
+    def _advance(self, next_stage):
+        """Schedule the next stage, letting the UI update in between"""
+        QTimer.singleShot(0, next_stage)
+
+    def _start_capture(self):
+        """Stage 1: capture the screen"""
+        self._begin_stage("capture")
+        if not self.capture_panel.capture_screen(emit_signal=True):
+            self._finish_stage("capture", False)
+
+    def _on_capture_completed(self, success):
+        """Handle completion of the capture stage"""
+        if not self._finish_stage("capture", success):
+            return
+
+        if self._screen_unchanged():
+            self._reuse_previous_answer()
+            if self.last_answered_run.exported:
+                # The same answer was already sent; pressing the hotkey again must not send it twice
+                print(f"[Pipeline {self.current_run.run_id}] Answer already exported; skipping export")
+                self._finish_run(True)
+            else:
+                self._advance(self._start_export)
+        else:
+            self._advance(self._start_ocr)
+
+    def _screen_unchanged(self):
+        """
+        Compare the new capture with the previous one
+
+        Returns:
+            bool: True if the screen is unchanged and a previous answer can be reused
+        """
+        run = self.current_run
+        image = self.capture_panel.get_captured_image()
+        if image is None:
+            return False
+
+        started_at = time.perf_counter()
+        # The baseline only moves to captures whose question was answered (see _on_answer_completed),
+        # so a failed run never makes its screen look "unchanged" to the next one
+        run.change = self.change_detector.compare(image, remember=False)
+        run.stage_timings["change_detection"] = time.perf_counter() - started_at
+
+        if run.change.changed:
+            print(f"[Pipeline {run.run_id}] Screen changed: {run.change}")
+            for x, y, width, height in run.change.regions:
+                print(f"[Pipeline {run.run_id}]   region x={x} y={y} {width}x{height}")
+            return False
+
+        print(f"[Pipeline {run.run_id}] Screen unchanged ({run.change})")
+        return self.last_answered_run is not None
+
+    def _reuse_previous_answer(self):
+        """Skip OCR, classify and answer by reusing the last answered run"""
+        run = self.current_run
+        previous = self.last_answered_run
+        run.question_text = previous.question_text
+        run.question_type = previous.question_type
+        run.answer_text = previous.answer_text
+        run.reused_run_id = previous.run_id
+
+        self.question_panel.set_question(run.question_text, run.question_type)
+        self.response_panel.set_response_text(run.answer_text)
+        print(f"[Pipeline {run.run_id}] Reusing OCR text and answer from run {previous.run_id}")
+
+    def _start_ocr(self):
+        """Stage 2: extract the text from the captured image"""
+        self._begin_stage("ocr")
+        image = self.capture_panel.get_captured_image()
+        if not self.question_panel.extract_text(image, emit_signal=True):
+            self._finish_stage("ocr", False)
+
+    def _on_ocr_completed(self, success):
+        """Handle completion of the OCR stage"""
+        if self._finish_stage("ocr", success):
+            self._advance(self._start_classify)
+
+    def _start_classify(self):
+        """Stage 3: determine the question type"""
+        self._begin_stage("classify")
+        run = self.current_run
+        run.question_type = self.question_panel.classify_question()
+        run.question_text = self.question_panel.get_question_text()
+        if self._finish_stage("classify", True):
+            self._advance(self._start_answer)
+
+    def _start_answer(self):
+        """Stage 4: ask Claude for the answer"""
+        self._begin_stage("answer")
+        run = self.current_run
+        started = self.response_panel.send_to_claude(
+            run.question_text, run.question_type, emit_signal=True
+        )
+        if not started:
+            self._finish_stage("answer", False)
+
+    def _on_answer_completed(self, success):
+        """Handle completion of the answer stage"""
+        if self.current_run is not None and self.current_run.stage == "answer":
+            self.current_run.answer_text = self.response_panel.get_answer_text()
+        if self._finish_stage("answer", success):
+            self.last_answered_run = self.current_run
+            self.change_detector.accept()
+            self._advance(self._start_export)
+
+    def _start_export(self):
+        """Stage 5: send the question and answer to the export sinks (email by default)"""
+        self._begin_stage("export")
+        run = self.current_run
+        started = self.response_panel.export_results(
+            question_text=run.question_text,
+            answer_text=run.answer_text,
+            question_type=run.question_type,
+            # Already encoding since OCR finished (MainWindow.on_text_extracted); resolved on the export worker
+            image_data=self.capture_panel.prepare_attachment(self.question_panel.get_question_region()),
+            run_id=run.run_id,
+            metadata={"stage_timings": dict(run.stage_timings), "reused_run_id": run.reused_run_id},
+            emit_signal=True
+        )
+        if not started:
+            self._finish_stage("export", False)
+
+    def _on_export_completed(self, success):
+        """Handle completion of the export stage"""
+        if self._finish_stage("export", success):
+            run = self.current_run
+            run.exported = True
+            if run.reused_run_id is not None:
+                # A run reusing an answer whose export had failed sent it this time
+                self.last_answered_run.exported = True
+            self._finish_run(True)
@@ -0,0 +1,13 @@
+import os
+import sys
+import pytest
+
+# The application imports its packages relative to src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Keep default caches, spools and results out of the real per-user data directory"""
+    path = tmp_path / "data"
+    monkeypatch.setenv("QUIZ_ANALYZER_DATA_DIR", str(path))
+    return path
@@ -0,0 +1,110 @@
+"""
+AnswerCache keys, expiry and least-recently-used eviction
+"""
+from types import SimpleNamespace
+import pytest
+from ai import answer_cache as answer_cache_module
+from ai.answer_cache import AnswerCache
+from ai.claude_client import ClaudeClient
+from ai.request_scheduler import RequestScheduler
+from benchmarks.mock_claude_server import ANSWER_TEXT, MockClaudeServer
+
+class Clock:
+    """Stands in for time.time so entries get distinct, controllable timestamps"""
+
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache_module, "time", SimpleNamespace(time=clock))
+    return clock
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**options):
+        cache = AnswerCache(str(tmp_path / "answers.sqlite3"), **options)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+def test_keys_ignore_case_and_whitespace(make_cache):
+    cache = make_cache()
+    key = cache.make_key("What is  the capital\nof France?", "short_answer", "model", "prompt")
+
+    assert key == cache.make_key(" what is the CAPITAL of france? ", "short_answer", "model", "prompt")
+    assert key != cache.make_key("What is the capital of France?", "multiple_choice", "model", "prompt")
+    assert key != cache.make_key("What is the capital of France?", "short_answer", "other-model", "prompt")
+    assert key != cache.make_key("What is the capital of France?", "short_answer", "model", "other prompt")
+
+def test_answers_persist_across_instances(make_cache):
+    make_cache().put("key", "Paris")
+
+    cache = make_cache()
+    assert cache.get("key") == "Paris"
+    assert cache.stats() == {"hits": 1, "misses": 0, "entries": 1}
+
+def test_expired_answers_are_misses_and_removed(make_cache, clock):
+    cache = make_cache(ttl_hours=1)
+    cache.put("key", "Paris")
+
+    clock.advance(3599)
+    assert cache.get("key") == "Paris"
+
+    clock.advance(2)
+    assert cache.get("key") is None
+    assert cache.size() == 0
+    assert cache.misses == 1
+
+def test_put_evicts_expired_answers(make_cache, clock):
+    cache = make_cache(ttl_hours=1)
+    cache.put("old", "Paris")
+    clock.advance(3601)
+    cache.put("new", "Rome")
+
+    assert cache.size() == 1
+    assert cache.get("new") == "Rome"
+
+def test_least_recently_used_answer_is_evicted(make_cache, clock):
+    cache = make_cache(max_entries=2)
+    cache.put("first", "1")
+    clock.advance(1)
+    cache.put("second", "2")
+    clock.advance(1)
+    # Reading the first entry makes the second the least recently used
+    cache.get("first")
+    clock.advance(1)
+    cache.put("third", "3")
+
+    assert cache.size() == 2
+    assert cache.get("second") is None
+    assert cache.get("first") == "1"
+    assert cache.get("third") == "3"
+
+def test_client_answers_repeated_questions_from_the_cache(make_cache, monkeypatch):
+    server = MockClaudeServer(latency=0.0).start()
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", server.base_url)
+    scheduler = RequestScheduler(requests_per_minute=6000, tokens_per_minute=10000000)
+    client = ClaudeClient(api_key="mock", answer_cache=make_cache(), scheduler=scheduler)
+    try:
+        first = client.get_answer("What is the capital of France?", "short_answer")
+        second = client.get_answer("what is the capital of  France?", "short_answer")
+    finally:
+        server.stop()
+
+    assert first.text == second.text == ANSWER_TEXT
+    assert not first.cached and second.cached
+    assert second.attempts == 0
+    assert server.requests == 1
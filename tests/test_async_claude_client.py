@@ -0,0 +1,52 @@
+"""
+AsyncClaudeClient against the local mock of the Messages API
+"""
+import asyncio
+import threading
+import pytest
+from ai.async_claude_client import AsyncClaudeClient
+from ai.claude_client import RequestCancelled
+from ai.prompt_registry import PromptRegistry
+from ai.request_scheduler import RequestScheduler
+from benchmarks.mock_claude_server import ANSWER_TEXT, MockClaudeServer
+
+QUESTION_TEXT = "Which of the following data structures gives O(1) average lookup by key?"
+
+@pytest.fixture
+def client(monkeypatch):
+    server = MockClaudeServer(latency=0.2).start()
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", server.base_url)
+    scheduler = RequestScheduler(requests_per_minute=6000, tokens_per_minute=10000000)
+    client = AsyncClaudeClient(api_key="mock", http2=False, scheduler=scheduler)
+    yield client
+    client.close()
+    server.stop()
+
+def test_blocking_methods_run_on_the_background_loop(client):
+    assert client.client is None
+    assert client.get_answer(QUESTION_TEXT).text == ANSWER_TEXT
+    assert client.ask_question(QUESTION_TEXT) == ANSWER_TEXT
+    assert "".join(client.stream_question(QUESTION_TEXT)) == ANSWER_TEXT
+    assert client.get_structured_answer(QUESTION_TEXT).letter == "B"
+
+def test_cancel_stops_waiting(client):
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    with pytest.raises(RequestCancelled):
+        client.get_answer(QUESTION_TEXT, cancel_event=cancel_event)
+
+def test_prompts_are_forwarded(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", "http://127.0.0.1:1")
+    prompts = PromptRegistry()
+
+    assert AsyncClaudeClient(api_key="mock", http2=False, prompts=prompts).prompts is prompts
+
+def test_a_new_event_loop_closes_the_previous_client(client):
+    asyncio.run(client.ask(QUESTION_TEXT))
+    first_client = client.async_client
+
+    asyncio.run(client.ask(QUESTION_TEXT + " again"))
+
+    assert first_client.is_closed()
+    assert client.async_client is not first_client
@@ -0,0 +1,109 @@
+"""
+Choice letter extraction, scoring and concurrency limits in the batch evaluation runner
+"""
+import threading
+import pytest
+from PIL import Image
+from ai.async_claude_client import AsyncClaudeClient
+from ai.request_scheduler import RequestScheduler
+from benchmarks.mock_claude_server import MockClaudeServer
+from evaluation.batch_runner import BatchEvaluator, EvalItem, extract_choice_letter
+
+@pytest.mark.parametrize("answer_text, letter", [
+    ("A common mistake is to pick B, but the right one is clearly C.", "C"),
+    ("The answer is not A; it is C.", "C"),
+    ("I think it is B.", "B"),
+    ("The correct answer is B", "B"),
+    ("Answer: (C)", "C"),
+    ("The Correct Answer is **E**", "E"),
+    ("B) A hash table", "B"),
+    ("B. A hash table", "B"),
+    ("(D) A linked list", "D"),
+    ("**B.** A hash table", "B"),
+    ("**A** is right", "A"),
+    ("C", "C"),
+])
+def test_extracts_the_chosen_letter(answer_text, letter):
+    assert extract_choice_letter(answer_text) == letter
+
+@pytest.mark.parametrize("answer_text", [
+    "A hash table (B) gives O(1).",
+    "A hash table gives O(1) average lookup.",
+    "a hash table",
+    "Because hashing spreads the keys evenly.",
+    "The answer is a hash table",
+    "It is a hash table.",
+])
+def test_ignores_words_that_look_like_letters(answer_text):
+    assert extract_choice_letter(answer_text) is None
+
+def test_structured_letter_wins_over_the_text():
+    evaluator = BatchEvaluator(claude_client=None)
+    item = EvalItem("q1", question_text="Q", expected_letter="d")
+
+    scored = evaluator.score(item, "multiple_choice", "B) A hash table", letter="D")
+
+    assert scored == {"predicted": "D", "expected": "D", "correct": True}
+
+def test_short_answers_are_scored_on_the_answer_field():
+    evaluator = BatchEvaluator(claude_client=None)
+    item = EvalItem("q1", question_text="Q", expected_answer="The Nile")
+
+    assert evaluator.score(item, "short_answer", "Paris\n\nThe Nile is longer.", short_answer="Paris")["correct"] is False
+    assert evaluator.score(item, "short_answer", "The Nile\n\nIt is the longest.", short_answer="The Nile")["correct"]
+
+class CountingEvaluator(BatchEvaluator):
+    """Records how many items were in flight at once"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def evaluate_item_async(self, item):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await super().evaluate_item_async(item)
+        finally:
+            self.in_flight -= 1
+
+class FakeTextExtractor:
+    def extract_text(self, image):
+        return "Which of these is a hash table?\nA) list\nB) dict"
+
+    def is_multiple_choice(self, text):
+        return True
+
+def test_async_run_bounds_items_in_flight_and_ocr_threads(tmp_path, monkeypatch):
+    server = MockClaudeServer(latency=0.01).start()
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", server.base_url)
+    scheduler = RequestScheduler(requests_per_minute=60000, tokens_per_minute=100000000)
+    client = AsyncClaudeClient(api_key="mock", http2=False, scheduler=scheduler, max_concurrency=4)
+
+    items = []
+    for index in range(30):
+        image_path = str(tmp_path / f"q{index}.png")
+        Image.new("RGB", (8, 8), "white").save(image_path)
+        items.append(EvalItem(f"q{index}", image_path=image_path, expected_letter="B"))
+
+    extractors = []
+    extractor_threads = set()
+
+    def text_extractor_factory():
+        extractor_threads.add(threading.current_thread().name)
+        extractors.append(FakeTextExtractor())
+        return extractors[-1]
+
+    evaluator = CountingEvaluator(client, text_extractor_factory, concurrency=4, ocr_concurrency=2)
+    try:
+        summary = evaluator.run(items, str(tmp_path / "results.jsonl"), progress_every=100)
+    finally:
+        client.close()
+        server.stop()
+
+    assert summary["items"] == 30 and summary["errors"] == 0
+    assert evaluator.max_in_flight <= 4
+    assert len(extractors) <= 2
+    assert all(name.startswith("ocr") for name in extractor_threads)
+    assert evaluator.ocr_executor is None
@@ -0,0 +1,115 @@
+"""
+ChangeDetector thresholds, changed regions and baseline handling
+"""
+import numpy as np
+import pytest
+from capture.change_detector import ChangeDetector
+
+HEIGHT, WIDTH = 1080, 1920
+
+def screen(*boxes, value=0):
+    """A white grayscale screen with the given (x, y, width, height) boxes filled in"""
+    image = np.full((HEIGHT, WIDTH), 255, dtype=np.uint8)
+    for x, y, width, height in boxes:
+        image[y:y + height, x:x + width] = value
+    return image
+
+def contains(region, box):
+    """Whether a detected region covers a box"""
+    x, y, width, height = region
+    box_x, box_y, box_width, box_height = box
+    return x <= box_x and y <= box_y and x + width >= box_x + box_width and y + height >= box_y + box_height
+
+def test_first_capture_counts_as_changed():
+    change = ChangeDetector(threshold=0.002).compare(screen())
+
+    assert change.changed
+    assert change.changed_fraction == 1.0
+    assert change.regions == [(0, 0, WIDTH, HEIGHT)]
+
+def test_identical_capture_is_unchanged():
+    detector = ChangeDetector(threshold=0.002)
+    detector.compare(screen((100, 100, 400, 50)))
+
+    change = detector.compare(screen((100, 100, 400, 50)))
+
+    assert not change.changed
+    assert change.changed_fraction == 0.0
+    assert change.regions == []
+
+def test_differences_below_the_pixel_delta_are_ignored():
+    detector = ChangeDetector(threshold=0.0)
+    detector.compare(screen())
+
+    # A slightly different background, as from dithering or a fading cursor
+    change = detector.compare(np.full((HEIGHT, WIDTH), 245, dtype=np.uint8))
+
+    assert not change.changed
+    assert change.regions == []
+
+def test_changes_at_or_below_the_threshold_do_not_count():
+    detector = ChangeDetector(threshold=0.01)
+    detector.compare(screen())
+
+    # About 0.2% of the screen, such as a clock in the corner
+    change = detector.compare(screen((1800, 1040, 80, 40)))
+
+    assert not change.changed
+    assert 0.0 < change.changed_fraction <= 0.01
+    assert len(change.regions) == 1
+    assert contains(change.regions[0], (1800, 1040, 80, 40))
+
+def test_changes_above_the_threshold_are_located():
+    detector = ChangeDetector(threshold=0.002)
+    detector.compare(screen())
+
+    question, choice = (400, 300, 800, 100), (400, 700, 300, 60)
+    change = detector.compare(screen(question, choice))
+
+    assert change.changed
+    assert len(change.regions) == 2
+    for box in (question, choice):
+        region = next(region for region in change.regions if contains(region, box))
+        # Regions are measured on the thumbnail grid, so they only overhang by a few cells
+        assert region[2] <= box[2] + 40 and region[3] <= box[3] + 40
+
+def test_color_captures_are_compared():
+    detector = ChangeDetector(threshold=0.002)
+    detector.compare(np.dstack([screen()] * 3))
+
+    assert detector.compare(np.dstack([screen((400, 300, 800, 100))] * 3)).changed
+
+def test_a_new_resolution_counts_as_changed():
+    detector = ChangeDetector()
+    detector.compare(screen())
+
+    change = detector.compare(np.full((720, 1280), 255, dtype=np.uint8))
+
+    assert change.changed
+    assert change.regions == [(0, 0, 1280, 720)]
+
+def test_baseline_moves_only_on_accept_when_not_remembered():
+    detector = ChangeDetector(threshold=0.002)
+    detector.compare(screen())
+
+    changed_screen = screen((400, 300, 800, 100))
+    assert detector.compare(changed_screen, remember=False).changed
+    # Still compared with the first capture
+    assert detector.compare(changed_screen, remember=False).changed
+
+    detector.accept()
+    assert not detector.compare(changed_screen, remember=False).changed
+
+def test_reset_forgets_the_baseline():
+    detector = ChangeDetector()
+    detector.compare(screen())
+    detector.reset()
+
+    assert detector.compare(screen()).changed
+
+@pytest.mark.parametrize("value, threshold", [("0.05", 0.05), ("", ChangeDetector.DEFAULT_THRESHOLD)])
+def test_threshold_comes_from_the_environment(monkeypatch, value, threshold):
+    monkeypatch.setenv("SCREEN_CHANGE_THRESHOLD", value)
+
+    assert ChangeDetector().threshold == threshold
+    assert ChangeDetector(threshold=0.0).threshold == 0.0
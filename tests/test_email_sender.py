@@ -0,0 +1,143 @@
+"""
+EmailSender against the local SMTP sink: connection security modes and session reuse
+
+Needs aiosmtpd; the TLS modes also need the openssl command to make a
+throwaway certificate. No mail account or network is used.
+"""
+import io
+import shutil
+import subprocess
+import time
+import pytest
+from PIL import Image
+
+pytest.importorskip("aiosmtpd")
+
+from benchmarks.smtp_sink import SmtpSink
+from export.email_sender import EmailSender
+
+QUESTION_TEXT = "What is the capital of France?"
+ANSWER_TEXT = "The capital of France is Paris."
+
+def make_png():
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 32), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    """A self-signed certificate and key for 127.0.0.1"""
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is needed to create a test certificate")
+    directory = tmp_path_factory.mktemp("certificate")
+    certfile, keyfile = str(directory / "sink.crt"), str(directory / "sink.key")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=127.0.0.1", "-keyout", keyfile, "-out", certfile],
+                   check=True, capture_output=True)
+    return certfile, keyfile
+
+@pytest.fixture
+def start_sink(request):
+    """Start an SMTP sink with the given security mode"""
+    sinks = []
+
+    def start(security="none", **options):
+        if security != "none":
+            certfile, keyfile = request.getfixturevalue("certificate")
+            options.update(certfile=certfile, keyfile=keyfile)
+        sink = SmtpSink(security=security, **options).start()
+        sinks.append(sink)
+        return sink
+
+    yield start
+    for sink in sinks:
+        sink.stop()
+
+@pytest.mark.parametrize("security", ["none", "starttls", "ssl"])
+def test_sends_over_each_security_mode(start_sink, security):
+    sink = start_sink(security)
+
+    with EmailSender("tester@example.com", "unused", **sink.sender_options()) as sender:
+        success, message = sender.send_quiz_answer("quiz@example.com", QUESTION_TEXT, ANSWER_TEXT,
+                                                   subject="Quiz")
+
+    assert success, message
+    received = sink.last_message()
+    assert received["To"] == "quiz@example.com"
+    assert received["Subject"] == "Quiz"
+    assert ANSWER_TEXT in received.get_body(("html",)).get_content()
+
+def test_server_settings_come_from_the_environment(start_sink, monkeypatch):
+    sink = start_sink()
+    monkeypatch.setenv("EMAIL_SMTP_HOST", sink.host)
+    monkeypatch.setenv("EMAIL_SMTP_PORT", str(sink.port))
+    monkeypatch.setenv("EMAIL_SMTP_SECURITY", "NONE")
+
+    with EmailSender("tester@example.com", "unused") as sender:
+        success, message = sender.send_quiz_answer("quiz@example.com", QUESTION_TEXT, ANSWER_TEXT)
+
+    assert (sender.smtp_host, sender.smtp_port, sender.smtp_security) == (sink.host, sink.port, "none")
+    assert success, message
+    assert sink.message_count() == 1
+
+def test_the_port_defaults_to_the_security_mode(monkeypatch):
+    for name in ("EMAIL_SMTP_HOST", "EMAIL_SMTP_PORT", "EMAIL_SMTP_SECURITY"):
+        monkeypatch.delenv(name, raising=False)
+
+    assert EmailSender("tester@example.com", "unused").smtp_port == 465
+    assert EmailSender("tester@example.com", "unused", smtp_security="starttls").smtp_port == 587
+
+def test_unknown_security_mode_is_rejected():
+    with pytest.raises(ValueError):
+        EmailSender("tester@example.com", "unused", smtp_security="tls1")
+
+def test_unreachable_server_fails_every_recipient():
+    # A free port with nothing listening on it
+    options = {"smtp_host": "127.0.0.1", "smtp_port": SmtpSink._free_port(), "smtp_security": "none"}
+
+    with EmailSender("tester@example.com", "unused", **options) as sender:
+        results = sender.send_many(["a@example.com", "b@example.com"], QUESTION_TEXT, ANSWER_TEXT)
+
+    assert [success for _, success, _ in results] == [False, False]
+    assert all("Connection error" in message for _, _, message in results)
+
+def test_recipients_share_one_session(start_sink):
+    sink = start_sink()
+    recipients = ["a@example.com", "b@example.com", "c@example.com"]
+
+    with EmailSender("tester@example.com", "unused", **sink.sender_options()) as sender:
+        results = sender.send_many(recipients, QUESTION_TEXT, ANSWER_TEXT, image_data=make_png())
+        sender.send_quiz_answer("d@example.com", QUESTION_TEXT, ANSWER_TEXT)
+
+    assert all(success for _, success, _ in results)
+    assert sink.connections == 1 and sender.connections == 1
+    messages = [sink.parse(content) for _, _, _, content in sink.messages]
+    assert [message["To"] for message in messages] == recipients + ["d@example.com"]
+    assert all(message.get_payload()[1].get_filename() == "screenshot.png" for message in messages[:3])
+
+def test_idle_session_is_closed_and_reopened(start_sink):
+    sink = start_sink()
+
+    with EmailSender("tester@example.com", "unused", idle_timeout=0.2, **sink.sender_options()) as sender:
+        sender.send_quiz_answer("a@example.com", QUESTION_TEXT, ANSWER_TEXT)
+        time.sleep(0.4)
+        assert sender.server is None
+
+        sender.send_quiz_answer("b@example.com", QUESTION_TEXT, ANSWER_TEXT)
+
+    assert sink.message_count() == 2
+    assert sink.connections == 2
+
+def test_dropped_session_is_reopened_once(start_sink):
+    sink = start_sink()
+
+    with EmailSender("tester@example.com", "unused", **sink.sender_options()) as sender:
+        sender.send_quiz_answer("a@example.com", QUESTION_TEXT, ANSWER_TEXT)
+        # The connection goes away without the sender noticing
+        sender.server.close()
+
+        success, message = sender.send_quiz_answer("b@example.com", QUESTION_TEXT, ANSWER_TEXT)
+
+    assert success, message
+    assert sink.message_count() == 2
+    assert sender.connections == 2
@@ -0,0 +1,205 @@
+"""
+JSONL, directory and webhook sinks and the export manager
+"""
+import json
+import os
+import socket
+import pytest
+from benchmarks.webhook_sink import WebhookSink
+from export.exporter import (
+    DirectoryExporter, ExportManager, ExportRecord, Exporter, JsonlExporter, WebhookExporter, create_exporters
+)
+
+PNG_DATA = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+def record(record_id="run1", image_data=None):
+    return ExportRecord("What is 2 + 2?", "4", question_type="short_answer", image_data=image_data,
+                        record_id=record_id, metadata={"ocr_ms": 42})
+
+@pytest.fixture
+def webhook_sink():
+    sink = WebhookSink().start()
+    yield sink
+    sink.stop()
+
+def test_jsonl_lines_are_readable_as_soon_as_they_are_written(tmp_path):
+    path = tmp_path / "results.jsonl"
+    exporter = JsonlExporter(str(path))
+    try:
+        assert exporter.export(record("run1"))[0]
+        assert exporter.export(record("run2"))[0]
+
+        # Still open, but every line is already flushed
+        lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    finally:
+        exporter.close()
+
+    assert [line["record_id"] for line in lines] == ["run1", "run2"]
+    assert lines[0]["answer_text"] == "4"
+    assert lines[0]["metadata"] == {"ocr_ms": 42}
+
+def test_jsonl_appends_to_an_existing_log(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    for record_id in ("run1", "run2"):
+        exporter = JsonlExporter(path)
+        exporter.export(record(record_id))
+        exporter.close()
+
+    with open(path, encoding="utf-8") as file:
+        assert len(file.readlines()) == 2
+
+def test_directory_writes_the_record_and_its_screenshot(tmp_path):
+    exporter = DirectoryExporter(str(tmp_path / "exports"))
+
+    assert exporter.export(record(image_data=PNG_DATA))[0]
+
+    assert sorted(os.listdir(exporter.path)) == ["run1.json", "run1.png"]
+    with open(os.path.join(exporter.path, "run1.json"), encoding="utf-8") as file:
+        data = json.load(file)
+    assert data["image_file"] == "run1.png"
+    assert data["image_bytes"] == len(PNG_DATA)
+    with open(os.path.join(exporter.path, "run1.png"), "rb") as file:
+        assert file.read() == PNG_DATA
+
+def test_directory_record_without_a_screenshot(tmp_path):
+    exporter = DirectoryExporter(str(tmp_path / "exports"))
+
+    exporter.export(record())
+
+    assert os.listdir(exporter.path) == ["run1.json"]
+
+@pytest.mark.parametrize("image_data, extension", [
+    (PNG_DATA, "png"),
+    (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "webp"),
+    (b"\xff\xd8\xff\xe0", "jpg"),
+    (None, None),
+])
+def test_image_extension_follows_the_encoding(image_data, extension):
+    assert record(image_data=image_data).image_extension == extension
+
+def test_default_paths_are_in_the_data_directory(data_dir, monkeypatch):
+    monkeypatch.delenv("EXPORT_JSONL_PATH", raising=False)
+    monkeypatch.delenv("EXPORT_DIRECTORY", raising=False)
+
+    jsonl = JsonlExporter()
+    jsonl.close()
+    directory = DirectoryExporter()
+
+    assert jsonl.path == str(data_dir / "results.jsonl")
+    assert directory.path == str(data_dir / "exports")
+    assert os.path.isdir(directory.path)
+
+def test_paths_come_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("EXPORT_JSONL_PATH", str(tmp_path / "log.jsonl"))
+    monkeypatch.setenv("EXPORT_DIRECTORY", str(tmp_path / "drop"))
+
+    jsonl = JsonlExporter()
+    jsonl.close()
+
+    assert jsonl.path == str(tmp_path / "log.jsonl")
+    assert DirectoryExporter().path == str(tmp_path / "drop")
+
+def test_webhook_posts_reuse_one_connection(webhook_sink):
+    exporter = WebhookExporter(webhook_sink.url, token="secret")
+    try:
+        for record_id in ("run1", "run2", "run3"):
+            assert exporter.export(record(record_id))[0]
+    finally:
+        exporter.close()
+
+    assert webhook_sink.post_count() == 3
+    assert webhook_sink.connections == 1
+    _, path, payload, authorization = webhook_sink.posts[0]
+    assert path == "/results"
+    assert payload["record_id"] == "run1"
+    assert authorization == "Bearer secret"
+
+def test_webhook_reconnects_after_the_server_drops_the_connection(webhook_sink):
+    exporter = WebhookExporter(webhook_sink.url)
+    try:
+        exporter.export(record("run1"))
+        # Cut the kept-alive connection, as when the server drops it while idle
+        exporter.connection.sock.shutdown(socket.SHUT_RDWR)
+
+        assert exporter.export(record("run2"))[0]
+    finally:
+        exporter.close()
+
+    assert webhook_sink.post_count() == 2
+    assert webhook_sink.connections == 2
+
+def test_webhook_error_status_is_a_failure(webhook_sink):
+    webhook_sink.status = 500
+    exporter = WebhookExporter(webhook_sink.url)
+    try:
+        success, message = exporter.export(record())
+    finally:
+        exporter.close()
+
+    assert not success
+    assert "500" in message
+
+@pytest.mark.parametrize("url", ["ftp://example.com/results", "not a url"])
+def test_webhook_needs_an_http_url(url):
+    with pytest.raises(ValueError):
+        WebhookExporter(url)
+
+class FailingExporter(Exporter):
+    name = "failing"
+
+    def __init__(self):
+        self.closed = False
+
+    def export(self, record):
+        raise OSError("disk full")
+
+    def close(self):
+        self.closed = True
+
+def test_manager_reports_each_sink_and_survives_failures(tmp_path, webhook_sink):
+    failing = FailingExporter()
+    manager = ExportManager([JsonlExporter(str(tmp_path / "results.jsonl")), failing,
+                             WebhookExporter(webhook_sink.url)])
+    try:
+        results = manager.export(record())
+    finally:
+        manager.close()
+
+    assert manager.names() == ["jsonl", "failing", "webhook"]
+    assert [(name, success) for name, success, _ in results] == [
+        ("jsonl", True), ("failing", False), ("webhook", True)
+    ]
+    assert results[1][2].startswith("OSError: disk full")
+    assert webhook_sink.post_count() == 1
+    assert failing.closed
+
+def test_create_exporters_skips_unknown_and_unavailable_sinks(monkeypatch):
+    monkeypatch.delenv("EXPORT_WEBHOOK_URL", raising=False)
+
+    exporters = create_exporters("jsonl, directory, jsonl, webhook, email, carrier-pigeon")
+    try:
+        assert [exporter.name for exporter in exporters] == ["jsonl", "directory"]
+    finally:
+        for exporter in exporters:
+            exporter.close()
+
+def test_create_exporters_uses_the_given_email_exporter(monkeypatch):
+    email_exporter = FailingExporter()
+    monkeypatch.setenv("EXPORT_SINKS", "email")
+
+    assert create_exporters(email_exporter=email_exporter) == [email_exporter]
+
+def test_parquet_is_complete_after_close(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    from export.exporter import ParquetExporter
+
+    path = str(tmp_path / "results.parquet")
+    exporter = ParquetExporter(path, batch_size=2)
+    for record_id in ("run1", "run2", "run3"):
+        exporter.export(record(record_id))
+    exporter.close()
+
+    table = pyarrow.parquet.read_table(path)
+    assert table.column("record_id").to_pylist() == ["run1", "run2", "run3"]
+    assert json.loads(table.column("metadata")[0].as_py()) == {"ocr_ms": 42}
@@ -0,0 +1,108 @@
+"""
+Confidence parsing and escalation in the model router
+"""
+import pytest
+from ai.claude_client import StructuredAnswer
+from ai.model_router import ModelRouter, parse_confidence
+from ai.request_scheduler import RequestScheduler
+from benchmarks.mock_claude_server import ANSWER_TEXT, MockClaudeServer
+
+MODELS = ["mock-fast", "mock-large"]
+QUESTION_TEXT = "Which of the following data structures gives O(1) average lookup by key?"
+
+@pytest.mark.parametrize("text, answer, confidence", [
+    ("B) A hash table\nConfidence: 85", "B) A hash table", 0.85),
+    ("B) A hash table\n\nConfidence: 85%\n", "B) A hash table", 0.85),
+    ("B) A hash table\n**Confidence:** 92", "B) A hash table", 0.92),
+    ("B) A hash table\n_confidence: 70._", "B) A hash table", 0.70),
+    ("B) A hash table\nConfidence: 0.6", "B) A hash table", 0.6),
+    ("B) A hash table\nConfidence: 140", "B) A hash table", 1.0),
+])
+def test_confidence_line_is_split_off(text, answer, confidence):
+    parsed_answer, parsed_confidence = parse_confidence(text)
+
+    assert parsed_answer == answer
+    assert parsed_confidence == pytest.approx(confidence)
+
+@pytest.mark.parametrize("text", [
+    "B) A hash table",
+    "Confidence: 90 is what the documentation claims.\nB) A hash table",
+    "B) A hash table\nConfidence: high",
+])
+def test_answers_without_a_final_confidence_line_are_unchanged(text):
+    assert parse_confidence(text) == (text, None)
+
+@pytest.fixture
+def make_router(monkeypatch):
+    server = MockClaudeServer(latency=0.0).start()
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", server.base_url)
+
+    def make(threshold):
+        scheduler = RequestScheduler(requests_per_minute=6000, tokens_per_minute=10000000)
+        router = ModelRouter(models=MODELS, threshold=threshold, api_key="mock", scheduler=scheduler)
+        router.server = server
+        return router
+
+    yield make
+    server.stop()
+
+def test_confident_fast_answer_is_kept(make_router):
+    # The mock reports 90% confidence
+    router = make_router(0.8)
+
+    answer = router.get_answer(QUESTION_TEXT)
+
+    assert (answer.tier, answer.model, answer.escalations) == (0, "mock-fast", [])
+    assert answer.confidence == pytest.approx(0.9)
+    assert answer.text == ANSWER_TEXT
+    assert router.server.requests == 1
+
+def test_unsure_fast_answer_is_escalated(make_router):
+    router = make_router(95)
+
+    answer = router.get_answer(QUESTION_TEXT)
+
+    assert (answer.tier, answer.model, answer.escalations) == (1, "mock-large", ["mock-fast"])
+    assert answer.text == ANSWER_TEXT
+    assert router.stats() == {"mock-fast": 0, "mock-large": 1}
+
+def test_streamed_escalation_comes_from_the_last_tier(make_router):
+    router = make_router(0.95)
+
+    assert "".join(router.stream_question(QUESTION_TEXT)).strip() == ANSWER_TEXT
+    assert router.last_stream_metrics.output_chars > 0
+
+class FakeStructuredClient:
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.calls = 0
+
+    def get_structured_answer(self, question_text, question_type, max_tokens, timeout=None):
+        self.calls += 1
+        return StructuredAnswer(self.fields, self.model)
+
+def test_structured_answers_escalate_on_their_confidence_field(make_router):
+    router = make_router(0.8)
+    router.structured_clients = [
+        FakeStructuredClient("mock-fast", {"answer": "Lyon", "confidence": 0.4, "rationale": "Guess."}),
+        FakeStructuredClient("mock-large", {"answer": "Paris", "confidence": 0.97, "rationale": "The capital."}),
+    ]
+
+    answer = router.get_structured_answer("What is the capital of France?", "short_answer")
+
+    assert (answer.tier, answer.escalations) == (1, ["mock-fast"])
+    assert answer.short_answer == "Paris"
+    assert answer.rationale == "The capital."
+    assert answer.letter is None
+
+def test_last_tier_answer_is_kept_whatever_its_confidence(make_router):
+    router = make_router(0.8)
+    router.structured_clients = [
+        FakeStructuredClient("mock-fast", {"letter": "A", "confidence": 0.2}),
+        FakeStructuredClient("mock-large", {"letter": "C", "confidence": 0.3}),
+    ]
+
+    answer = router.get_structured_answer(QUESTION_TEXT)
+
+    assert (answer.tier, answer.letter, answer.confidence) == (1, "C", pytest.approx(0.3))
@@ -0,0 +1,138 @@
+"""
+OCRCache keys and its memory and SQLite tiers
+"""
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from ocr import ocr_cache as ocr_cache_module
+from ocr.ocr_cache import OCRCache
+from ocr.ocr_engine import OCREngine, OCRResult
+from ocr.text_extractor import TextExtractor
+
+def result(text):
+    return OCRResult(text, [91.0, 87.5])
+
+@pytest.fixture
+def disk_path(tmp_path):
+    return str(tmp_path / "ocr_cache.sqlite3")
+
+@pytest.fixture
+def make_cache():
+    caches = []
+
+    def make(**options):
+        cache = OCRCache(**options)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+def test_keys_follow_the_pixels_shape_and_engine():
+    image = np.zeros((40, 60), dtype=np.uint8)
+    key = OCRCache.make_key(image, "tesserocr:eng")
+
+    assert key == OCRCache.make_key(image.copy(), "tesserocr:eng")
+    assert key != OCRCache.make_key(image, "tesserocr:deu")
+    assert key != OCRCache.make_key(image.reshape(60, 40), "tesserocr:eng")
+    changed = image.copy()
+    changed[20, 30] = 255
+    assert key != OCRCache.make_key(changed, "tesserocr:eng")
+
+def test_views_hash_like_their_contents():
+    image = (np.arange(100 * 100) % 256).astype(np.uint8).reshape(100, 100)
+    view = image[10:50, 20:80]
+
+    assert not view.flags.c_contiguous
+    assert OCRCache.make_key(view) == OCRCache.make_key(np.ascontiguousarray(view))
+
+def test_memory_only_without_a_path(make_cache, monkeypatch):
+    monkeypatch.delenv("OCR_CACHE_PATH", raising=False)
+    cache = make_cache()
+    cache.put("key", result("Paris"))
+
+    assert cache.conn is None
+    assert cache.get("key").text == "Paris"
+    assert cache.get("other") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+def test_memory_tier_evicts_the_least_recently_used(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.put("first", result("1"))
+    cache.put("second", result("2"))
+    # Reading the first entry makes the second the least recently used
+    cache.get("first")
+    cache.put("third", result("3"))
+
+    assert list(cache.entries) == ["first", "third"]
+    assert cache.get("second") is None
+
+def test_disk_tier_survives_restarts_and_is_promoted(make_cache, disk_path):
+    make_cache(disk_path=disk_path).put("key", result("Paris"))
+
+    cache = make_cache(disk_path=disk_path)
+    assert "key" not in cache.entries
+
+    cached = cache.get("key")
+    assert (cached.text, cached.confidences) == ("Paris", [91.0, 87.5])
+    assert "key" in cache.entries
+    assert cache.hits == 1
+
+def test_disk_tier_keeps_entries_evicted_from_memory(make_cache, disk_path):
+    cache = make_cache(max_entries=1, disk_path=disk_path)
+    cache.put("first", result("1"))
+    cache.put("second", result("2"))
+
+    assert list(cache.entries) == ["second"]
+    assert cache.get("first").text == "1"
+
+def test_disk_tier_evicts_the_least_recently_used(make_cache, disk_path, monkeypatch):
+    clock = SimpleNamespace(now=1000000.0)
+    monkeypatch.setattr(ocr_cache_module, "time", SimpleNamespace(time=lambda: clock.now))
+
+    cache = make_cache(max_entries=1, disk_path=disk_path, max_disk_entries=2)
+    cache.put("first", result("1"))
+    clock.now += 1
+    cache.put("second", result("2"))
+    clock.now += 1
+    # A disk hit refreshes the entry, leaving the second one the oldest
+    cache.get("first")
+    clock.now += 1
+    cache.put("third", result("3"))
+
+    restarted = make_cache(disk_path=disk_path)
+    assert restarted.get("second") is None
+    assert restarted.get("first").text == "1"
+    assert restarted.get("third").text == "3"
+
+def test_clear_empties_both_tiers(make_cache, disk_path):
+    cache = make_cache(disk_path=disk_path)
+    cache.put("key", result("Paris"))
+    cache.clear()
+
+    assert len(cache.entries) == 0
+    assert make_cache(disk_path=disk_path).get("key") is None
+
+class CountingEngine(OCREngine):
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def recognize(self, image):
+        self.calls += 1
+        return "What is the capital of France?"
+
+def test_extractor_skips_recognition_of_the_same_image():
+    engine = CountingEngine()
+    text_extractor = TextExtractor(engine=engine, detect_region=False, workers=1, ocr_cache=OCRCache())
+    image = np.full((200, 400, 3), 255, dtype=np.uint8)
+    image[80:120, 40:360] = 0
+
+    first = text_extractor.extract_text(image)
+    second = text_extractor.extract_text(image.copy())
+
+    assert first == second
+    assert engine.calls == 1
+    assert text_extractor.ocr_cache.hits == 1
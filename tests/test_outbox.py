@@ -0,0 +1,167 @@
+"""
+Outbox deduplication, retry backoff and background delivery
+"""
+from types import SimpleNamespace
+import pytest
+from export import outbox as outbox_module
+from export.exporter import ExportRecord
+from export.outbox import Outbox
+
+class Clock:
+    """Stands in for time.time so retries become due when the test says so"""
+
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+class FakeSender:
+    """Records send_many calls; recipients in `failing` fail"""
+
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+
+    def send_many(self, recipients, question_text, answer_text, subject="Quiz Answer from Claude", image_data=None):
+        self.calls.append(list(recipients))
+        return [(recipient, recipient not in self.failing,
+                 "SMTP error: mailbox busy" if recipient in self.failing else "Email sent")
+                for recipient in recipients]
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(outbox_module, "time", SimpleNamespace(time=clock))
+    return clock
+
+@pytest.fixture
+def make_outbox(tmp_path):
+    outboxes = []
+
+    def make(sender, **options):
+        outbox = Outbox(sender, db_path=str(tmp_path / "outbox.sqlite3"), **options)
+        outboxes.append(outbox)
+        return outbox
+
+    yield make
+    for outbox in outboxes:
+        outbox.close()
+
+def record(record_id="run1", recipients=("a@example.com", "b@example.com")):
+    return ExportRecord("What is 2 + 2?", "4", recipients=list(recipients), record_id=record_id)
+
+def test_exporting_the_same_run_twice_queues_it_once(make_outbox, clock):
+    sender = FakeSender()
+    outbox = make_outbox(sender)
+
+    assert outbox.export(record())[0]
+    assert outbox.export(record())[0]
+    outbox.process_due()
+
+    assert sender.calls == [["a@example.com", "b@example.com"]]
+    assert outbox.counts() == {"pending": 0, "sent": 2, "failed": 0}
+
+def test_different_runs_with_the_same_answer_are_both_sent(make_outbox, clock):
+    sender = FakeSender()
+    outbox = make_outbox(sender)
+
+    outbox.export(record("run1"))
+    outbox.export(record("run2"))
+    outbox.process_due()
+
+    assert len(sender.calls) == 2
+
+def test_enqueue_without_an_id_always_sends(make_outbox, clock):
+    sender = FakeSender()
+    outbox = make_outbox(sender)
+
+    first = outbox.enqueue(["a@example.com"], "What is 2 + 2?", "4")
+    second = outbox.enqueue(["a@example.com"], "What is 2 + 2?", "4")
+    outbox.process_due()
+
+    assert first != second
+    assert len(sender.calls) == 2
+
+def test_export_needs_recipients(make_outbox):
+    success, _ = make_outbox(FakeSender()).export(record(recipients=()))
+
+    assert not success
+
+def test_failed_recipients_are_retried_with_backoff(make_outbox, clock):
+    sender = FakeSender()
+    sender.failing = {"b@example.com"}
+    outbox = make_outbox(sender)
+    message_id = outbox.enqueue(["a@example.com", "b@example.com"], "What is 2 + 2?", "4")
+
+    delay = outbox.process_due()
+    status = outbox.status(message_id)
+    assert status["a@example.com"]["status"] == "sent"
+    assert status["b@example.com"] == {"status": "pending", "attempts": 1, "last_error": "SMTP error: mailbox busy"}
+    # BASE_DELAY with jitter between half and all of it
+    assert Outbox.BASE_DELAY * 0.5 <= delay <= Outbox.BASE_DELAY
+
+    # Nothing is sent before the retry is due
+    clock.advance(delay / 2)
+    outbox.process_due()
+    assert len(sender.calls) == 1
+
+    clock.advance(delay)
+    delay = outbox.process_due()
+    assert sender.calls[1] == ["b@example.com"]
+    assert Outbox.BASE_DELAY <= delay <= Outbox.BASE_DELAY * 2
+
+def test_delivery_gives_up_after_max_attempts(make_outbox, clock):
+    sender = FakeSender()
+    sender.failing = {"a@example.com"}
+    outbox = make_outbox(sender, max_attempts=3)
+    message_id = outbox.enqueue(["a@example.com"], "What is 2 + 2?", "4")
+
+    for _ in range(5):
+        outbox.process_due()
+        clock.advance(Outbox.MAX_DELAY)
+
+    assert len(sender.calls) == 3
+    assert outbox.status(message_id)["a@example.com"]["status"] == "failed"
+
+    sender.failing.clear()
+    outbox.retry_failed()
+    outbox.process_due()
+    assert outbox.status(message_id)["a@example.com"] == {"status": "sent", "attempts": 1, "last_error": None}
+
+def test_backoff_doubles_up_to_the_cap():
+    outbox = SimpleNamespace(BASE_DELAY=5.0, MAX_DELAY=600.0)
+
+    assert [Outbox.retry_delay(outbox, attempt) for attempt in (1, 2, 3, 8, 20)] == [5.0, 10.0, 20.0, 600.0, 600.0]
+
+def test_queued_messages_survive_a_restart(make_outbox, clock):
+    sender = FakeSender()
+    make_outbox(sender).enqueue(["a@example.com"], "What is 2 + 2?", "4")
+
+    restarted = make_outbox(sender)
+    restarted.process_due()
+
+    assert sender.calls == [["a@example.com"]]
+
+def test_sender_thread_delivers_to_the_smtp_sink(make_outbox):
+    pytest.importorskip("aiosmtpd")
+    from benchmarks.smtp_sink import SmtpSink
+    from export.email_sender import EmailSender
+
+    sink = SmtpSink().start()
+    try:
+        with EmailSender("tester@example.com", "unused", **sink.sender_options()) as sender:
+            outbox = make_outbox(sender).start()
+            message_id = outbox.enqueue(["a@example.com", "b@example.com"], "What is 2 + 2?", "4", subject="Quiz")
+
+            assert sink.wait_for(2, timeout=10)
+            outbox.stop()
+    finally:
+        sink.stop()
+
+    assert {delivery["status"] for delivery in outbox.status(message_id).values()} == {"sent"}
+    assert sink.connections == 1
+    assert sink.last_message()["Subject"] == "Quiz"
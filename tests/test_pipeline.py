@@ -0,0 +1,114 @@
+"""
+Pipeline runs with fake panels: the export stage for unchanged screens
+"""
+import numpy as np
+import pytest
+from PyQt6.QtCore import QCoreApplication, QObject, pyqtSignal
+from pipeline.pipeline import Pipeline
+
+class FakeCapturePanel(QObject):
+    capture_completed = pyqtSignal(bool)
+
+    def __init__(self):
+        super().__init__()
+        self.image = np.full((200, 300), 255, dtype=np.uint8)
+
+    def capture_screen(self, emit_signal=False):
+        self.capture_completed.emit(True)
+        return True
+
+    def get_captured_image(self):
+        return self.image
+
+    def prepare_attachment(self, region):
+        return None
+
+class FakeQuestionPanel(QObject):
+    text_extracted = pyqtSignal(bool)
+
+    def extract_text(self, image, emit_signal=False):
+        self.text_extracted.emit(True)
+        return True
+
+    def classify_question(self):
+        return "short_answer"
+
+    def get_question_text(self):
+        return "What is the capital of France?"
+
+    def get_question_region(self):
+        return None
+
+    def set_question(self, question_text, question_type):
+        pass
+
+class FakeResponsePanel(QObject):
+    claude_completed = pyqtSignal(bool)
+    export_completed = pyqtSignal(bool)
+
+    def __init__(self):
+        super().__init__()
+        self.answers = 0
+        self.exports = []
+        self.export_succeeds = True
+
+    def send_to_claude(self, question_text, question_type, emit_signal=False):
+        self.answers += 1
+        self.claude_completed.emit(True)
+        return True
+
+    def get_answer_text(self):
+        return "Paris"
+
+    def set_response_text(self, text):
+        pass
+
+    def export_results(self, run_id=None, emit_signal=False, **fields):
+        self.exports.append(run_id)
+        self.export_completed.emit(self.export_succeeds)
+        return True
+
+@pytest.fixture
+def pipeline():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    pipeline = Pipeline(FakeCapturePanel(), FakeQuestionPanel(), FakeResponsePanel())
+
+    def run():
+        pipeline.trigger()
+        while pipeline.is_running():
+            app.processEvents()
+        return pipeline.last_run
+
+    pipeline.run = run
+    return pipeline
+
+def test_unchanged_screen_is_not_exported_again(pipeline):
+    first = pipeline.run()
+    second = pipeline.run()
+
+    assert first.success and second.success
+    assert second.reused_run_id == first.run_id
+    assert "export" not in second.stage_timings
+    assert pipeline.response_panel.answers == 1
+    assert pipeline.response_panel.exports == [first.run_id]
+
+def test_failed_export_is_retried_by_the_next_unchanged_run(pipeline):
+    pipeline.response_panel.export_succeeds = False
+    first = pipeline.run()
+    pipeline.response_panel.export_succeeds = True
+    second = pipeline.run()
+    third = pipeline.run()
+
+    assert not first.success and second.success and third.success
+    assert pipeline.response_panel.answers == 1
+    assert pipeline.response_panel.exports == [first.run_id, second.run_id]
+
+def test_changed_screen_is_answered_and_exported(pipeline):
+    first = pipeline.run()
+    pipeline.capture_panel.image = pipeline.capture_panel.image.copy()
+    pipeline.capture_panel.image[50:150, 50:250] = 0
+    second = pipeline.run()
+
+    assert second.reused_run_id is None
+    assert pipeline.response_panel.answers == 2
+    assert pipeline.response_panel.exports == [first.run_id, second.run_id]
@@ -0,0 +1,89 @@
+"""
+Preprocessor profiles, stage checks and buffer ownership
+"""
+import cv2
+import numpy as np
+import pytest
+from ocr.preprocessing import PROFILES, Preprocessor
+
+def text_image(dark_mode=False, color=True):
+    """A screen with a line of text, in BGR or grayscale"""
+    image = np.full((120, 480), 235, dtype=np.uint8)
+    cv2.putText(image, "What is 2 + 2?", (20, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 30, 3)
+    if dark_mode:
+        image = 255 - image
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if color else image
+
+def ink_fraction(binary):
+    return float((binary == 0).mean())
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_every_profile_runs_and_leaves_the_input_alone(profile):
+    image = text_image()
+    original = image.copy()
+    preprocessor = Preprocessor(profile)
+
+    result = preprocessor.run(image)
+
+    assert np.array_equal(image, original)
+    assert result.ndim == 2 and result.dtype == np.uint8
+    assert [name for name, _ in preprocessor.last_timings] == [name for name, _ in PROFILES[profile]]
+
+@pytest.mark.parametrize("profile", ["default", "dark_mode", "denoise", "adaptive", "small_text"])
+def test_binarizing_profiles_give_dark_text_on_white(profile):
+    result = Preprocessor(profile).run(text_image())
+
+    assert set(np.unique(result)) <= {0, 255}
+    # Text is the minority of the pixels, and it is black
+    assert 0.0 < ink_fraction(result) < 0.2
+
+def test_dark_mode_flips_light_text_on_dark():
+    image = text_image(dark_mode=True)
+
+    default = Preprocessor("default").run(image)
+    dark_mode = Preprocessor("dark_mode").run(image)
+
+    assert ink_fraction(default) > 0.8
+    assert 0.0 < ink_fraction(dark_mode) < 0.2
+
+def test_small_text_doubles_the_size():
+    assert Preprocessor("small_text").run(text_image()).shape == (240, 960)
+
+def test_grayscale_profile_only_converts():
+    image = text_image()
+
+    assert np.array_equal(Preprocessor("grayscale").run(image), cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+
+def test_rgb_and_bgr_orders_give_the_same_gray():
+    rgb = np.zeros((10, 10, 3), dtype=np.uint8)
+    rgb[..., 0] = 200  # Red
+    bgr = rgb[..., ::-1].copy()
+    preprocessor = Preprocessor("grayscale")
+
+    assert np.array_equal(preprocessor.run(rgb, color_order="RGB"), preprocessor.run(bgr, color_order="BGR"))
+
+def test_grayscale_input_is_not_modified_by_in_place_stages():
+    image = text_image(color=False)
+    original = image.copy()
+
+    Preprocessor([("otsu", {}), ("invert", {})]).run(image)
+
+    assert np.array_equal(image, original)
+
+def test_custom_stage_lists_are_accepted():
+    preprocessor = Preprocessor([("grayscale", {}), ("gaussian", {"ksize": 5}), ("otsu", {})])
+
+    assert preprocessor.profile_name == "custom"
+    assert 0.0 < ink_fraction(preprocessor.run(text_image())) < 0.2
+
+def test_profile_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv("OCR_PREPROCESS_PROFILE", "denoise")
+
+    assert Preprocessor().profile_name == "denoise"
+    assert Preprocessor("adaptive").profile_name == "adaptive"
+
+def test_unknown_profiles_and_stages_are_rejected():
+    with pytest.raises(ValueError):
+        Preprocessor("sharpen")
+    with pytest.raises(ValueError):
+        Preprocessor([("grayscale", {}), ("sharpen", {})])
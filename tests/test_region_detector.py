@@ -0,0 +1,129 @@
+"""
+RegionDetector block finding, merging and reuse on synthetic screens
+"""
+import cv2
+import numpy as np
+import pytest
+from ocr.region_detector import RegionDetector
+
+HEIGHT, WIDTH = 1080, 1920
+QUESTION = (420, 300)
+QUESTION_LINES = ["Which of the following data structures gives",
+                  "constant average lookup time by key?"]
+CHOICES = ["A) A sorted array", "B) A hash table", "C) A balanced search tree", "D) A linked list"]
+CHOICES_TOP = 440  # A blank line and a half below the question, so it is a separate block
+
+def draw_lines(image, lines, x, y, line_height=48, scale=1.0):
+    """Draw text lines; returns (x, y, width, height) of the ink they cover"""
+    for index, line in enumerate(lines):
+        cv2.putText(image, line, (x, y + index * line_height), cv2.FONT_HERSHEY_SIMPLEX, scale, 0, 2, cv2.LINE_AA)
+    width = max(cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, scale, 2)[0][0] for line in lines)
+    top = y - cv2.getTextSize(lines[0], cv2.FONT_HERSHEY_SIMPLEX, scale, 2)[0][1]
+    return (x, top, width, (len(lines) - 1) * line_height + (y - top) + 10)
+
+def quiz_screen(choices=CHOICES, sidebar=True):
+    """A quiz page with a toolbar, a sidebar menu, the question and the choices"""
+    image = np.full((HEIGHT, WIDTH), 255, dtype=np.uint8)
+    boxes = {}
+
+    # Browser chrome along the top edge
+    image[0:60] = 225
+    draw_lines(image, ["File  Edit  View  History  Bookmarks"], 20, 40, scale=0.7)
+
+    if sidebar:
+        boxes["sidebar"] = draw_lines(image, ["Home", "Courses", "Grades", "Settings"], 40, 300, scale=0.7)
+
+    boxes["question"] = draw_lines(image, QUESTION_LINES, *QUESTION)
+    boxes["choices"] = draw_lines(image, choices, QUESTION[0], CHOICES_TOP)
+    return image, boxes
+
+def contains(region, box):
+    x, y, width, height = region
+    box_x, box_y, box_width, box_height = box
+    return x <= box_x and y <= box_y and x + width >= box_x + box_width and y + height >= box_y + box_height
+
+def overlaps(region, box):
+    x, y, width, height = region
+    box_x, box_y, box_width, box_height = box
+    return x < box_x + box_width and box_x < x + width and y < box_y + box_height and box_y < y + height
+
+def test_question_and_choices_are_merged_into_one_block():
+    image, boxes = quiz_screen()
+
+    region = RegionDetector().detect(image)
+
+    assert contains(region, boxes["question"])
+    assert contains(region, boxes["choices"])
+
+def test_chrome_and_sidebar_are_left_out():
+    image, boxes = quiz_screen()
+
+    region = RegionDetector().detect(image)
+
+    assert not overlaps(region, boxes["sidebar"])
+    assert region[1] > 60
+
+def test_blank_screen_has_no_block():
+    assert RegionDetector().detect(np.full((HEIGHT, WIDTH), 255, dtype=np.uint8)) is None
+
+def test_padding_is_added_around_the_block():
+    image, boxes = quiz_screen(sidebar=False)
+
+    tight = RegionDetector(padding=0).detect(image)
+    padded = RegionDetector(padding=20).detect(image)
+
+    assert padded == (tight[0] - 20, tight[1] - 20, tight[2] + 40, tight[3] + 40)
+
+@pytest.fixture
+def counting_detector(monkeypatch):
+    """A detector that counts how often detection actually runs"""
+    detector = RegionDetector()
+    detect = detector.detect
+    detector.detections = 0
+
+    def counted_detect(gray):
+        detector.detections += 1
+        return detect(gray)
+
+    monkeypatch.setattr(detector, "detect", counted_detect)
+    return detector
+
+def test_same_layout_reuses_the_last_region(counting_detector):
+    image, _ = quiz_screen()
+
+    first = counting_detector.locate(image)
+    second = counting_detector.locate(image.copy())
+
+    assert first == second
+    assert counting_detector.detections == 1
+
+def test_change_inside_the_region_reuses_it(counting_detector):
+    image, _ = quiz_screen()
+    first = counting_detector.locate(image)
+
+    # A new answer is highlighted inside the block
+    highlighted = image.copy()
+    highlighted[CHOICES_TOP - 30:CHOICES_TOP + 10, QUESTION[0]:QUESTION[0] + 200] = 200
+
+    assert counting_detector.locate(highlighted) == first
+    assert counting_detector.detections == 1
+
+def test_change_outside_the_region_detects_again(counting_detector):
+    image, _ = quiz_screen()
+    first = counting_detector.locate(image)
+
+    # Two more choices make the block taller than the region
+    longer, boxes = quiz_screen(choices=CHOICES + ["E) A heap", "F) A stack"])
+    second = counting_detector.locate(longer)
+
+    assert counting_detector.detections == 2
+    assert second != first
+    assert contains(second, boxes["choices"])
+
+def test_reuse_can_be_turned_off(monkeypatch):
+    detector = RegionDetector(reuse_last=False)
+    image, _ = quiz_screen()
+    detector.locate(image)
+
+    monkeypatch.setattr(detector, "detect", lambda gray: None)
+    assert detector.locate(image) is None
@@ -0,0 +1,183 @@
+"""
+Token bucket refill, admission, rate limit headers and retry-after handling
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+import pytest
+from ai import request_scheduler as request_scheduler_module
+from ai.claude_client import ClaudeClient
+from ai.request_scheduler import RequestScheduler, TokenBucket, _retry_after_seconds
+from benchmarks.mock_claude_server import MockClaudeServer
+
+class Clock:
+    """Stands in for time.monotonic so refills can be stepped exactly"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(request_scheduler_module, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+def test_bucket_starts_full_and_refills_per_second(clock):
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60) == 0.0
+
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    assert bucket.wait_time(10) == pytest.approx(10.0)
+
+    clock.advance(4)
+    assert bucket.wait_time(4) == 0.0
+    assert bucket.wait_time(10) == pytest.approx(6.0)
+
+def test_bucket_never_holds_more_than_its_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.take(30)
+    clock.advance(3600)
+
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+
+def test_requests_larger_than_the_bucket_only_need_a_full_bucket(clock):
+    bucket = TokenBucket(600)
+    assert bucket.wait_time(5000) == 0.0
+
+    bucket.take(600)
+    assert bucket.wait_time(5000) == pytest.approx(60.0)
+
+def test_refunds_are_capped_at_the_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.take(10)
+    bucket.refund(50)
+
+    assert bucket.level == 60
+
+def test_pause_admits_nothing_for_the_given_time(clock):
+    bucket = TokenBucket(60)
+    bucket.pause(5)
+
+    assert bucket.wait_time(1) == pytest.approx(6.0)
+    clock.advance(5)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+
+def test_configure_adopts_the_server_limit_and_the_lower_level(clock):
+    bucket = TokenBucket(50)
+    bucket.take(10)
+
+    bucket.configure(1000, remaining=900)
+    assert (bucket.capacity, bucket.level) == (1000, 900)
+    assert bucket.refill_per_second == pytest.approx(1000 / 60)
+
+    # Requests in flight are not counted in the server's figure yet
+    bucket.configure(1000, remaining=2000)
+    assert bucket.level == 900
+
+def test_admission_takes_from_both_budgets(clock):
+    scheduler = RequestScheduler(requests_per_minute=2, tokens_per_minute=1000)
+
+    assert scheduler.admit(600) == 0.0
+    # Request budget is left, but tokens are not
+    assert scheduler.admit(600) == pytest.approx(12.0)
+    assert scheduler.admit(400) == 0.0
+    assert scheduler.admit(1) == pytest.approx(30.0)
+
+def test_unused_tokens_are_refunded(clock):
+    scheduler = RequestScheduler(requests_per_minute=10, tokens_per_minute=1000)
+    scheduler.admit(800)
+
+    scheduler.record_response(None, estimated_tokens=800, used_tokens=300)
+
+    assert scheduler.tokens.level == 700
+
+def test_rate_limit_headers_configure_the_budgets(clock):
+    scheduler = RequestScheduler(requests_per_minute=50, tokens_per_minute=40000)
+
+    scheduler.record_response({
+        "anthropic-ratelimit-requests-limit": "4000",
+        "anthropic-ratelimit-requests-remaining": "3999",
+        "anthropic-ratelimit-input-tokens-limit": "400000",
+        "anthropic-ratelimit-input-tokens-remaining": "nonsense",
+    })
+
+    assert scheduler.requests.capacity == 4000
+    assert scheduler.requests.level == 3999
+    assert scheduler.tokens.capacity == 400000
+    # A malformed remaining count keeps the level, raised by the larger limit
+    assert scheduler.tokens.level == 400000
+
+def test_missing_or_malformed_limits_are_ignored(clock):
+    scheduler = RequestScheduler(requests_per_minute=50, tokens_per_minute=40000)
+
+    scheduler.record_response({"anthropic-ratelimit-requests-limit": "many"})
+
+    assert scheduler.requests.capacity == 50
+    assert scheduler.tokens.capacity == 40000
+
+@pytest.mark.parametrize("value, seconds", [("7", 7.0), ("1.5", 1.5), ("-3", 0.0), ("soon", None), (None, None)])
+def test_retry_after_in_seconds(value, seconds):
+    headers = {} if value is None else {"retry-after": value}
+
+    assert _retry_after_seconds(headers) == seconds
+
+def test_retry_after_as_an_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert _retry_after_seconds({"retry-after": format_datetime(retry_at, usegmt=True)}) == pytest.approx(30, abs=1.5)
+    assert _retry_after_seconds({"retry-after": "Mon, 01 Jan 2001 00:00:00 GMT"}) == 0.0
+
+def test_backoff_is_jittered_and_capped():
+    scheduler = RequestScheduler()
+    scheduler.BASE_DELAY = 1.0
+    scheduler.MAX_DELAY = 5.0
+    error = RuntimeError("dropped")
+
+    for attempt, limit in ((1, 1.0), (2, 2.0), (3, 4.0), (8, 5.0)):
+        delays = [scheduler.retry_delay(error, attempt) for _ in range(200)]
+        assert all(0.0 <= delay <= limit for delay in delays)
+        assert max(delays) > limit / 2
+    assert scheduler.retries == 800
+
+def test_other_errors_are_not_retried():
+    scheduler = RequestScheduler(max_retries=3)
+
+    assert not scheduler.should_retry(ValueError("bad input"), 1)
+
+@pytest.mark.parametrize("value, max_retries", [("2", 2), ("0", 0)])
+def test_max_retries_comes_from_the_environment(monkeypatch, value, max_retries):
+    monkeypatch.setenv("CLAUDE_MAX_RETRIES", value)
+
+    assert RequestScheduler().max_retries == max_retries
+    assert RequestScheduler(max_retries=0).max_retries == 0
+
+def test_throttled_request_waits_for_retry_after(monkeypatch):
+    server = MockClaudeServer(latency=0.0, requests_per_minute=60, burst=1).start()
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", server.base_url)
+
+    # Another client with its own budget has just used up the server's bucket
+    ClaudeClient(api_key="mock", scheduler=RequestScheduler(6000, 10000000)).get_answer("First question")
+
+    scheduler = RequestScheduler(6000, 10000000, max_retries=2)
+    client = ClaudeClient(api_key="mock", scheduler=scheduler)
+    start_time = time.perf_counter()
+    try:
+        answer = client.get_answer("Second question")
+    finally:
+        server.stop()
+
+    assert answer.attempts == 2
+    assert scheduler.throttled == 1
+    # The mock's retry-after is one second
+    assert time.perf_counter() - start_time >= 0.9
+    # Later requests learn the server's limit from its headers
+    assert scheduler.requests.capacity == 60
@@ -0,0 +1,143 @@
+"""
+ClaudeClient.stream_question against the local mock of the Messages API
+
+Covers the deadline passing mid-stream, cancelling mid-stream (also while
+the stream is stalled), and retrying after 529 (overloaded) responses, where
+cancelling stops the backoff. Needs no API key or network.
+"""
+import threading
+import time
+import anthropic
+import pytest
+from ai.claude_client import ClaudeClient, RequestCancelled, RequestTimedOut
+from ai.request_scheduler import RequestScheduler
+from benchmarks.mock_claude_server import ANSWER_TEXT, MockClaudeServer
+
+QUESTION_TEXT = ("Which of the following data structures gives O(1) average lookup by key?\n"
+                 "A) A sorted array\nB) A hash table\nC) A balanced binary search tree\nD) A linked list")
+
+@pytest.fixture
+def start_server(monkeypatch):
+    """Start a mock server with the given options and point new clients at it"""
+    servers = []
+
+    def start(**options):
+        server = MockClaudeServer(latency=options.pop("latency", 0.0), **options).start()
+        servers.append(server)
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", server.base_url)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+def make_client(max_retries=3, timeout=10):
+    """A client with its own scheduler and short backoff, so tests do not share budgets or wait long"""
+    scheduler = RequestScheduler(requests_per_minute=6000, tokens_per_minute=10000000, max_retries=max_retries)
+    scheduler.BASE_DELAY = 0.05
+    return ClaudeClient(api_key="mock", timeout=timeout, scheduler=scheduler)
+
+def test_stream_returns_the_whole_answer(start_server):
+    start_server()
+    client = make_client()
+
+    text = "".join(client.stream_question(QUESTION_TEXT))
+
+    assert text.strip() == ANSWER_TEXT
+    assert client.last_stream_metrics.output_chars == len(text)
+    assert client.last_stream_metrics.first_token_latency is not None
+
+def test_deadline_stops_the_stream(start_server):
+    start_server(stream_delay=0.1)
+    client = make_client()
+    chunks = []
+
+    start_time = time.perf_counter()
+    with pytest.raises(RequestTimedOut):
+        for text in client.stream_question(QUESTION_TEXT, timeout=0.5):
+            chunks.append(text)
+    elapsed = time.perf_counter() - start_time
+
+    # Part of the answer arrived before the deadline, and the rest was not waited for
+    assert chunks
+    assert len("".join(chunks)) < len(ANSWER_TEXT)
+    assert elapsed < 1.5
+
+def test_cancel_stops_the_stream(start_server):
+    start_server(stream_delay=0.05)
+    client = make_client()
+    cancel_event = threading.Event()
+    chunks = []
+
+    with pytest.raises(RequestCancelled):
+        for text in client.stream_question(QUESTION_TEXT, cancel_event=cancel_event):
+            chunks.append(text)
+            if len(chunks) == 3:
+                cancel_event.set()
+
+    # Nothing is yielded after the cancel
+    assert len(chunks) == 3
+
+def test_deadline_stops_a_stalled_stream(start_server):
+    start_server(stall_after=3, stall_seconds=5)
+    client = make_client()
+    chunks = []
+
+    start_time = time.perf_counter()
+    with pytest.raises(RequestTimedOut):
+        for text in client.stream_question(QUESTION_TEXT, timeout=0.5):
+            chunks.append(text)
+    elapsed = time.perf_counter() - start_time
+
+    # The watchdog closes the connection at the deadline instead of waiting for another read timeout
+    assert len(chunks) == 3
+    assert elapsed < 0.8
+
+def test_cancel_stops_a_stalled_stream(start_server):
+    start_server(stall_after=3, stall_seconds=5)
+    client = make_client()
+    cancel_event = threading.Event()
+    chunks = []
+
+    start_time = time.perf_counter()
+    with pytest.raises(RequestCancelled):
+        for text in client.stream_question(QUESTION_TEXT, cancel_event=cancel_event):
+            chunks.append(text)
+            if len(chunks) == 3:
+                threading.Timer(0.2, cancel_event.set).start()
+    elapsed = time.perf_counter() - start_time
+
+    assert len(chunks) == 3
+    assert elapsed < 0.6
+
+def test_cancel_interrupts_the_retry_backoff(start_server):
+    start_server(overloaded=5)
+    client = make_client(max_retries=5, timeout=60)
+    client.scheduler.BASE_DELAY = 5.0
+    cancel_event = threading.Event()
+    threading.Timer(0.3, cancel_event.set).start()
+
+    start_time = time.perf_counter()
+    with pytest.raises(RequestCancelled):
+        client.get_answer(QUESTION_TEXT, cancel_event=cancel_event)
+    assert time.perf_counter() - start_time < 1.0
+
+def test_overloaded_responses_are_retried(start_server):
+    server = start_server(overloaded=2)
+    client = make_client(max_retries=3)
+
+    text = "".join(client.stream_question(QUESTION_TEXT))
+
+    assert text.strip() == ANSWER_TEXT
+    assert server.overloaded_responses == 2
+    assert server.requests == 3
+
+def test_overloaded_error_is_raised_once_retries_run_out(start_server):
+    server = start_server(overloaded=5)
+    client = make_client(max_retries=1)
+
+    with pytest.raises(anthropic.APIStatusError) as error:
+        list(client.stream_question(QUESTION_TEXT))
+
+    assert error.value.status_code == 529
+    assert server.requests == 2
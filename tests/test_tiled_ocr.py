@@ -0,0 +1,118 @@
+"""
+Band splitting at line gaps and merging of band text for tiled OCR
+"""
+import numpy as np
+import pytest
+from ocr.ocr_engine import OCRResult
+from ocr.tiled_ocr import TiledOCR, find_line_gaps, merge_band_text, split_into_bands
+
+def page(line_count=20, line_height=20, spacing=40, width=600, margin=30, dark_mode=False):
+    """A binary page of text lines drawn as ink bars; returns the image and the (top, bottom) of each line"""
+    height = 2 * margin + line_count * spacing
+    image = np.full((height, width), 255, dtype=np.uint8)
+    lines = []
+    for index in range(line_count):
+        top = margin + index * spacing
+        # Words with spaces between them, as on a real line
+        for left in range(20, width - 60, 80):
+            image[top:top + line_height, left:left + 60] = 0
+        lines.append((top, top + line_height))
+    return (255 - image if dark_mode else image), lines
+
+def cuts_through_a_line(bands, lines):
+    """Whether a band boundary falls inside a text line"""
+    for top, bottom, _ in bands:
+        for line_top, line_bottom in lines:
+            if line_top < top < line_bottom or line_top < bottom < line_bottom:
+                return True
+    return False
+
+def test_finds_the_gaps_between_lines():
+    image, lines = page(line_count=3)
+
+    gaps = find_line_gaps(image)
+
+    assert gaps == [(0, lines[0][0]), (lines[0][1], lines[1][0]), (lines[1][1], lines[2][0]),
+                    (lines[2][1], image.shape[0])]
+
+@pytest.mark.parametrize("dark_mode", [False, True])
+def test_gaps_do_not_depend_on_polarity(dark_mode):
+    image, _ = page(line_count=3, dark_mode=dark_mode)
+
+    assert len(find_line_gaps(image)) == 4
+
+def test_one_band_covers_the_image():
+    image, _ = page()
+
+    assert split_into_bands(image, 1) == [(0, image.shape[0], False)]
+
+@pytest.mark.parametrize("band_count", [2, 3, 4, 7])
+def test_bands_are_cut_in_line_gaps(band_count):
+    image, lines = page()
+
+    bands = split_into_bands(image, band_count)
+
+    assert len(bands) == band_count
+    assert bands[0][0] == 0 and bands[-1][1] == image.shape[0]
+    assert not any(forced for _, _, forced in bands)
+    assert not cuts_through_a_line(bands, lines)
+    # Neighbouring bands share the gap, so together they cover every row
+    for (_, bottom, _), (next_top, _, _) in zip(bands, bands[1:]):
+        assert next_top <= bottom
+
+def test_cuts_are_close_to_an_even_split():
+    image, _ = page(line_count=40)
+
+    bands = split_into_bands(image, 4)
+
+    band_height = image.shape[0] / 4
+    for index, (top, _, _) in enumerate(bands[1:], start=1):
+        assert abs(top - index * band_height) <= band_height / 2
+
+def test_cuts_are_forced_without_gaps():
+    image = np.zeros((900, 400), dtype=np.uint8)
+    image[:, ::2] = 255  # Ink on every row, so no row is blank
+
+    bands = split_into_bands(image, 3, overlap=24)
+
+    assert [forced for _, _, forced in bands] == [False, True, True]
+    assert bands[0] == (0, 324, False)
+    assert bands[1] == (276, 624, True)
+    assert bands[2] == (576, 900, True)
+
+def test_band_text_is_joined_in_order():
+    assert merge_band_text(["first line\nsecond line\n", "third line"], [False, False]) == \
+        "first line\nsecond line\nthird line"
+
+def test_lines_read_twice_in_a_forced_overlap_are_dropped():
+    texts = ["one\ntwo\nthree", "two \nthree\nfour", "four\nfive"]
+
+    assert merge_band_text(texts, [False, True, True]) == "one\ntwo\nthree\nfour\nfive"
+
+def test_repeated_lines_are_kept_at_gap_cuts():
+    # Cuts in a gap share no text, so an identical line is a real repeat
+    assert merge_band_text(["Next", "Next\nSubmit"], [False, False]) == "Next\nNext\nSubmit"
+
+class FakeEngine:
+    def __init__(self):
+        self.images = []
+
+    def recognize_result(self, image):
+        self.images.append(image)
+        return OCRResult("small image", [90.0])
+
+def test_small_images_are_recognized_in_process():
+    engine = FakeEngine()
+    tiled_ocr = TiledOCR(workers=4, engine=engine)
+    image = np.full((TiledOCR.MIN_BAND_HEIGHT * 2 - 1, 800), 255, dtype=np.uint8)
+
+    assert tiled_ocr.band_count(image) == 1
+    assert tiled_ocr.recognize(image) == "small image"
+    assert len(engine.images) == 1
+    assert tiled_ocr.executor is None
+
+def test_band_count_is_limited_by_workers_and_height():
+    tiled_ocr = TiledOCR(workers=4)
+
+    assert tiled_ocr.band_count(np.zeros((TiledOCR.MIN_BAND_HEIGHT * 3, 10))) == 3
+    assert tiled_ocr.band_count(np.zeros((TiledOCR.MIN_BAND_HEIGHT * 10, 10))) == 4